@@ -12,5 +12,30 @@
 # License for the specific language governing permissions and limitations under
 # the License.
 
-"""napalm_skeleton package."""
-from brocade import BrocadeDriver
+"""
+napalm_brocade package.
+
+BrocadeDriver is imported on first access, so importing the package or
+its standalone modules (parsers, records, diff ...) does not load
+napalm_base and the driver.
+"""
+import importlib
+import sys
+
+__all__ = ['BrocadeDriver']
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        """Import BrocadeDriver on first access."""
+        if name == 'BrocadeDriver':
+            module = importlib.import_module('napalm_brocade.brocade')
+            globals()[name] = module.BrocadeDriver
+            return module.BrocadeDriver
+        raise AttributeError("module %r has no attribute %r"
+                             % (__name__, name))
+
+    def __dir__():
+        """List BrocadeDriver, so napalm's driver lookup finds it."""
+        return sorted(list(globals()) + __all__)
+else:
+    from napalm_brocade.brocade import BrocadeDriver  # noqa
@@ -0,0 +1,107 @@
+#
+# Copyright 2016 Shiv Haris, Brocade Communication Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.  You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+asyncio front-end for BrocadeDriver.
+
+Every method is a coroutine that runs the blocking driver call on a
+bounded executor shared by all instances, so the event loop never blocks
+and threads are only used by calls in flight, not per device.  Calls on
+one instance are serialized since a session runs one command at a time;
+they wait on an asyncio.Lock, not in an executor thread.
+Requires Python 3.7.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MAX_WORKERS = 64
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _default_executor():
+    """Return the executor shared by every AsyncBrocadeDriver."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(DEFAULT_MAX_WORKERS)
+        return _executor
+
+
+def _delegate(name):
+    """Build an async wrapper of the driver method name."""
+    async def method(self, *args, **kwargs):
+        return await self._call(name, *args, **kwargs)
+    method.__name__ = name
+    method.__doc__ = "Awaitable BrocadeDriver.%s()." % name
+    return method
+
+
+class AsyncBrocadeDriver(object):
+    """BrocadeDriver with awaitable methods."""
+
+    def __init__(self, hostname, username, password, timeout=60,
+                 optional_args=None, executor=None, driver_class=None):
+        """CTOR for the device."""
+        if driver_class is None:
+            from napalm_brocade.brocade import BrocadeDriver
+            driver_class = BrocadeDriver
+
+        self.driver = driver_class(hostname, username, password,
+                                   timeout=timeout, optional_args=optional_args)
+        self.executor = executor or _default_executor()
+        # Created on first use, in the running loop
+        self._lock = None
+
+    async def _call(self, name, *args, **kwargs):
+        """
+        Run driver method name on the executor, one call at a time.
+
+        The lock is held until the executor thread returns, not until the
+        awaiting coroutine does: a cancelled call (e.g. by
+        asyncio.wait_for()) keeps the session busy until it finishes.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        loop = asyncio.get_running_loop()
+        await self._lock.acquire()
+        try:
+            future = self.executor.submit(
+                lambda: getattr(self.driver, name)(*args, **kwargs))
+        except BaseException:
+            self._lock.release()
+            raise
+        future.add_done_callback(
+            lambda _: loop.call_soon_threadsafe(self._lock.release))
+        return await asyncio.wrap_future(future)
+
+    open = _delegate('open')
+    close = _delegate('close')
+    cli = _delegate('cli')
+    get_facts = _delegate('get_facts')
+    get_interfaces = _delegate('get_interfaces')
+    get_interfaces_counters = _delegate('get_interfaces_counters')
+    get_vlan_table = _delegate('get_vlan_table')
+    get_arp_table = _delegate('get_arp_table')
+    get_mac_address_table = _delegate('get_mac_address_table')
+    get_environment = _delegate('get_environment')
+    load_merge_candidate = _delegate('load_merge_candidate')
+    load_replace_candidate = _delegate('load_replace_candidate')
+    compare_config = _delegate('compare_config')
+    commit_config = _delegate('commit_config')
+    discard_config = _delegate('discard_config')
+    rollback_config = _delegate('rollback_config')
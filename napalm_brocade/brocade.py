@@ -18,26 +18,144 @@ Brocade-Napalm Driver.
 
 This driver is meant for SLX and NOS based switches.
 """
-from netmiko import ConnectHandler
-from napalm_base import helpers
 from napalm_base.base import NetworkDriver
 from napalm_base.exceptions import ConnectionException, MergeConfigException, \
-    ReplaceConfigException, SessionLockedException, CommandErrorException
+    ReplaceConfigException, CommandErrorException, CommandTimeoutException
 
+import hashlib
 import os
-import pdb
 import re
-from shutil import copyfile
-from napalm_brocade.nos.nosdriver import NOSdriver as nosdriver
-
-import pprint
+import time
+from collections import OrderedDict
+from io import BytesIO
+from multiprocessing.pool import ThreadPool
+from napalm_brocade import diff, netconf, parsers
+from napalm_brocade.cache import ResultCache
+from napalm_brocade.checkpoint import DEFAULT_DIRECTORY, CheckpointStore
+from napalm_brocade.counters import CounterSampler
+from napalm_brocade.instrumentation import Instrumentation
+from napalm_brocade.pool import POOL
+from napalm_brocade.reader import session_reader
+from napalm_brocade.records import ArpTable, MacTable, arp_entry_to_dict, \
+    mac_entry_to_dict
+from napalm_brocade.snapshot import Snapshot, plan
+from napalm_brocade.tracking import ArpTracker, MacTracker
 
 # TBD(shh) Put this in config file (oslo_config)
 EXPORT_HOST = "10.24.88.6"
 EXPORT_USER = "shh"
 EXPORT_PASSWORD = "ss"
 
-pp = pprint.PrettyPrinter(indent=4)
+# flash:// on the switch
+FLASH_DIR = "/var/config/vcs/scripts"
+CANDIDATE_PATH = FLASH_DIR + "/_candidate.cfg"
+ROLLBACK_PATH = FLASH_DIR + "/_rollback.cfg"
+
+# Sections of get_environment(): the command and parser of each
+ENVIRONMENT_SECTIONS = OrderedDict([
+    ('fans', ('show environment fan', parsers.parse_environment_fan)),
+    ('power', ('show environment power', parsers.parse_environment_power)),
+    ('temperature', ('show environment temp',
+                     parsers.parse_environment_temp)),
+    ('cpu', ('show process cpu', parsers.parse_process_cpu)),
+    ('memory', ('show process memory summary',
+                parsers.parse_process_memory)),
+])
+
+# CLI commands of the getters get_snapshot() can collect
+SNAPSHOT_COMMANDS = OrderedDict([
+    ('get_facts', ('show system',)),
+    ('get_environment', tuple(command for command, _
+                              in ENVIRONMENT_SECTIONS.values())),
+    ('get_interfaces', ('show ip interface brief',)),
+    ('get_interfaces_counters', ('show interface stats brief',)),
+    ('get_vlan_table', ('show vlan brief',)),
+    ('get_arp_table', ('show arp',)),
+    ('get_mac_address_table', ('show mac-address-table',)),
+])
+
+# Getters served by the NETCONF transport when it is enabled
+NETCONF_GETTERS = ('get_interfaces', 'get_vlan_table', 'get_arp_table',
+                   'get_mac_address_table')
+
+# Output of a command the switch does not accept
+REJECTED = 'Invalid input detected'
+
+# Output of a config set that means it was not applied as sent
+CONFIG_ERRORS = ('Invalid input detected', '% Error', 'syntax error')
+
+
+def _split_batch_output(output, prompt, commands):
+    """
+    Split the output of a batch of commands back into per-command outputs.
+
+    The switch terminates the output of every command with its prompt, so
+    the prompt starting a line is used as the delimiter, as PromptReader
+    finds it; the prompt within a line of output is not.  The first line
+    of every chunk is the echo of the command itself and is dropped.
+    """
+    output = output.replace('\r\n', '\n').replace('\r', '\n')
+    chunks = re.split('\n' + re.escape(prompt), output)
+    if len(chunks) < len(commands):
+        raise CommandErrorException(
+            "Expected output for %d commands, got %d" %
+            (len(commands), len(chunks)))
+
+    outputs = []
+    for command, chunk in zip(commands, chunks):
+        lines = chunk.split('\n')
+        if lines and command.strip() in lines[0]:
+            lines = lines[1:]
+        outputs.append('\n'.join(lines).strip('\n'))
+    return outputs
+
+
+def _interface_argument(interface):
+    """
+    Return interface, e.g. 'Te 1/0/1' or 'TenGigabitEthernet 1/0/1', as a
+    CLI argument.
+
+    None when it cannot be given to the CLI: a bare port or an unknown type.
+    """
+    if interface is None:
+        return None
+    interface_type, port = parsers.split_interface(interface)
+    keyword = parsers.INTERFACE_KEYWORDS.get(interface_type)
+    if keyword is None:
+        return None
+    return '%s %s' % (keyword, port)
+
+
+def _scp_client(transport):
+    """Return an SCP client on the paramiko transport."""
+    # scp comes with netmiko; only load it for an SCP upload
+    from scp import SCPClient
+    return SCPClient(transport)
+
+
+def _arp_command(ip=None, mac=None, interface=None):
+    """Return the narrowest 'show arp' for the filters given."""
+    if ip is not None:
+        return 'show arp ip %s' % ip
+    if mac is not None:
+        return 'show arp mac-address %s' % parsers.cli_mac(mac)
+    argument = _interface_argument(interface)
+    if argument is not None:
+        return 'show arp interface %s' % argument
+    return 'show arp'
+
+
+def _mac_address_table_command(vlan=None, interface=None, mac=None):
+    """Return the narrowest 'show mac-address-table' for the filters given."""
+    if mac is not None:
+        return 'show mac-address-table address %s' % parsers.cli_mac(mac)
+    argument = _interface_argument(interface)
+    if argument is not None:
+        return 'show mac-address-table interface %s' % argument
+    if vlan is not None:
+        return 'show mac-address-table vlan %d' % int(vlan)
+    return 'show mac-address-table'
+
 
 class BrocadeDriver(NetworkDriver):
     """Napalm Driver for Vendor Brocade."""
@@ -47,8 +165,6 @@ class BrocadeDriver(NetworkDriver):
         """
         CTOR for the device.
         """
-
-        pdb.set_trace()
         if optional_args is None:
             optional_args = {}
 
@@ -58,443 +174,938 @@ class BrocadeDriver(NetworkDriver):
         self.password = password
         self.timeout = timeout
         self.port = optional_args.get('port', 22)
-
+        self.batch_commands = optional_args.get('batch_commands', True)
+        # Single commands are read by the session's PromptReader rather
+        # than netmiko's send_command(); batches always are
+        self.prompt_reader = optional_args.get('prompt_reader', True)
+        # Independent commands may run on parallel channels of the session
+        self.parallel_channels = optional_args.get('parallel_channels', True)
+        # Getter filters are passed to the CLI; turned off for the session
+        # when the switch rejects the filtered command
+        self.filter_pushdown = optional_args.get('filter_pushdown', True)
+
+        # Opt-in result cache: True for a private in-memory cache, or a
+        # ResultCache/SqliteResultCache instance to share one.
+        cache = optional_args.get('cache')
+        if cache is True:
+            cache = ResultCache()
+        self.cache = cache or None
+        self.cache_ttl = optional_args.get('cache_ttl', {})
+
+        # Opt-in session reuse: True for the process-wide pool, or a
+        # ConnectionPool instance.
+        pool = optional_args.get('pool')
+        if pool is True:
+            pool = POOL
+        self.pool = pool or None
+        self._pool_key = (hostname, self.port, username)
+        # Keeps counter samples across short-lived drivers; one per switch
+        self.counter_sampler = optional_args.get('counter_sampler')
+        # Keep the MAC and ARP tables across polls; one of each per switch
+        self.mac_tracker = optional_args.get('mac_tracker')
+        self.arp_tracker = optional_args.get('arp_tracker')
+
+        # transport 'netconf' fetches the bulk tables over NETCONF; the CLI
+        # session is still used for everything else.
+        self.transport = optional_args.get('transport', 'ssh')
+        self.netconf_port = optional_args.get('netconf_port',
+                                              netconf.DEFAULT_PORT)
+        self.netconf = None
+        # Outputs collected up front by get_snapshot() for its getters
+        self._prefetched = None
+
+        # How load_*_candidate() gets the file on flash: 'sftp' or 'scp'
+        # over the open session, or 'export_host' for the legacy pull
+        self.config_transfer = optional_args.get('config_transfer', 'sftp')
+        self._candidate = None
+        self._candidate_merge = False
+        self._running_config = None
+        # Text of the last running config checkpoint, for live rollbacks
+        self._checkpoint_config = None
+        self.config_changes = None
+
+        # Opt-in local history of every checkpointed config version, by
+        # content hash: True for a store under checkpoint_dir, or a
+        # CheckpointStore instance to share one.  The configs are written
+        # in full, secrets included.
+        checkpoints = optional_args.get('checkpoints')
+        if checkpoints is True:
+            checkpoints = CheckpointStore(
+                optional_args.get('checkpoint_dir', DEFAULT_DIRECTORY))
+        self.checkpoints = checkpoints or None
+
+        # rollback_config() undoes the delta in-session ('live', falling
+        # back to a reload) or always reloads ('reload')
+        self.rollback_mode = optional_args.get('rollback_mode', 'live')
+        self.rollback_report = None
+
+        # Spans of every interaction go to the hooks of this Instrumentation;
+        # pass one instance to several drivers to collect fleet-wide metrics
+        self.instrumentation = optional_args.get('instrumentation') or \
+            Instrumentation()
 
     def open(self):
         """Open a connection to the device."""
-        pdb.set_trace()
+        with self._span('connect', transport='ssh',
+                        pooled=self.pool is not None):
+            if self.pool is not None:
+                self.device = self.pool.acquire(self._pool_key, self._connect,
+                                                timeout=self.timeout)
+            else:
+                self.device = self._connect()
+
+        if self.transport == 'netconf':
+            with self._span('connect', transport='netconf'):
+                self.netconf = netconf.connect(self.hostname,
+                                               self.netconf_port,
+                                               self.username, self.password,
+                                               self.timeout)
+
+    def _span(self, name, **attrs):
+        """Return a span of name on this switch, see Instrumentation.span."""
+        return self.instrumentation.span(name, self.hostname, **attrs)
+
+    def _connect(self):
+        """Open a new SSH session to the device."""
+        # netmiko pulls in paramiko and its crypto stack; only load it
+        # when a session is actually opened
+        from netmiko import ConnectHandler
         try:
-            self.device = ConnectHandler(device_type='vdx',
-                                         ip=self.hostname,
-                                         port=self.port,
-                                         username=self.username,
-                                         password=self.password,
-                                         timeout=self.timeout)
+            return ConnectHandler(device_type='vdx',
+                                  ip=self.hostname,
+                                  port=self.port,
+                                  username=self.username,
+                                  password=self.password,
+                                  timeout=self.timeout)
         except Exception:
             raise ConnectionException("Cannot connect to switch: %s:%s" \
                                           % (self.hostname, self.port))
 
     def close(self):
-        """Close the connection to the device."""
-        self.device.disconnect()
+        """Close the connection to the device, or return it to the pool."""
+        if self.netconf is not None:
+            self.netconf.close()
+            self.netconf = None
+        if self.pool is not None:
+            self.pool.release(self._pool_key, self.device)
+        else:
+            self.device.disconnect()
+        self.device = None
 
     def cli(self, commands=None):
         """
         Execute a list of commands and return the output in a dictionary format using the
         command as the key.
 
+        The commands are sent to the switch as one batch.
         """
         cli_output = dict()
 
         if not isinstance(commands, list):
             raise TypeError('Please enter a valid list of commands!')
 
-        for command in commands:
-            output = self.device.send_command(command)
-            if 'Invalid input detected' in output:
-                raise ValueError(
-                    'Unable to execute command "{}"'.format(command))
+        outputs = self.send_commands(commands)
+        for command, output in zip(commands, outputs):
             cli_output.setdefault(command, {})
             cli_output[command] = output
 
         return cli_output
 
-    def send_command(self, cmd):
-        """Send the cmd to the switch for execution."""
-        output = self.device.send_command(cmd)
-        if 'Invalid input detected' in output:
-            raise ValueError('Unable to execute command "{}"'.format(cmd))
+    def send_command(self, cmd, getter=None):
+        """
+        Send the cmd to the switch for execution.
+
+        When a result cache is configured and the command runs on behalf of
+        a getter, the output is served from the cache for the getter's TTL.
+        """
+        return self.send_commands([cmd], getter=getter)[0]
+
+    def send_commands(self, commands, getter=None, parallel=False):
+        """
+        Send several commands to the switch and return a list of outputs.
+
+        Unless batching is disabled with optional_args['batch_commands'],
+        all the commands are written in one go and the combined output is
+        read back once, saving a round-trip per command.  With parallel=True
+        the commands instead run concurrently, each on its own channel of
+        the SSH transport, so the switch renders them at the same time.
+        A command the switch rejects raises ValueError.
+        """
+        outputs = self._send_commands(commands, getter, parallel)
+        for output in outputs:
+            if isinstance(output, Exception):
+                raise output
+        return outputs
+
+    def _send_commands(self, commands, getter=None, parallel=False):
+        """
+        Send several commands, see send_commands().
+
+        The output of a command the switch rejects is replaced by a
+        ValueError, so the outputs of the other commands of the batch can
+        still be used; errors are not cached.
+        """
+        outputs = dict()
+        if self._prefetched is not None:
+            for cmd in commands:
+                if cmd in self._prefetched:
+                    outputs[cmd] = self._prefetched[cmd]
+
+        if self.cache is not None and getter is not None:
+            for cmd in commands:
+                output = self.cache.get(self.hostname, cmd)
+                if output is not None and cmd not in outputs:
+                    outputs[cmd] = output
+
+        missing = [cmd for cmd in commands if cmd not in outputs]
+        fetched = None
+        if parallel and self.parallel_channels and len(missing) > 1:
+            fetched = self._send_command_channels(missing, getter)
+
+        if fetched is None:
+            if not self.batch_commands or len(missing) < 2:
+                fetched = [self._send_one_command(cmd, getter)
+                           for cmd in missing]
+            else:
+                with self._span('command', command='; '.join(missing),
+                                getter=getter) as span:
+                    fetched = self._send_command_batch(missing, span)
+
+        for cmd, output in zip(missing, fetched):
+            if REJECTED in output:
+                outputs[cmd] = ValueError(
+                    'Unable to execute command "{}"'.format(cmd))
+                continue
+            if self.cache is not None and getter is not None:
+                self.cache.set(self.hostname, cmd, output,
+                               self.cache_ttl.get(getter))
+            outputs[cmd] = output
+
+        return [outputs[cmd] for cmd in commands]
+
+    def invalidate_cache(self):
+        """Drop the cached output of this switch."""
+        if self.cache is not None:
+            self.cache.invalidate(self.hostname)
+
+    def _send_one_command(self, cmd, getter):
+        """Send cmd, as one 'command' span."""
+        with self._span('command', command=cmd, getter=getter) as span:
+            if self.prompt_reader:
+                return self._send_command_batch([cmd], span)[0]
+            output = self.device.send_command(cmd)
+            span.bytes = len(output)
         return output
 
-    def get_environment(self):
+    def _device_command(self, cmd, label=None):
+        """
+        Send cmd of the config workflow as one 'command' span.
 
-        environment = dict()
+        label stands for cmd in the span, e.g. for a command holding
+        credentials.
+        """
+        with self._span('command', command=label or cmd) as span:
+            output = self.device.send_command(cmd)
+            span.bytes = len(output)
+        return output
+
+    def _device_config_set(self, commands):
+        """Send a config set as one 'command' span."""
+        with self._span('command', command='config set',
+                        lines=len(commands)) as span:
+            output = self.device.send_config_set(commands)
+            span.bytes = len(output)
+        return output
 
-        environment['cpu'] = dict()
-        environment['available_ram'] = ''
-        environment['used_ram'] = ''
-
-        cmd = 'show environment fan'
-        output = self.device.send_command(cmd)
-        lines = output.splitlines()
-
-        fans = dict()
-        for line in lines:
-            fan = dict()
-            regex = r'^Fan (.*) is (.*),.*$'
-            match = re.search(regex, line)
-            if match:
-                fanindex = match.group(1)
-                fan['status'] = match.group(2) == "Ok"
-                fans[fanindex] = fan
-
-
-        environment['fans'] = fans
-
-        cmd = 'show environment power'
-        output = self.device.send_command(cmd)
-        lines = output.splitlines()
-        lines = lines[1:-1]
-
-        powers = dict()
-        for line in lines:
-            power = dict()
-            regex = r'^Power Supply #(.*) is (.*)$'
-            match = re.search(regex, line)
-            if match:
-                powerindex = match.group(1)
-                power['status'] = match.group(2) == "OK"
-                powers[powerindex] = power
-
-        environment['power'] = powers
-
-        cmd = 'show environment temp'
-        output = self.device.send_command(cmd)
-        lines = output.splitlines()
-        lines = lines[3:-1]
-
-        temps = dict()
-        for line in lines:
-            temp = dict()
-            vals = line.split()
-            if len(vals) == 4:
-                tempindex = vals[0]
-                temp['temperature'] = vals[2]
-                temp['is_alert'] = vals[1] != "Ok"
-                temp['is_critical'] = vals[1] != "Ok"
-                temps[tempindex] = temp
-
-        environment['temperature'] = temps
-
-        cpu_cmd = 'show process cpu'
-
-        output = self.device.send_command(cpu_cmd)
-        output = output.strip()
-
-        lines = output.splitlines()
-
-        # cpus = dict()
-        # while True:
-        # line = lines.pop(0)
-        # if 'Realtime Statistics' in line:
-        # line = lines.pop(0)
-        # cpu_regex = r'^.*One minute: (\d+\.\d+); Five.*$'
-        # match = re.search(cpu_regex, line)
-        # if match:
-        # environment['cpu'][0]['%load'] = float(match.group(1))
-        # 
-        # 
+    def _send_command_channels(self, commands, getter):
+        """
+        Run every command on its own exec channel, concurrently.
 
+        Return the outputs, or None if exec channels cannot be used (the
+        switch refuses them, or the session is not a paramiko one); they
+        are then not tried again on this driver.
+        """
+        def run(cmd):
+            with self._span('command', command=cmd, getter=getter,
+                            channel='exec') as span:
+                channel = transport.open_session()
+                try:
+                    channel.settimeout(self.timeout)
+                    channel.exec_command(cmd)
+                    chunks = []
+                    data = channel.recv(65536)
+                    while data:
+                        span.received(data, self.instrumentation.clock())
+                        chunks.append(data)
+                        data = channel.recv(65536)
+                finally:
+                    channel.close()
+            output = b''.join(chunks)
+            if not isinstance(output, str):
+                output = output.decode('utf-8', 'replace')
+            return output.replace('\r\n', '\n').strip('\n')
+
+        pool = ThreadPool(len(commands))
+        try:
+            transport = self.device.remote_conn.get_transport()
+            return pool.map(run, commands)
+        except Exception:
+            self.parallel_channels = False
+            return None
+        finally:
+            pool.close()
+
+    def _reader(self):
+        """Return the PromptReader of the open session."""
+        return session_reader(self.device, self.timeout)
+
+    def _send_command_batch(self, commands, span):
+        """Write a batch of commands and read until every prompt came back."""
+        clock = self.instrumentation.clock
+        reader = self._reader()
+        output = reader.run(commands,
+                            lambda data: span.received(data, clock()))
+        return _split_batch_output(output, reader.prompt, commands)
+
+    def get_environment(self, sections=None):
+        """
+        Get fans, power, temperature, cpu and memory.
+
+        sections limits the result to some of ENVIRONMENT_SECTIONS, e.g.
+        ['temperature'] for a quick health probe; only their commands are
+        sent.  The commands run on parallel channels.
+        """
+        if sections is None:
+            sections = list(ENVIRONMENT_SECTIONS)
+        unknown = set(sections) - set(ENVIRONMENT_SECTIONS)
+        if unknown:
+            raise ValueError("Unknown environment sections: %s"
+                             % ', '.join(sorted(unknown)))
+
+        commands = [ENVIRONMENT_SECTIONS[section][0] for section in sections]
+        outputs = self.send_commands(commands, getter='get_environment',
+                                     parallel=True)
+
+        environment = dict()
+        with self._span('parse', getter='get_environment'):
+            for section, output in zip(sections, outputs):
+                environment[section] = ENVIRONMENT_SECTIONS[section][1](output)
+        if 'memory' in environment:
+            # Flat keys returned by earlier releases
+            environment['available_ram'] = \
+                environment['memory']['available_ram']
+            environment['used_ram'] = environment['memory']['used_ram']
         return environment
 
     def get_facts(self):
         cmd = "show system"
-        fact_table = {}
-        output = self.device.send_command(cmd)
-        output = output.split('\n')
-        output = output[3:-1]
-
-        fact_table["vendor"] = "Brocade"
-        fact_table["seriel_number"] = "xxxxx"
-
-        for line in output:
-            if len(line) == 0:
-                return {}
-
-            match = re.search("Up Time.*: up (.*)$", line)
-            if match:
-                uptime = match.group(1)
-                fact_table["uptime"] = uptime
-
-            match = re.search("^(.*) Version.*: (.*)$", line)
-            if match:
-                os_type = match.group(1)
-                os_version = match.group(2)
-                # fact_table["os_type"] = os_type
-                fact_table["model"] = os_type
-                fact_table["os_version"] = os_version
-
-            match = re.search("^Management IP.*: (.*)$", line)
-            if match:
-                mgmt_ip = match.group(1)
-                fact_table["hostname"] = mgmt_ip
-                fact_table["fqdn"] = mgmt_ip
-
-        return fact_table
+        output = self.send_command(cmd, getter='get_facts')
+        with self._span('parse', getter='get_facts'):
+            return parsers.parse_facts(output)
 
     def get_vlan_table(self):
         """
         Get VLAN table.
         """
-        vlan_table = []
+        if self.netconf is not None:
+            return list(self.netconf.iter_vlans())
 
         vlan_cmd = 'show vlan brief'
-        output = self.device.send_command(vlan_cmd)
-        output = output.split('\n')
+        output = self.send_command(vlan_cmd, getter='get_vlan_table')
+        with self._span('parse', getter='get_vlan_table'):
+            return parsers.parse_vlan_brief(output)
 
-        # Skip the first two lines which is the header
-        output = output[5:-1]
-
-        for line in output:
-            if len(line) == 0:
-                continue
-
-            vlans = line.split()
-            entry = {
-                'vlan': vlans[0],
-                'name': vlans[1]
-                }
-            vlan_table.append(entry)
-
-        return vlan_table
-
-    def get_arp_table(self):
+    def get_arp_table(self, compact=False, ip=None, mac=None,
+                      interface=None):
         """
         Get ARP table.
+
+        With compact=True an ArpTable is returned instead of a list of
+        dicts; its to_dicts() gives back the NAPALM format.  Only the
+        entries matching ip, mac and interface (e.g. 'Ve 100') are
+        returned; the most selective of them is passed to the switch so
+        only the matching rows are transferred, unless the switch rejects
+        it.
         """
-        arp_table = []
+        entries = self._iter_arp_entries(ip, mac, interface)
+        with self._span('parse', getter='get_arp_table'):
+            if compact:
+                return ArpTable(entries)
+            return [arp_entry_to_dict(entry) for entry in entries]
+
+    def _iter_arp_entries(self, ip=None, mac=None, interface=None):
+        """Return an iterator of the matching ArpEntry records."""
+        if self.netconf is not None:
+            if mac is not None:
+                mac = parsers.mac(mac)
+            return (entry for entry in self.netconf.iter_arp()
+                    if (ip is None or entry.ip == ip) and
+                    (mac is None or entry.mac == mac) and
+                    (interface is None or
+                     parsers.interface_matches(interface, entry.interface)))
 
         arp_cmd = 'show arp'
-        output = self.device.send_command(arp_cmd)
-        output = output.split('\n')
-
-        # Skip the first two lines which is the header
-        output = output[2:-1]
-
-        for line in output:
-            if len(line) == 0:
-                return {}
-            if len(line.split()) == 6:
-                address, mac, interface, macresolved, age, typ = line.split()
-                try:
-                    if age == '-':
-                        age = 0
-                    age = float(age)
-                except ValueError:
-                    print(
-                        "Unable to convert age value to float: {}".format(age)
-                        )
-                entry = {
-                    'interface': interface,
-                    'mac': helpers.mac(mac),
-                    'ip': address,
-                    'type': typ,
-                    'age': age
-                }
-                arp_table.append(entry)
-            else:
-                raise ValueError(
-                    "Unexpected output from: {}".format(line.split()))
-
-        return arp_table
-
-    def get_interfaces(self):
-
-        interface_list = {}
-
-        iface_cmd = 'show interface'
-        output = self.device.send_command(iface_cmd)
-        output = output.splitlines()
-
-        for line in output:
+        if self.filter_pushdown and (self._prefetched is None or
+                                     arp_cmd not in self._prefetched):
+            arp_cmd = _arp_command(ip, mac, interface)
+        try:
+            output = self.send_command(arp_cmd, getter='get_arp_table')
+        except ValueError:
+            if arp_cmd == 'show arp':
+                raise
+            # The filtered command is not supported: filter in-stream
+            self.filter_pushdown = False
+            output = self.send_command('show arp', getter='get_arp_table')
+        return parsers.iter_arp(output, ip=ip, mac_address=mac,
+                                interface=interface)
+
+    def sync_arp_table(self):
+        """
+        Poll the ARP table and return what changed since the last poll.
 
-            fields = line.split()
+        The previous table is kept in self.arp_tracker; see
+        ArpTracker.update() for the format of the result.
+        """
+        if self.arp_tracker is None:
+            self.arp_tracker = ArpTracker()
+        return self.arp_tracker.update(self._iter_arp_entries())
 
     def get_interfaces(self):
 
-        interface_list = {}
+        if self.netconf is not None:
+            return self.netconf.get_interfaces()
 
         iface_cmd = 'show ip interface brief'
-        output = self.device.send_command(iface_cmd)
-        output = output.split('\n')
-        output = output[3:-1]
-
-        for line in output:
-
-            fields = line.split()
-
-            """
-            # Brocade CLI outputs
-            #
-            sw0# show ip interface brief
-            Interface                      IP-Address      Status                    Protocol
-            ==========================     ==========      ====================      ========
-            GigabitEthernet 0/1             unassigned        administratively down     down
-            GigabitEthernet 0/2             unassigned        administratively down     down
-            GigabitEthernet 0/3             unassigned        administratively down     down
-            GigabitEthernet 0/4             unassigned        administratively down     down
-
-            Interface              IP-Address          Vrf                     Status                    Protocol
-            ==================     ==========          ==================      ====================      ========
-            Ethernet 0/1           unassigned          default-vrf             administratively down     down
-            Ethernet 0/2           unassigned          default-vrf             administratively down     down
-            Ethernet 0/3           unassigned          default-vrf             administratively down     down
-            """
-
-
-            # Check for administratively down
-            if len(fields) == 6:
-                interface_type, interface, ip_address, status, \
-                    status2, protocol = fields
-            elif len(fields) == 7:
-                interface_type, interface, ip_address, vrf, status, \
-                    status2, protocol = fields
-            else:
-                raise ValueError(u"Unexpected Response from the device")
-
-            status = status.lower()
-            protocol = protocol.lower()
-            if 'admin' in status:
-                is_enabled = False
-            else:
-                is_enabled = True
-            is_up = bool('up' in protocol)
-            interface_list[interface] = {
-                'is_up': is_up,
-                'is_enabled': is_enabled,
-                'interface_type': interface_type,
-                'ip_address': ip_address
-            }
-        
-
-        return interface_list
+        output = self.send_command(iface_cmd, getter='get_interfaces')
+        with self._span('parse', getter='get_interfaces'):
+            return parsers.parse_ip_interface_brief(output)
 
     def reboot(self):
         """Reload the switch."""
         cmd = "reload system\ny\n"
-        self.device.send_command(cmd)
+        self._device_command(cmd, label='reload system')
 
     def commit_config(self):
-        """Commit the candidate configuration."""
+        """
+        Commit the candidate configuration.
+
+        Copying the candidate over the running config merges it.  For a
+        replace candidate, the lines of the running config the candidate
+        does not have are then removed in-session, so the commit applies
+        what compare_config() reported.
+        """
         cmd = "copy flash://_candidate.cfg running-config"
-        self.device.send_command(cmd)        
+        self._device_command(cmd)
+        self.invalidate_cache()
+        self._running_config = None
+        if self._candidate is None or self._candidate_merge:
+            return
+
+        commands = diff.commands(
+            diff.parse_config(self._get_running_config()),
+            diff.parse_config(self._candidate.decode('utf-8')))
+        if not commands:
+            return
+        output = self._device_config_set(commands)
+        self._running_config = None
+        if any(error in output for error in CONFIG_ERRORS):
+            raise ReplaceConfigException(
+                "Cannot remove the lines missing from the candidate on %s: "
+                "%s" % (self.hostname, output))
+
+    def _checkpoint_running_config(self, force=False):
+        """
+        Checkpoint running config.
 
-    def _checkpoint_running_config(self):
-        """Checkpoint running config."""
-        cmd = "oscmd rm /var/config/vcs/scripts/_running.cfg"
-        self.device.send_command(cmd)
-        cmd = "copy running-config flash://_running.cfg"
-        self.device.send_command(cmd)
+        Return the version (content hash) of the checkpoint.  With a
+        checkpoint store, the copy to flash is skipped when the config has
+        not changed since the last checkpoint and the copy on flash is still
+        the one made then, unless force is set.
+        """
+        config = self._device_command('show running-config')
+        self._running_config = config
+        self._checkpoint_config = config
+        return self._checkpoint('running', config, force)
 
-    def _checkpoint_startup_config(self):
+    def _checkpoint_startup_config(self, force=False):
         """Checkpoint startup config if it exists."""
-        cmd = "oscmd rm /var/config/vcs/scripts/_startup.cfg"
-        self.device.send_command(cmd)
-        cmd = "copy startup-config flash://_startup.cfg"
-        self.device.send_command(cmd)
+        config = self._device_command('show startup-config')
+        return self._checkpoint('startup', config, force)
+
+    def _checkpoint(self, name, config, force):
+        """Copy the name-config to flash://_name.cfg if it changed."""
+        version = diff.config_hash(config)
+        if self.checkpoints is None:
+            self._copy_checkpoint(name)
+            return version
+
+        if force or not self._checkpoint_on_flash(name, version):
+            md5 = self._copy_checkpoint(name)
+            self.checkpoints.record_flash(self.hostname, version, md5, name)
+        self.checkpoints.save(self.hostname, config, name)
+        return version
+
+    def _checkpoint_on_flash(self, name, version):
+        """Tell whether flash://_name.cfg still holds the copy of version."""
+        if version != self.checkpoints.latest(self.hostname, name):
+            return False
+        return self.checkpoints.flash(self.hostname, name) == \
+            (version, self._flash_md5(name))
+
+    def _copy_checkpoint(self, name):
+        """Copy the name-config to flash://_name.cfg; return its MD5."""
+        cmd = "oscmd rm %s/_%s.cfg" % (FLASH_DIR, name)
+        self._device_command(cmd)
+        cmd = "copy %s-config flash://_%s.cfg" % (name, name)
+        self._device_command(cmd)
+        if self.checkpoints is not None:
+            return self._flash_md5(name)
+
+    def _flash_md5(self, name):
+        """Return the MD5 of flash://_name.cfg, or None if it is missing."""
+        output = self._device_command(
+            "oscmd md5sum %s/_%s.cfg" % (FLASH_DIR, name))
+        fields = output.split()
+        if not fields or len(fields[0]) != 32:
+            return None
+        return fields[0]
+
+    def load_replace_candidate(self, filename=None, config=None):
+        """Load a candidate to replace the running config on commit."""
+        self._load_candidate(filename, config, ReplaceConfigException)
 
-    def load_replace_candidate(self, filename, config=None):
-
-        dst = "%s/tmp/%s" % (os.environ['HOME'], filename)
-        copyfile(filename, dst)
-
-        cmd = "oscmd rm /var/config/vcs/scripts/_candidate.cfg"
-        self.device.send_command(cmd)
+    def load_merge_candidate(self, filename=None, config=None):
+        """Load a candidate to merge into the running config on commit."""
+        self._load_candidate(filename, config, MergeConfigException)
 
-        cmd = "copy scp://%s:%s@%s/tmp/%s flash://_candidate.cfg" \
-            % (EXPORT_USER, EXPORT_PASSWORD, EXPORT_HOST, filename)
+    def _load_candidate(self, filename, config, exception):
+        """
+        Store the candidate, from filename or the config string, on flash.
 
-        self.device.send_command(cmd)
+        By default the candidate is uploaded over the open SSH session and
+        its MD5 is verified on the switch.  With
+        optional_args['config_transfer'] = 'export_host' the switch pulls
+        the file from EXPORT_HOST instead.
+        """
+        self.invalidate_cache()
+        if config is None:
+            if filename is None:
+                raise exception("Either filename or config is required")
+            with open(filename) as f:
+                config = f.read()
+        if not isinstance(config, bytes):
+            config = config.encode('utf-8')
+
+        # Whatever candidate was loaded is gone from flash from here on
+        self._candidate = None
+        cmd = "oscmd rm %s" % CANDIDATE_PATH
+        self._device_command(cmd)
+
+        if self.config_transfer == 'export_host':
+            self._pull_from_export_host(filename, config)
+        else:
+            try:
+                self._upload(CANDIDATE_PATH, config)
+            except Exception as e:
+                raise exception("Cannot upload candidate to %s: %s"
+                                % (self.hostname, e))
+            self._verify_md5(CANDIDATE_PATH, config, exception)
+
+        self._candidate = config
+        self._candidate_merge = exception is MergeConfigException
+
+    def _upload(self, path, data):
+        """
+        Write data to path on the switch over the open SSH session.
 
-    def load_merge_candidate(self, filename=None, config=None):
+        SFTP is used unless config_transfer is 'scp'; when the switch
+        refuses the SFTP subsystem the file is sent over SCP instead.
+        """
+        with self._span('upload', path=path) as span:
+            self._upload_file(path, data)
+            span.bytes = len(data)
+
+    def _upload_file(self, path, data):
+        """Write data to path over SFTP or SCP, see _upload()."""
+        transport = self.device.remote_conn.get_transport()
+        client = None
+        if self.config_transfer != 'scp':
+            try:
+                client = transport.open_sftp_client()
+            except Exception:
+                client = None
+        if client is None:
+            client = _scp_client(transport)
+        try:
+            client.putfo(BytesIO(data), path)
+        finally:
+            client.close()
+
+    def _verify_md5(self, path, data, exception):
+        """Check that the file at path on the switch has the MD5 of data."""
+        output = self._device_command("oscmd md5sum %s" % path)
+        fields = output.split()
+        expected = hashlib.md5(data).hexdigest()
+        if not fields or fields[0] != expected:
+            raise exception("Checksum mismatch for %s on %s"
+                            % (path, self.hostname))
+
+    def _pull_from_export_host(self, filename, config):
+        """Have the switch copy the candidate from EXPORT_HOST."""
+        name = os.path.basename(filename or '_candidate.cfg')
+        with open("%s/tmp/%s" % (os.environ['HOME'], name), 'wb') as f:
+            f.write(config)
 
-        dst = "%s/tmp/%s" % (os.environ['HOME'], filename)
-        copyfile(filename, dst)
-        cmd = "oscmd rm /var/config/vcs/scripts/_candidate.cfg"
-        self.device.send_command(cmd)
         cmd = "copy scp://%s:%s@%s/tmp/%s flash://_candidate.cfg" \
-            % (EXPORT_USER, EXPORT_PASSWORD, EXPORT_HOST, filename)
-
-        self.device.send_command(cmd)
+            % (EXPORT_USER, EXPORT_PASSWORD, EXPORT_HOST, name)
+        # The span must not carry the password
+        self._device_command(cmd, label="copy scp://%s/tmp/%s "
+                             "flash://_candidate.cfg" % (EXPORT_HOST, name))
 
-    def rollback_config(self):
+    def rollback_config(self, version=None):
+        """
+        Roll back to the last checkpoint, or to version.
+
+        version is any version in self.checkpoints.history(hostname) and
+        needs a checkpoint store.  In 'live' mode only the delta between
+        the running config and the checkpoint is undone, in-session; the
+        last checkpoint taken by this driver is kept in memory, so this
+        needs no checkpoint store.  The switch is reloaded from the
+        checkpoint when there is no local copy of it or the delta cannot
+        be applied live, including when applying it raised.
+        self.rollback_report holds the mode used, the duration of every
+        step and, after a fallback, the error of the live attempt.
+        """
+        if version is not None and self.checkpoints is None:
+            raise ValueError("Rolling back to a version needs a checkpoint "
+                             "store, see optional_args['checkpoints']")
 
-        print "Reloading previous checkpoint ..."
-        cmd = "copy flash://_running.cfg running_config"
-        self.device.send_command(cmd) 
-        self.reboot()
+        self.rollback_report = {'mode': None, 'timings': OrderedDict()}
+        start = time.time()
+        try:
+            target = None
+            if self.rollback_mode == 'live':
+                target = self._rollback_target(version)
+            if target is not None:
+                self.rollback_report['mode'] = 'live'
+                try:
+                    if self._rollback_live(target):
+                        return
+                except Exception as e:
+                    self.rollback_report['error'] = e
+            self.rollback_report['mode'] = 'reload'
+            self._rollback_reload(version)
+        finally:
+            self.invalidate_cache()
+            self._running_config = None
+            self.rollback_report['timings']['total'] = time.time() - start
+
+    def _timed(self, step, func, *args):
+        """Call func, recording its duration as step of the rollback."""
+        start = time.time()
+        try:
+            return func(*args)
+        finally:
+            self.rollback_report['timings'][step] = time.time() - start
+
+    def _rollback_target(self, version):
+        """Return the config text to roll back to, or None if unknown."""
+        if version is None and self._checkpoint_config is not None:
+            return self._checkpoint_config
+        if self.checkpoints is None:
+            return None
+        if version is None:
+            version = self.checkpoints.latest(self.hostname)
+            if version is None:
+                return None
+        return self._timed('load', self.checkpoints.load, version)
+
+    def _rollback_live(self, config):
+        """Apply the inverse delta to config; return True if it took."""
+        target = diff.parse_config(config)
+        running = diff.parse_config(self._timed(
+            'fetch', self._device_command, 'show running-config'))
+        commands = self._timed('diff', diff.commands, running, target)
+        if not commands:
+            return True
+
+        output = self._timed('apply', self._device_config_set, commands)
+        if any(error in output for error in CONFIG_ERRORS):
+            return False
+
+        running = diff.parse_config(self._timed(
+            'verify', self._device_command, 'show running-config'))
+        return not diff.diff_trees(running, target)
+
+    def _rollback_reload(self, version):
+        """Copy the checkpoint over the running config and reload."""
+        source = "flash://_running.cfg"
+        if version is not None:
+            config = self.checkpoints.load(version).encode('utf-8')
+            self._timed('upload', self._upload, ROLLBACK_PATH, config)
+            self._verify_md5(ROLLBACK_PATH, config, CommandErrorException)
+            source = "flash://_rollback.cfg"
+        cmd = "copy %s running-config" % source
+        self._timed('copy', self._device_command, cmd)
+        self._timed('reload', self.reboot)
 
     def compare_config(self):
+        """
+        Return the diff between the running config and the candidate.
+
+        The diff is computed locally; the running config is fetched once
+        and reused until a commit or rollback changes it.  A replace
+        candidate is diffed as a full replace, which commit_config()
+        applies.  The structured
+        changes are kept in self.config_changes.
+        """
+        if self._candidate is None:
+            return ''
+
+        self.config_changes, text = diff.compare(
+            self._get_running_config(), self._candidate.decode('utf-8'),
+            merge=self._candidate_merge)
+        return text
 
-        cmd = "oscmd diff /var/config/vcs/scripts/_running.cfg /var/config/vcs/scripts/_candidate.cfg"
-        self.device.send_command(cmd)
+    def _get_running_config(self):
+        """Return the running config, fetching it only when unknown."""
+        if self._running_config is None:
+            self._running_config = self._device_command(
+                'show running-config')
+        return self._running_config
 
     def discard_config(self):
-        cmd = "oscmd rm /var/config/vcs/scripts/_candidate.cfg"
-        self.device.send_command(cmd)
+        self._candidate = None
+        cmd = "oscmd rm %s" % CANDIDATE_PATH
+        self._device_command(cmd)
 
     def get_interfaces_counters(self):
         cmd = "show interface stats brief"
-        lines = self.device.send_command(cmd)
-        lines = lines.split('\n')
-
-        counters_table = []
-        # Skip the first four lines which is the header
-        lines = lines[4:-1]
-
-        for line in lines:
-            if len(line) == 0:
-                return {}
-            if len(line.split()) == 9:
-                interface_type, interface, pkts_rx, pkts_tx, \
-                    err_rx, err_tx, discards_rx, discards_tx, crc_rx = \
-                    line.split()
-                entry = {
-                    'interface_type': interface_type,
-                    'interface': interface,
-                    'pkts_rx': pkts_rx,
-                    'pkts_tx': pkts_tx
-                }
-                counters_table.append(entry)
-            else:
-                raise ValueError(
-                    "Unexpected output from: {}".format(line.split()))
+        output = self.send_command(cmd, getter='get_interfaces_counters')
+        with self._span('parse', getter='get_interfaces_counters'):
+            return parsers.parse_interface_stats_brief(output)
+
+    def sample_interfaces_counters(self):
+        """
+        Sample the interface counters and return what changed.
+
+        The previous sample is kept in self.counter_sampler; see
+        CounterSampler.sample() for the format of the result.
+        """
+        if self.counter_sampler is None:
+            self.counter_sampler = CounterSampler()
+        return self.counter_sampler.sample(self.get_interfaces_counters())
+
+    def _iter_command_lines(self, cmd):
+        """
+        Send cmd and yield its output line by line as it arrives.
 
-        return counters_table
-            
-    def get_mac_address_table(self):
-        """Get mac address table (TBD)."""
+        Only the current partial line is buffered.  If the caller stops
+        early, the rest of the output is drained so the session stays usable.
+        The whole stream is one 'command' span, parsing included.
+        """
+        with self._span('command', command=cmd, streamed=True) as span:
+            lines = self._stream_command_lines(cmd, span)
+            try:
+                for line in lines:
+                    yield line
+            finally:
+                lines.close()
+
+    def _stream_command_lines(self, cmd, span):
+        """Generator behind _iter_command_lines()."""
+        reader = self._reader()
+        prompt = reader.prompt
+        self.device.clear_buffer()
+        self.device.write_channel(cmd + '\n')
+
+        pending = ''
+        echo = True
+        done = False
+        idle = 0
+        deadline = time.time() + self.timeout
+        try:
+            while not done:
+                data = reader.read()
+                span.received(data, self.instrumentation.clock())
+                if not data:
+                    if time.time() > deadline:
+                        raise CommandTimeoutException(
+                            "Timed out waiting for output of %s" % cmd)
+                    reader.wait(deadline, idle)
+                    idle += 1
+                    continue
+                idle = 0
+                deadline = time.time() + self.timeout
+
+                lines = (pending + data).split('\n')
+                pending = lines.pop()
+                done = pending.strip() == prompt
+                for line in lines:
+                    line = line.rstrip('\r')
+                    if echo:
+                        # First line is the echo of the command
+                        echo = False
+                        continue
+                    if line.strip() == prompt:
+                        done = True
+                        break
+                    yield line
+        finally:
+            while not done and time.time() < deadline:
+                pending = (pending + reader.read())[-256:]
+                done = pending.rstrip().endswith(prompt)
+                if not done:
+                    reader.wait(deadline, idle)
+                    idle += 1
+
+    def iter_mac_address_table(self, vlan=None, interface=None, mac=None):
+        """
+        Yield MacEntry records as the MAC address table streams in.
+
+        Rows are filtered on vlan, interface (either the port, e.g. '0/1',
+        or the full name, e.g. 'Ethernet 0/1') and mac before a record is
+        built, so only the matching entries are ever materialized.  The
+        most selective filter is also passed to the switch, so only the
+        matching rows are transferred, unless the switch rejects it.
+        """
+        if self.netconf is not None:
+            if mac is not None:
+                mac = parsers.mac(mac)
+            return (entry for entry in self.netconf.iter_mac_address_table()
+                    if (vlan is None or entry.vlan == int(vlan)) and
+                    (interface is None or
+                     parsers.interface_matches(interface, entry.interface)) and
+                    (mac is None or entry.mac == mac))
 
-        #with pynos.device.Device(conn=conn, auth=auth) as dev:
-        #pprint(dev.mac_table)
-        
         cmd = "show mac-address-table"
-        lines = self.device.send_command(cmd)
-        lines = lines.splitlines()
-
-        mac_address_table = []
-        # Skip the first 1 lines
-        lines = lines[1:-1]
-        for line in lines:
-
-            if len(line.split()) == 7:
-                vlan, tt, mac, typ, state, interface_type, interface = \
-                    line.split()
-
-                if state == "Inactive":
-                    active = False
-                else:
-                    active = True
-
-                if typ == "Static":
-                    typ = True
-                else:
-                    typ = False
-
-                entry = {
-                    'mac': helpers.mac(mac).decode('utf-8'),
-                    'interface': interface.decode('utf-8'),
-                    'vlan': int(vlan),
-                    'static': typ,
-                    'active': active,
-                    'moves': int(-1), 
-                    'last_move': float(0), 
-                    }
-
-                mac_address_table.append(entry)
+        if self._prefetched is not None and cmd in self._prefetched:
+            lines = self.send_command(
+                cmd, getter='get_mac_address_table').splitlines()
+        else:
+            pushdown = cmd
+            if self.filter_pushdown:
+                pushdown = _mac_address_table_command(vlan, interface, mac)
+            if pushdown == cmd:
+                lines = self._iter_command_lines(cmd)
             else:
-                raise ValueError(
-                    "Unexpected output from: {}".format(line.split()))
+                lines = self._iter_pushdown_lines(pushdown, cmd)
+        return parsers.parse_mac_address_table(lines, vlan=vlan,
+                                               interface=interface,
+                                               mac_address=mac)
+
+    def _iter_pushdown_lines(self, cmd, fallback):
+        """
+        Yield the lines of the filtered MAC table cmd as they stream in.
 
-        return mac_address_table
-            
+        The switch rejects a filter it does not support before the table
+        header; the lines up to the header are held back, and on a
+        rejection the unfiltered fallback is streamed instead and the
+        filters are no longer passed down on this session.
+        """
+        lines = self._iter_command_lines(cmd)
+        held = []
+        rejected = False
+        try:
+            for line in lines:
+                if REJECTED in line:
+                    rejected = True
+                    break
+                held.append(line)
+                if parsers.MAC_HEADER.match(line):
+                    break
+            if rejected:
+                lines.close()
+                self.filter_pushdown = False
+                lines = self._iter_command_lines(fallback)
+                held = []
+
+            for line in held:
+                yield line
+            for line in lines:
+                yield line
+        finally:
+            lines.close()
+
+    def get_snapshot(self, getters=None):
+        """
+        Collect several getters in one pass and return a Snapshot.
+
+        getters defaults to every getter of SNAPSHOT_COMMANDS.  The CLI
+        commands of all of them are planned up front, each command once,
+        and sent as one batch; the getters then run concurrently on the
+        collected outputs.  A failing getter, including one whose command
+        the switch rejects, is reported in Snapshot.errors and does not fail
+        the others.  Timings are kept for the collection ('collect') and
+        for every getter.
+        """
+        getters = list(getters or SNAPSHOT_COMMANDS)
+        unknown = set(getters) - set(SNAPSHOT_COMMANDS)
+        if unknown:
+            raise ValueError("Unknown snapshot getters: %s"
+                             % ', '.join(sorted(unknown)))
+
+        cli_getters = [getter for getter in getters
+                       if self.netconf is None or
+                       getter not in NETCONF_GETTERS]
+        commands = plan(cli_getters, SNAPSHOT_COMMANDS)
+        snapshot = Snapshot(self.hostname, commands)
+
+        start = time.time()
+        outputs = self._send_commands(commands, getter='get_snapshot')
+        snapshot.timings['collect'] = time.time() - start
+
+        def run(getter):
+            start = time.time()
+            try:
+                result, error = getattr(self, getter)(), None
+            except Exception as e:
+                result, error = None, e
+            return result, error, time.time() - start
+
+        self._prefetched = dict(zip(commands, outputs))
+        pool = ThreadPool(len(getters))
+        try:
+            results = pool.map(run, getters)
+        finally:
+            pool.close()
+            self._prefetched = None
+
+        for getter, (result, error, elapsed) in zip(getters, results):
+            snapshot.timings[getter] = elapsed
+            if error is None:
+                snapshot.sections[getter] = result
+            else:
+                snapshot.errors[getter] = error
+        return snapshot
+
+    def get_mac_address_table(self, compact=False, vlan=None,
+                              interface=None, mac=None):
+        """
+        Get mac address table.
+
+        With compact=True a MacTable is returned instead of a list of
+        dicts; its to_dicts() gives back the NAPALM format.  'moves' and
+        'last_move' are only known for a table tracked by
+        sync_mac_address_table().  vlan, interface and mac select the
+        entries, see iter_mac_address_table().
+        """
+        entries = self.iter_mac_address_table(vlan, interface, mac)
+        if compact:
+            return MacTable(entries)
+        to_dict = mac_entry_to_dict
+        if self.mac_tracker is not None:
+            to_dict = self.mac_tracker.to_dict
+        return [to_dict(entry) for entry in entries]
+
+    def sync_mac_address_table(self):
+        """
+        Poll the MAC address table and return what changed since the last
+        poll.
+
+        The previous table is kept in self.mac_tracker; see
+        MacTracker.update() for the format of the result.
+        """
+        if self.mac_tracker is None:
+            self.mac_tracker = MacTracker()
+        return self.mac_tracker.update(self.iter_mac_address_table())
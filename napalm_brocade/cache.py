@@ -0,0 +1,152 @@
+#
+# Copyright 2016 Shiv Haris, Brocade Communication Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.  You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Result cache for command output.
+
+Entries are keyed by host and command and expire after a TTL.  The
+in-memory cache is per process; SqliteResultCache can be shared between
+processes through a database file.
+"""
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+DEFAULT_TTL = 30
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class ResultCache(object):
+    """In-memory LRU cache of command output with per-entry TTL."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, default_ttl=DEFAULT_TTL,
+                 clock=time.time):
+        """CTOR for the cache."""
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, host, command):
+        """Return the cached output or None when missing or expired."""
+        key = (host, command)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or entry[1] <= self._clock():
+                self.misses += 1
+                return None
+            # Re-insert to mark the entry as most recently used
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[0]
+
+    def set(self, host, command, value, ttl=None):
+        """Store the output of command on host."""
+        if ttl is None:
+            ttl = self.default_ttl
+        key = (host, command)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, self._clock() + ttl)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, host=None):
+        """Drop every entry of host, or the whole cache if host is None."""
+        with self._lock:
+            if host is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[0] == host]:
+                del self._entries[key]
+
+    def stats(self):
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'entries': len(self._entries)}
+
+
+class SqliteResultCache(ResultCache):
+    """LRU cache of command output kept in a sqlite database file."""
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES,
+                 default_ttl=DEFAULT_TTL, clock=time.time):
+        """CTOR for the cache."""
+        super(SqliteResultCache, self).__init__(max_entries, default_ttl, clock)
+        self.path = path
+        with self._transaction() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS results ("
+                         "host TEXT, command TEXT, value TEXT, "
+                         "expires REAL, used REAL, "
+                         "PRIMARY KEY (host, command))")
+
+    @contextmanager
+    def _transaction(self):
+        """Open a connection, commit on success and close it."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, host, command):
+        """Return the cached output or None when missing or expired."""
+        now = self._clock()
+        with self._lock, self._transaction() as conn:
+            row = conn.execute("SELECT value, expires FROM results "
+                               "WHERE host = ? AND command = ?",
+                               (host, command)).fetchone()
+            if row is None or row[1] <= now:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE results SET used = ? "
+                         "WHERE host = ? AND command = ?", (now, host, command))
+            self.hits += 1
+            return row[0]
+
+    def set(self, host, command, value, ttl=None):
+        """Store the output of command on host."""
+        if ttl is None:
+            ttl = self.default_ttl
+        now = self._clock()
+        with self._lock, self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                         (host, command, value, now + ttl, now))
+            conn.execute("DELETE FROM results WHERE expires <= ?", (now,))
+            conn.execute("DELETE FROM results WHERE rowid IN ("
+                         "SELECT rowid FROM results ORDER BY used DESC "
+                         "LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    def invalidate(self, host=None):
+        """Drop every entry of host, or the whole cache if host is None."""
+        with self._lock, self._transaction() as conn:
+            if host is None:
+                conn.execute("DELETE FROM results")
+            else:
+                conn.execute("DELETE FROM results WHERE host = ?", (host,))
+
+    def stats(self):
+        """Return hit/miss counters and the current size."""
+        with self._lock, self._transaction() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries}
@@ -0,0 +1,117 @@
+#
+# Copyright 2016 Shiv Haris, Brocade Communication Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.  You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Local checkpoint history.
+
+Configs are stored content-addressed under objects/<hash>, so identical
+checkpoints of any switch share one file.  Every switch keeps a history
+per config name ('running', 'startup') listing the versions in order,
+along with the MD5 of the copy last made to the switch's flash.
+"""
+import os
+import tempfile
+import time
+
+from napalm_brocade.diff import config_hash
+
+DEFAULT_DIRECTORY = os.path.join('~', '.napalm_brocade', 'checkpoints')
+
+
+class CheckpointStore(object):
+    """Content-addressed, versioned store of config checkpoints."""
+
+    def __init__(self, directory=DEFAULT_DIRECTORY):
+        """CTOR for the store."""
+        self.directory = os.path.expanduser(directory)
+
+    def _object_path(self, version):
+        """Return the path of the object of version."""
+        return os.path.join(self.directory, 'objects', version)
+
+    def _history_path(self, hostname, name):
+        """Return the path of the history of name on hostname."""
+        return os.path.join(self.directory, hostname, '%s.history' % name)
+
+    def _flash_path(self, hostname, name):
+        """Return the path of the flash copy record of name on hostname."""
+        return os.path.join(self.directory, hostname, '%s.flash' % name)
+
+    @staticmethod
+    def _write(path, data):
+        """Write data to path atomically."""
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        fd, tmp = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.rename(tmp, path)
+
+    def save(self, hostname, text, name='running', timestamp=None):
+        """
+        Record text as the latest checkpoint of name on hostname.
+
+        Return the version (the content hash).  Nothing is written when
+        the content is already stored and is already the latest version.
+        """
+        version = config_hash(text)
+        if not os.path.exists(self._object_path(version)):
+            data = text if isinstance(text, bytes) else text.encode('utf-8')
+            self._write(self._object_path(version), data)
+
+        if self.latest(hostname, name) != version:
+            path = self._history_path(hostname, name)
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(path, 'a') as f:
+                f.write('%f %s\n' % (timestamp or time.time(), version))
+        return version
+
+    def history(self, hostname, name='running'):
+        """Return the (timestamp, version) checkpoints of name, oldest first."""
+        path = self._history_path(hostname, name)
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return [(float(timestamp), version) for timestamp, version
+                    in (line.split() for line in f if line.strip())]
+
+    def latest(self, hostname, name='running'):
+        """Return the latest version of name on hostname, or None."""
+        history = self.history(hostname, name)
+        return history[-1][1] if history else None
+
+    def load(self, version):
+        """Return the config stored as version."""
+        path = self._object_path(version)
+        if not os.path.exists(path):
+            raise KeyError("Unknown checkpoint version %s" % version)
+        with open(path, 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def record_flash(self, hostname, version, md5, name='running'):
+        """Record that version of name was copied to flash with md5."""
+        self._write(self._flash_path(hostname, name),
+                    ('%s %s\n' % (version, md5)).encode('utf-8'))
+
+    def flash(self, hostname, name='running'):
+        """Return the (version, md5) last copied to flash, or None."""
+        path = self._flash_path(hostname, name)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            version, md5 = f.read().split()
+        return version, md5
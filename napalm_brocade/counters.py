@@ -0,0 +1,103 @@
+#
+# Copyright 2016 Shiv Haris, Brocade Communication Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.  You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Interface counter sampling.
+
+CounterSampler keeps the last sample of every interface and turns a new
+get_interfaces_counters() table into integer counters, deltas and
+per-second rates, reporting only the interfaces whose counters moved.
+"""
+import time
+
+COUNTERS = ('pkts_rx', 'pkts_tx', 'err_rx', 'err_tx',
+            'discards_rx', 'discards_tx', 'crc_rx')
+
+
+class CounterSampler(object):
+    """Stateful sampler of interface counters."""
+
+    def __init__(self, counter_bits=64, clock=time.time):
+        """
+        CTOR for the sampler.
+
+        counter_bits is the width of the counters on the switch.  A counter
+        that goes backwards from the upper half of its range is taken to
+        have wrapped; from anywhere else it is taken to have been cleared.
+        """
+        self.modulus = 2 ** counter_bits
+        self._clock = clock
+        self._last = {}
+
+    def _delta(self, previous, current):
+        """Return the increase of a counter, handling wraps and clears."""
+        if current >= previous:
+            return current - previous
+        if previous >= self.modulus // 2:
+            return current + self.modulus - previous
+        # Cleared: everything counted since the clear is new
+        return current
+
+    def sample(self, counters_table, timestamp=None):
+        """
+        Record a get_interfaces_counters() table.
+
+        Return one entry per interface that is new or whose counters
+        changed since the last sample, with the keys 'interface_type',
+        'interface', 'counters' (integers), 'deltas' and 'rates' (per
+        second) and 'interval' (seconds).  deltas, rates and interval are
+        None for the first sample of an interface.
+        """
+        if timestamp is None:
+            timestamp = self._clock()
+
+        changed = []
+        for entry in counters_table:
+            key = (entry['interface_type'], entry['interface'])
+            counters = dict((name, int(entry[name]))
+                            for name in COUNTERS if name in entry)
+
+            last = self._last.get(key)
+            self._last[key] = (timestamp, counters)
+
+            result = {
+                'interface_type': entry['interface_type'],
+                'interface': entry['interface'],
+                'counters': counters,
+                'deltas': None,
+                'rates': None,
+                'interval': None,
+            }
+            if last is not None:
+                last_timestamp, last_counters = last
+                deltas = dict((name, self._delta(last_counters[name], value))
+                              for name, value in counters.items()
+                              if name in last_counters)
+                if not any(deltas.values()):
+                    continue
+                interval = timestamp - last_timestamp
+                result['deltas'] = deltas
+                result['interval'] = interval
+                result['rates'] = dict(
+                    (name, delta / float(interval) if interval > 0 else 0.0)
+                    for name, delta in deltas.items())
+
+            changed.append(result)
+
+        return changed
+
+    def reset(self):
+        """Forget every previous sample."""
+        self._last.clear()
@@ -0,0 +1,295 @@
+#
+# Copyright 2016 Shiv Haris, Brocade Communication Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.  You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Local config diff.
+
+Configs are parsed into a tree following the indentation of the SLX/NOS
+running-config (interface, vlan, rbridge-id ... blocks), so the diff is
+computed on the tree rather than on the order of the lines.  A line
+repeated among its siblings is kept as a separate node.  Parsed trees are
+cached by the hash of the config text.
+"""
+import difflib
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+ADDED = '+'
+REMOVED = '-'
+
+_HUNK_HEADER = re.compile(r'^@@ -(\d+)(,\d+)? \+(\d+)(,\d+)? @@$')
+
+_TREE_CACHE_SIZE = 8
+_tree_cache = OrderedDict()
+_tree_cache_lock = threading.Lock()
+
+
+def config_hash(text):
+    """Return the content hash of a config."""
+    if not isinstance(text, bytes):
+        text = text.encode('utf-8')
+    return hashlib.sha1(text).hexdigest()
+
+
+class Repeat(str):
+    """
+    A config line repeating an earlier sibling line.
+
+    It reads as the line itself but is a distinct key, the n-th repeat,
+    so repeated lines are neither collapsed nor matched with each other.
+    """
+
+    def __new__(cls, line, n):
+        """Build the n-th repeat of line."""
+        self = str.__new__(cls, line)
+        self.n = n
+        return self
+
+    def __eq__(self, other):
+        """Equal to the same repeat of the same line only."""
+        return str.__eq__(self, other) is True and \
+            getattr(other, 'n', 0) == self.n
+
+    def __ne__(self, other):
+        """Negation of __eq__, for Python 2."""
+        return not self == other
+
+    def __hash__(self):
+        """Hash of the line and its repeat count."""
+        return hash((str(self), self.n))
+
+
+def _build_tree(text):
+    """
+    Parse config text into nested OrderedDicts keyed by stripped line.
+
+    A line already present among its siblings is keyed as a Repeat.
+    """
+    root = OrderedDict()
+    # Stack of (indentation, children) for the blocks being parsed
+    stack = [(-1, root)]
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped == '!':
+            continue
+        indent = len(line) - len(line.lstrip())
+        while indent <= stack[-1][0]:
+            stack.pop()
+        siblings = stack[-1][1]
+        key, n = stripped, 0
+        while key in siblings:
+            n += 1
+            key = Repeat(stripped, n)
+        children = siblings[key] = OrderedDict()
+        stack.append((indent, children))
+    return root
+
+
+def parse_config(text):
+    """Return the config tree of text, reusing the tree of identical text."""
+    key = config_hash(text)
+    with _tree_cache_lock:
+        tree = _tree_cache.pop(key, None)
+        if tree is not None:
+            _tree_cache[key] = tree
+            return tree
+
+    tree = _build_tree(text)
+    with _tree_cache_lock:
+        _tree_cache[key] = tree
+        while len(_tree_cache) > _TREE_CACHE_SIZE:
+            _tree_cache.popitem(last=False)
+    return tree
+
+
+def diff_trees(running, candidate, path=()):
+    """
+    Return the minimal changes turning running into candidate.
+
+    Changes are (ADDED or REMOVED, path) tuples, path being the lines from
+    the top of the config down to the changed line.  A block that is
+    added or removed as a whole is reported once, by its first line.
+    """
+    changes = []
+    for line in running:
+        if line not in candidate:
+            changes.append((REMOVED, path + (line,)))
+    for line, children in candidate.items():
+        if line not in running:
+            changes.append((ADDED, path + (line,)))
+        elif children or running[line]:
+            changes.extend(diff_trees(running[line], children, path + (line,)))
+    return changes
+
+
+def merge_trees(running, candidate):
+    """Return the tree of running with candidate merged into it."""
+    merged = OrderedDict()
+    for line, children in running.items():
+        merged[line] = merge_trees(children, candidate.get(line, {}))
+    for line, children in candidate.items():
+        if line not in merged:
+            merged[line] = children
+    return merged
+
+
+def render(tree, indent=0):
+    """Render a tree back to config lines."""
+    lines = []
+    for line, children in tree.items():
+        lines.append(' ' * indent + line)
+        lines.extend(render(children, indent + 1))
+        if indent == 0 and children:
+            lines.append('!')
+    return lines
+
+
+def compare(running_text, candidate_text, merge=False):
+    """
+    Compare a candidate against the running config.
+
+    Return (changes, text): the structured changes from diff_trees() and
+    their unified diff from text_diff().  With merge=True the
+    candidate is merged into the running config first, as a merge commit
+    would do.
+    """
+    running = parse_config(running_text)
+    candidate = parse_config(candidate_text)
+    if merge:
+        candidate = merge_trees(running, candidate)
+
+    changes = diff_trees(running, candidate)
+    if not changes:
+        return changes, ''
+    return changes, text_diff(running, candidate, changes)
+
+
+def _size(tree):
+    """Return the number of lines render() gives for the children tree."""
+    return sum(1 + _size(children) for children in tree.values())
+
+
+def _offsets(tree):
+    """
+    Return the line offset of every top-level block in render(tree).
+
+    Return (offsets, total), total being the number of lines rendered.
+    """
+    offsets = {}
+    offset = 0
+    for line, children in tree.items():
+        offsets[line] = offset
+        # The block, its children and the '!' closing it
+        offset += 1 + _size(children) + (1 if children else 0)
+    return offsets, offset
+
+
+def _insertion_offsets(tree, offsets, total):
+    """
+    Return where the blocks of tree missing from another config would go.
+
+    offsets and total are the _offsets() of the other config; a missing
+    block goes before the next block of tree the other config has.
+    """
+    insertion = {}
+    for line in reversed(list(tree)):
+        if line in offsets:
+            total = offsets[line]
+        else:
+            insertion[line] = total
+    return insertion
+
+
+def text_diff(running, candidate, changes):
+    """
+    Return the unified diff of the top-level blocks touched by changes.
+
+    Only the changed blocks are rendered and diffed, which keeps large
+    configs cheap to compare; the hunk ranges are those of the whole
+    rendered configs, so the diff applies to render(running).
+    """
+    old_offsets, old_total = _offsets(running)
+    new_offsets, new_total = _offsets(candidate)
+    old_offsets.update(_insertion_offsets(candidate, old_offsets, old_total))
+    new_offsets.update(_insertion_offsets(running, new_offsets, new_total))
+
+    hunks = []
+    for block in OrderedDict((path[0], None) for _, path in changes):
+        old = render({block: running[block]}) if block in running else []
+        new = render({block: candidate[block]}) if block in candidate else []
+        old_start, new_start = old_offsets[block], new_offsets[block]
+        lines = []
+        # Skip the file headers of difflib
+        for line in list(difflib.unified_diff(old, new, lineterm=''))[2:]:
+            match = _HUNK_HEADER.match(line)
+            if match:
+                line = '@@ -%d%s +%d%s @@' % (
+                    int(match.group(1)) + old_start, match.group(2) or '',
+                    int(match.group(3)) + new_start, match.group(4) or '')
+            lines.append(line)
+        hunks.append(((old_start, new_start), lines))
+
+    lines = ['--- running-config', '+++ candidate']
+    for _, hunk in sorted(hunks, key=lambda hunk: hunk[0]):
+        lines.extend(hunk)
+    return '\n'.join(lines)
+
+
+def negate(line):
+    """Return the command undoing a config line."""
+    if line.startswith('no '):
+        return line[3:]
+    return 'no ' + line
+
+
+def _enter(tree):
+    """Return the commands entering every line of tree, exiting blocks."""
+    commands = []
+    for line, children in tree.items():
+        commands.append(line)
+        if children:
+            commands.extend(_enter(children))
+            commands.append('exit')
+    return commands
+
+
+def commands(running, target):
+    """
+    Return the config-mode commands turning running into target.
+
+    Removed lines are negated and added blocks are entered whole.  Changes
+    below the top level are preceded by their parent lines and followed
+    by an 'exit' per level, so the commands can be sent as one config set.
+    A removed 'no X' replaced by 'X' is only sent once, as 'X'.
+    """
+    changes = diff_trees(running, target)
+    added = set(path for op, path in changes if op == ADDED)
+    result = []
+    for op, path in changes:
+        parents, line = path[:-1], path[-1]
+        if op == REMOVED and parents + (negate(line),) in added:
+            continue
+        result.extend(parents)
+        if op == REMOVED:
+            result.append(negate(line))
+        else:
+            node = target
+            for parent in parents:
+                node = node[parent]
+            result.extend(_enter(OrderedDict([(line, node[line])])))
+        result.extend(['exit'] * len(parents))
+    return result
@@ -0,0 +1,279 @@
+#
+# Copyright 2016 Shiv Haris, Brocade Communication Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.  You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Columnar export of getter results.
+
+ColumnarWriter appends the results of get_arp_table(),
+get_mac_address_table(), get_interfaces_counters() and get_interfaces()
+of one or many switches to a Parquet or Feather (Arrow IPC) file.  Rows
+are buffered column by column and written out as Arrow record batches of
+batch_size rows, so memory stays bounded however many switches are
+exported.  MACs and IPv4 addresses are stored as integers and repeated
+strings (hostnames, interface names, types) are dictionary encoded.
+
+The conversion to rows (rows()) is plain Python; writing requires pyarrow.
+"""
+import socket
+import time
+
+from napalm_brocade.counters import COUNTERS
+from napalm_brocade.records import _Strings, ip_to_int, mac_to_int
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+FORMATS = ('parquet', 'feather')
+DEFAULT_BATCH_SIZE = 65536
+
+# Column names and types of each getter, after the hostname and timestamp
+# columns every table starts with.  'dictionary' is a dictionary encoded
+# string.
+COLUMNS = {
+    'get_arp_table': (
+        ('interface', 'dictionary'),
+        ('mac', 'uint64'),
+        ('ip', 'uint32'),
+        ('type', 'dictionary'),
+        ('age', 'float64'),
+    ),
+    'get_mac_address_table': (
+        ('mac', 'uint64'),
+        ('interface', 'dictionary'),
+        ('vlan', 'uint16'),
+        ('static', 'bool'),
+        ('active', 'bool'),
+        ('moves', 'int32'),
+        ('last_move', 'float64'),
+    ),
+    'get_interfaces_counters': (
+        ('interface_type', 'dictionary'),
+        ('interface', 'dictionary'),
+    ) + tuple((name, 'int64') for name in COUNTERS),
+    'get_interfaces': (
+        ('interface', 'dictionary'),
+        ('interface_type', 'dictionary'),
+        ('ip_address', 'uint32'),
+        ('is_enabled', 'bool'),
+        ('is_up', 'bool'),
+    ),
+}
+
+_HEADER = (('hostname', 'dictionary'), ('timestamp', 'timestamp'))
+
+
+def _ip(value):
+    """Return an IPv4 address as an integer, None when unassigned."""
+    try:
+        return ip_to_int(value)
+    except (socket.error, ValueError, TypeError):
+        return None
+
+
+def _arp_rows(result):
+    """Rows of get_arp_table()."""
+    for entry in result:
+        yield (entry['interface'], mac_to_int(entry['mac']),
+               ip_to_int(entry['ip']), entry['type'], float(entry['age']))
+
+
+def _mac_rows(result):
+    """Rows of get_mac_address_table()."""
+    for entry in result:
+        yield (mac_to_int(entry['mac']), entry['interface'], entry['vlan'],
+               entry['static'], entry['active'], entry.get('moves', -1),
+               entry.get('last_move', 0.0))
+
+
+def _counter_rows(result):
+    """Rows of get_interfaces_counters()."""
+    for entry in result:
+        yield (entry['interface_type'], entry['interface']) + tuple(
+            int(entry[name]) if name in entry else None
+            for name in COUNTERS)
+
+
+def _interface_rows(result):
+    """Rows of get_interfaces(), sorted by interface."""
+    for name in sorted(result):
+        interface = result[name]
+        yield (name, interface['interface_type'],
+               _ip(interface['ip_address']), interface['is_enabled'],
+               interface['is_up'])
+
+
+_ROWS = {
+    'get_arp_table': _arp_rows,
+    'get_mac_address_table': _mac_rows,
+    'get_interfaces_counters': _counter_rows,
+    'get_interfaces': _interface_rows,
+}
+
+
+def rows(getter, result):
+    """
+    Yield the result of getter as tuples in the order of COLUMNS[getter].
+
+    Compact tables (get_mac_address_table(compact=True)) are accepted too.
+    """
+    if getter not in _ROWS:
+        raise ValueError("Cannot export %s, only %s" %
+                         (getter, ', '.join(sorted(_ROWS))))
+    if hasattr(result, 'to_dicts'):
+        result = result.to_dicts()
+    return _ROWS[getter](result)
+
+
+def _arrow_type(kind):
+    """Return the Arrow type of a column kind."""
+    if kind == 'dictionary':
+        return pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+    if kind == 'timestamp':
+        return pyarrow.timestamp('us', tz='UTC')
+    if kind == 'bool':
+        return pyarrow.bool_()
+    return getattr(pyarrow, kind)()
+
+
+def schema(getter):
+    """Return the Arrow schema of the export of getter."""
+    if pyarrow is None:
+        raise RuntimeError("Columnar export requires pyarrow")
+    return pyarrow.schema([(name, _arrow_type(kind))
+                           for name, kind in _HEADER + COLUMNS[getter]])
+
+
+class ColumnarWriter(object):
+    """Streaming writer of the results of one getter."""
+
+    def __init__(self, path, getter, format='parquet',
+                 batch_size=DEFAULT_BATCH_SIZE, compression=None):
+        """
+        CTOR for the writer.
+
+        format is 'parquet' or 'feather'.  compression defaults to the
+        pyarrow default of the format.
+        """
+        if format not in FORMATS:
+            raise ValueError("Unknown format %s, use one of %s" %
+                             (format, ', '.join(FORMATS)))
+        self.getter = getter
+        self.schema = schema(getter)
+        self.batch_size = batch_size
+        self.rows = 0
+
+        self._kinds = [kind for _, kind in _HEADER + COLUMNS[getter]]
+        self._columns = [[] for _ in self._kinds]
+        # One intern table per dictionary column for the whole file, so
+        # every batch only extends the dictionary of the previous one
+        self._strings = [_Strings() if kind == 'dictionary' else None
+                         for kind in self._kinds]
+
+        if format == 'parquet':
+            kwargs = {} if compression is None else \
+                {'compression': compression}
+            self._writer = pyarrow.parquet.ParquetWriter(path, self.schema,
+                                                         **kwargs)
+        else:
+            options = pyarrow.ipc.IpcWriteOptions(
+                compression=compression, emit_dictionary_deltas=True)
+            self._writer = pyarrow.ipc.new_file(path, self.schema,
+                                                options=options)
+
+    def write(self, hostname, result, timestamp=None):
+        """Append the result of the getter on hostname, polled at timestamp."""
+        if timestamp is None:
+            timestamp = time.time()
+        header = (hostname, int(timestamp * 1000000))
+        columns = self._columns
+        count = 0
+        for row in rows(self.getter, result):
+            for column, value in zip(columns, header + row):
+                column.append(value)
+            count += 1
+            if len(columns[0]) >= self.batch_size:
+                self.flush()
+        self.rows += count
+        return count
+
+    def write_fleet(self, fleet_results, timestamp=None):
+        """
+        Append the results of the getter in fleet_results.
+
+        fleet_results are FleetResult, from BrocadeFleet.poll() or the
+        values of BrocadeFleet.poll_all(); hosts where the getter failed
+        are skipped.
+        """
+        if isinstance(fleet_results, dict):
+            fleet_results = fleet_results.values()
+        count = 0
+        for fleet_result in fleet_results:
+            if self.getter in fleet_result.results:
+                count += self.write(fleet_result.hostname,
+                                    fleet_result.results[self.getter],
+                                    timestamp)
+        return count
+
+    def _array(self, index, values):
+        """Return the Arrow array of a buffered column."""
+        field = self.schema.field(index)
+        strings = self._strings[index]
+        if strings is None:
+            return pyarrow.array(values, type=field.type)
+        indices = pyarrow.array([strings.index(value) for value in values],
+                                type=pyarrow.int32())
+        return pyarrow.DictionaryArray.from_arrays(
+            indices, pyarrow.array(strings.names, type=pyarrow.string()))
+
+    def flush(self):
+        """Write the buffered rows as one record batch."""
+        if not self._columns[0]:
+            return
+        batch = pyarrow.RecordBatch.from_arrays(
+            [self._array(index, values)
+             for index, values in enumerate(self._columns)],
+            schema=self.schema)
+        self._writer.write_batch(batch)
+        for column in self._columns:
+            del column[:]
+
+    def close(self):
+        """Flush the buffered rows and finish the file."""
+        self.flush()
+        self._writer.close()
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Context manager exit, closes the file."""
+        self.close()
+
+
+def export(path, getter, results, timestamp=None, **kwargs):
+    """
+    Write results, a dict of getter results by hostname, to path.
+
+    kwargs are passed to ColumnarWriter.  Return the number of rows.
+    """
+    with ColumnarWriter(path, getter, **kwargs) as writer:
+        for hostname, result in sorted(results.items()):
+            writer.write(hostname, result, timestamp)
+    return writer.rows
@@ -0,0 +1,177 @@
+#
+# Copyright 2016 Shiv Haris, Brocade Communication Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.  You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Fleet poller.
+
+Run BrocadeDriver getters against many switches concurrently.
+"""
+import threading
+import time
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from napalm_base.exceptions import CommandTimeoutException
+
+
+class FleetResult(object):
+    """Outcome of polling a single host."""
+
+    def __init__(self, hostname):
+        """CTOR for the result."""
+        self.hostname = hostname
+        self.results = {}
+        self.errors = {}
+        self.elapsed = None
+
+    @property
+    def ok(self):
+        """True when every getter returned without an error."""
+        return not self.errors
+
+    def __repr__(self):
+        """Representation for logs."""
+        return "<FleetResult %s ok=%s elapsed=%s>" % (
+            self.hostname, self.ok, self.elapsed)
+
+
+class BrocadeFleet(object):
+    """Poll a list of getters across an inventory of switches."""
+
+    def __init__(self, inventory, getters, max_workers=32, host_timeout=300,
+                 timeout=60, driver_class=None):
+        """
+        CTOR for the fleet.
+
+        inventory is a list of dicts with the keys 'hostname', 'username',
+        'password' and optionally 'timeout' and 'optional_args'.
+        getters is a list of driver method names, e.g. ['get_facts'].
+        host_timeout bounds the time spent on one host, connection included.
+        """
+        if driver_class is None:
+            from napalm_brocade.brocade import BrocadeDriver
+            driver_class = BrocadeDriver
+
+        self.inventory = list(inventory)
+        self.getters = list(getters)
+        self.max_workers = max_workers
+        self.host_timeout = host_timeout
+        self.timeout = timeout
+        self.driver_class = driver_class
+
+    def poll(self):
+        """
+        Poll every host and yield a FleetResult as each one completes.
+
+        At most max_workers hosts are polled at a time.  Hosts that exceed
+        host_timeout are reported with a CommandTimeoutException under the
+        'timeout' key of their errors.  Their worker thread is abandoned,
+        its late result discarded, and a new worker takes the next host,
+        so hung hosts never hold back the rest of the inventory.
+        """
+        if not self.inventory:
+            return
+
+        done = queue.Queue()
+        waiting = list(self.inventory)
+        started = {}
+        pending = set(host['hostname'] for host in self.inventory)
+
+        def start_next():
+            if not waiting:
+                return
+            host = waiting.pop(0)
+            start = started[host['hostname']] = time.time()
+            worker = threading.Thread(
+                target=lambda: done.put(self._poll_host(host, start)))
+            worker.daemon = True
+            worker.start()
+
+        for _ in range(min(self.max_workers, len(self.inventory))):
+            start_next()
+
+        while pending:
+            try:
+                result = done.get(timeout=self._wait_time(started, pending))
+            except queue.Empty:
+                for result in self._expire(started, pending):
+                    start_next()
+                    yield result
+                continue
+
+            if result.hostname in pending:
+                pending.discard(result.hostname)
+                start_next()
+                yield result
+
+    def poll_all(self):
+        """Poll every host and return a dict of FleetResult by hostname."""
+        return dict((result.hostname, result) for result in self.poll())
+
+    def _wait_time(self, started, pending):
+        """Seconds until the earliest running host hits host_timeout."""
+        deadlines = [started[hostname] + self.host_timeout
+                     for hostname in pending if hostname in started]
+        if not deadlines:
+            return self.host_timeout
+        return max(min(deadlines) - time.time(), 0)
+
+    def _expire(self, started, pending):
+        """Build timeout results for hosts past their deadline."""
+        now = time.time()
+        for hostname in list(pending):
+            start = started.get(hostname)
+            if start is None or now - start < self.host_timeout:
+                continue
+            pending.discard(hostname)
+            result = FleetResult(hostname)
+            result.errors['timeout'] = CommandTimeoutException(
+                "Timed out polling %s after %ss" % (hostname, self.host_timeout))
+            result.elapsed = now - start
+            yield result
+
+    def _poll_host(self, host, start):
+        """Open a session to one host, run the getters and close it."""
+        hostname = host['hostname']
+        result = FleetResult(hostname)
+
+        try:
+            device = self.driver_class(
+                hostname, host.get('username'), host.get('password'),
+                timeout=host.get('timeout', self.timeout),
+                optional_args=host.get('optional_args'))
+            device.open()
+        except Exception as e:
+            result.errors['open'] = e
+            result.elapsed = time.time() - start
+            return result
+
+        try:
+            for getter in self.getters:
+                try:
+                    result.results[getter] = getattr(device, getter)()
+                except Exception as e:
+                    result.errors[getter] = e
+        finally:
+            try:
+                device.close()
+            except Exception:
+                pass
+
+        result.elapsed = time.time() - start
+        return result
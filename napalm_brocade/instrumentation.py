@@ -0,0 +1,243 @@
+#
+# Copyright 2016 Shiv Haris, Brocade Communication Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.  You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Instrumentation of the device interactions.
+
+The driver times every interaction in a Span: 'connect', 'command' (from
+the write to the last byte read, with the time of the first byte and the
+byte count), 'upload' (a file copied to flash) and 'parse'.  Finished spans are handed to the hooks of the
+driver's Instrumentation; Metrics and StatsdHook are ready-made hooks.
+"""
+import bisect
+import logging
+import re
+import socket
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+log = logging.getLogger(__name__)
+
+# Upper bounds, in seconds, of the span duration histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0)
+
+
+# Arguments of a command that vary per call, and what they stand for in
+# the command template
+_ARGUMENTS = (
+    (re.compile(r'\b(?:[0-9a-fA-F]{4}\.){2}[0-9a-fA-F]{4}\b|'
+                r'\b(?:[0-9a-fA-F]{2}[:-]){5}[0-9a-fA-F]{2}\b'), '<mac>'),
+    (re.compile(r'\b\d{1,3}(?:\.\d{1,3}){3}(?:/\d+)?\b'), '<ip>'),
+    (re.compile(r'\b\d+(?:/\d+)+\b'), '<port>'),
+    (re.compile(r'\b\d+\b'), '<n>'),
+)
+
+
+def command_template(command):
+    """
+    Return command with its addresses, ports and numbers replaced.
+
+    e.g. 'show arp ip 10.0.0.1' gives 'show arp ip <ip>'; the commands of
+    a batch, joined by '; ', are templated one by one and each template
+    is kept once.
+    """
+    templates = []
+    for part in command.split('; '):
+        for pattern, placeholder in _ARGUMENTS:
+            part = pattern.sub(placeholder, part)
+        if part not in templates:
+            templates.append(part)
+    return '; '.join(templates)
+
+
+class Span(object):
+    """Timing of one interaction with a switch."""
+
+    __slots__ = ('name', 'hostname', 'attrs', 'start', 'end', 'first_byte',
+                 'bytes', 'error')
+
+    def __init__(self, name, hostname, attrs, start):
+        """CTOR for the span."""
+        self.name = name
+        self.hostname = hostname
+        self.attrs = attrs
+        self.start = start
+        self.end = None
+        self.first_byte = None
+        self.bytes = 0
+        self.error = None
+
+    @property
+    def duration(self):
+        """Seconds from start to end."""
+        return self.end - self.start
+
+    @property
+    def time_to_first_byte(self):
+        """Seconds from start to the first byte read, or None."""
+        if self.first_byte is None:
+            return None
+        return self.first_byte - self.start
+
+    def received(self, data, now):
+        """Account for data read at now."""
+        if data:
+            if self.first_byte is None:
+                self.first_byte = now
+            self.bytes += len(data)
+
+    def __repr__(self):
+        """Representation for logs."""
+        return "<Span %s %s %.3fs %dB>" % (self.name, self.hostname,
+                                           self.duration, self.bytes)
+
+
+class Instrumentation(object):
+    """Creates spans and hands the finished ones to the hooks."""
+
+    def __init__(self, hooks=None, clock=time.time):
+        """CTOR for the instrumentation; hooks are callables taking a Span."""
+        self.hooks = list(hooks or [])
+        self.clock = clock
+
+    def add_hook(self, hook):
+        """Call hook with every finished span."""
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """Stop calling hook."""
+        self.hooks.remove(hook)
+
+    @contextmanager
+    def span(self, name, hostname, **attrs):
+        """Time the body of the with statement as a span."""
+        span = Span(name, hostname, attrs, self.clock())
+        try:
+            yield span
+        except Exception as e:
+            span.error = e
+            raise
+        finally:
+            span.end = self.clock()
+            for hook in self.hooks:
+                try:
+                    hook(span)
+                except Exception:
+                    log.exception("Instrumentation hook %r failed", hook)
+
+
+def format_labels(labels):
+    """Render a label tuple in the Prometheus text format."""
+    if not labels:
+        return ''
+    return '{%s}' % ','.join('%s="%s"' % (k, str(v).replace('"', '\\"'))
+                             for k, v in labels)
+
+
+class Metrics(object):
+    """
+    Hook keeping Prometheus style counters and histograms of the spans.
+
+    Spans are counted and their durations observed per span name, host,
+    getter and command template, see command_template(), so that the
+    series do not grow with every address looked up; render() returns the
+    Prometheus text format.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix='napalm_brocade'):
+        """CTOR for the metrics."""
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, span):
+        """Record span."""
+        labels = [('span', span.name), ('host', span.hostname)]
+        if span.attrs.get('command') is not None:
+            labels.append(('command',
+                           command_template(span.attrs['command'])))
+        if span.attrs.get('getter') is not None:
+            labels.append(('getter', span.attrs['getter']))
+        labels = tuple(labels)
+
+        with self._lock:
+            self.counters[('spans_total', labels)] += 1
+            if span.error is not None:
+                self.counters[('errors_total', labels)] += 1
+            if span.bytes:
+                self.counters[('bytes_total', labels)] += span.bytes
+            self._observe('span_seconds', labels, span.duration)
+            if span.first_byte is not None:
+                self._observe('first_byte_seconds', labels,
+                              span.time_to_first_byte)
+
+    def _observe(self, name, labels, value):
+        """Add value to histogram name."""
+        key = (name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = \
+                [[0] * (len(self.buckets) + 1), 0.0]
+        histogram[0][bisect.bisect_left(self.buckets, value)] += 1
+        histogram[1] += value
+
+    def render(self):
+        """Return the metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                lines.append('%s_%s%s %s' % (self.prefix, name,
+                                             format_labels(labels),
+                                             repr(value)))
+            for (name, labels), (counts, total) in \
+                    sorted(self.histograms.items()):
+                metric = '%s_%s' % (self.prefix, name)
+                cumulative = 0
+                for bound, count in zip(self.buckets + ('+Inf',), counts):
+                    cumulative += count
+                    lines.append('%s_bucket%s %d' % (
+                        metric, format_labels(labels + (('le', bound),)),
+                        cumulative))
+                lines.append('%s_sum%s %s' % (metric, format_labels(labels),
+                                              repr(total)))
+                lines.append('%s_count%s %d' % (metric, format_labels(labels),
+                                                cumulative))
+        return '\n'.join(lines) + '\n'
+
+
+class StatsdHook(object):
+    """Hook sending span timings and byte counts to statsd over UDP."""
+
+    def __init__(self, host='127.0.0.1', port=8125, prefix='napalm_brocade'):
+        """CTOR for the hook."""
+        self.address = (host, port)
+        self.prefix = prefix
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def __call__(self, span):
+        """Send span."""
+        name = '%s.%s.%s' % (self.prefix, span.name,
+                             span.hostname.replace('.', '_'))
+        packets = ['%s:%d|ms' % (name, span.duration * 1000)]
+        if span.bytes:
+            packets.append('%s.bytes:%d|c' % (name, span.bytes))
+        if span.error is not None:
+            packets.append('%s.errors:1|c' % name)
+        self.socket.sendto('\n'.join(packets).encode('ascii'), self.address)
@@ -0,0 +1,179 @@
+#
+# Copyright 2016 Shiv Haris, Brocade Communication Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.  You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+NETCONF transport for the bulk getters.
+
+Uses the operational RPCs of SLX and NOS (get-vlan-brief, get-ip-interface,
+get-arp, get-mac-address-table).  Large tables are fetched page by page
+while the switch reports has-more.  ncclient hands over each reply page
+whole, so a page is held in memory at once; it is decoded with
+iterparse, clearing every row once converted, which only spares building
+the full tree of the page.  Requires ncclient.
+"""
+from io import BytesIO
+from xml.etree.ElementTree import iterparse
+
+from napalm_base.exceptions import CommandErrorException, \
+    ConnectionException
+
+from napalm_brocade import parsers
+from napalm_brocade.records import ArpEntry, MacEntry
+
+INTERFACE_EXT_NS = 'urn:brocade.com:mgmt:brocade-interface-ext'
+ARP_NS = 'urn:brocade.com:mgmt:brocade-arp'
+MAC_NS = 'urn:brocade.com:mgmt:brocade-mac-address-table'
+
+DEFAULT_PORT = 830
+
+
+def _local(tag):
+    """Strip the namespace of an element tag."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _fields(element):
+    """Return the leaves below element as a dict keyed by local tag."""
+    fields = {}
+    for child in element.iter():
+        if len(child) == 0 and child is not element:
+            fields.setdefault(_local(child.tag), (child.text or '').strip())
+    return fields
+
+
+def connect(hostname, port, username, password, timeout):
+    """Open a NETCONF session and return a NetconfTransport."""
+    try:
+        from ncclient import manager
+        from ncclient.xml_ import to_ele
+    except ImportError:
+        raise ConnectionException("transport 'netconf' requires ncclient")
+
+    try:
+        session = manager.connect(host=hostname, port=port,
+                                  username=username, password=password,
+                                  timeout=timeout, hostkey_verify=False,
+                                  device_params={'name': 'default'})
+    except Exception:
+        raise ConnectionException("Cannot connect to switch: %s:%s"
+                                  % (hostname, port))
+    return NetconfTransport(session, to_ele)
+
+
+class NetconfTransport(object):
+    """Structured retrieval of operational tables over NETCONF."""
+
+    def __init__(self, manager, to_ele):
+        """
+        CTOR for the transport.
+
+        manager is an ncclient Manager and to_ele turns a request string
+        into the element Manager.dispatch() expects.
+        """
+        self.manager = manager
+        self._to_ele = to_ele
+
+    def close(self):
+        """Close the NETCONF session."""
+        self.manager.close_session()
+
+    def _paged(self, rpc, namespace, row_tag, page_request=''):
+        """
+        Yield the rows of rpc as dicts of leaves, page after page.
+
+        page_request is formatted with the fields of the last row received
+        to ask for the next page.  CommandErrorException is raised when the
+        switch has more rows than can be asked for, rather than returning
+        a truncated table.
+        """
+        request = ''
+        while True:
+            xml = '<%s xmlns="%s">%s</%s>' % (rpc, namespace, request, rpc)
+            reply = self.manager.dispatch(self._to_ele(xml))
+            data = reply.xml
+            if not isinstance(data, bytes):
+                data = data.encode('utf-8')
+
+            last = None
+            has_more = False
+            for _, element in iterparse(BytesIO(data)):
+                tag = _local(element.tag)
+                if tag == row_tag:
+                    last = _fields(element)
+                    yield last
+                    element.clear()
+                elif tag == 'has-more':
+                    has_more = (element.text or '').strip() == 'true'
+
+            if not has_more:
+                return
+            if last is None or not page_request:
+                raise CommandErrorException(
+                    "%s has more rows but no page to ask for them" % rpc)
+            request = page_request.format(**dict(
+                (key.replace('-', '_'), value) for key, value in last.items()))
+
+    def iter_vlans(self):
+        """Yield the VLAN table in the get_vlan_table format."""
+        for row in self._paged('get-vlan-brief', INTERFACE_EXT_NS, 'vlan',
+                               '<last-rcvd-vlan-id>{vlan_id}'
+                               '</last-rcvd-vlan-id>'):
+            yield {'vlan': row['vlan-id'], 'name': row.get('vlan-name', '')}
+
+    def get_interfaces(self):
+        """Return the interfaces in the get_interfaces format."""
+        interface_list = {}
+        for row in self._paged('get-ip-interface', INTERFACE_EXT_NS,
+                               'interface',
+                               '<last-rcvd-interface>'
+                               '<interface-type>{interface_type}'
+                               '</interface-type>'
+                               '<interface-name>{interface_name}'
+                               '</interface-name>'
+                               '</last-rcvd-interface>'):
+            interface_list[row['interface-name']] = {
+                'is_up': 'up' in row.get('line-protocol-state', '').lower(),
+                'is_enabled': 'admin' not in row.get('if-state', '').lower(),
+                'interface_type': row['interface-type'],
+                'ip_address': row.get('ipv4', 'unassigned').split('/')[0],
+            }
+        return interface_list
+
+    def iter_arp(self):
+        """Yield the ARP table as ArpEntry records."""
+        for row in self._paged('get-arp', ARP_NS, 'arp-entry',
+                               '<last-rcvd-ip-address>{ip_address}'
+                               '</last-rcvd-ip-address>'):
+            interface = '%s %s' % (row.get('interface-type', ''),
+                                   row.get('interface-name', ''))
+            yield ArpEntry(ip=row['ip-address'],
+                           mac=parsers.mac(row['mac-address']),
+                           interface=interface.strip(),
+                           type=row.get('entry-type', ''),
+                           age=parsers.arp_age(row.get('age', '-')))
+
+    def iter_mac_address_table(self):
+        """Yield the MAC address table as MacEntry records."""
+        for row in self._paged('get-mac-address-table', MAC_NS,
+                               'mac-address-table',
+                               '<last-mac-address-details>'
+                               '<last-mac-address>{mac_address}'
+                               '</last-mac-address>'
+                               '</last-mac-address-details>'):
+            yield MacEntry(mac=parsers.mac(row['mac-address']),
+                           interface=row.get('interface-name', ''),
+                           vlan=int(row['vlanid']),
+                           static=row.get('mac-type', '').lower() == 'static',
+                           active=row.get('mac-state', '').lower() != 'inactive')
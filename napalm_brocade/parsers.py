@@ -0,0 +1,414 @@
+#
+# Copyright 2016 Shiv Haris, Brocade Communication Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.  You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Parsers for SLX and NOS CLI output.
+
+Every parser makes a single pass over the output with patterns compiled
+once at import time.  Lines that match neither a header, a trailer nor a
+row raise ParseError instead of being skipped, so a change in the CLI
+format shows up as an error rather than as an empty result.
+"""
+import re
+
+from napalm_brocade.records import ArpEntry, MacEntry, arp_entry_to_dict
+
+
+class ParseError(ValueError):
+    """CLI output does not have the expected format."""
+
+
+_MAC_SEPARATORS = re.compile(r'[.:-]')
+_MAC_HEX = re.compile(r'^[0-9a-fA-F]{12}$')
+
+_KEY_VALUE = re.compile(r'^\s*([^:]+?)\s*:\s*(.*?)\s*$')
+_SEPARATOR = re.compile(r'^[\s=-]+$')
+
+_FAN = re.compile(r'^Fan (.*) is (.*),.*$')
+_POWER = re.compile(r'^Power Supply #(.*) is (.*)$')
+_TEMP = re.compile(r'^\s*(\S+)\s+(\S+)\s+(\d+)\s+(\d+)\s*$')
+_CPU = re.compile(r'One minute:\s*([\d.]+)%')
+_MEMORY_TOTAL = re.compile(r'Total\s*Memory:\s*(\d+)\s*KB', re.IGNORECASE)
+_MEMORY_USED = re.compile(r'Total Used:\s*(\d+)\s*KB', re.IGNORECASE)
+
+_VLAN = re.compile(r'^(\d+)(?:\(\w\))?\s+(\S+)')
+
+_ARP = re.compile(r'^(\S+)\s+(\S+)\s+(\S+(?: \d\S*)?)\s+(\S+)\s+(\S+)\s+(\S+)\s*$')
+_ARP_TRAILER = re.compile(r'^(Total|Entries)\b')
+_AGE = re.compile(r'^(\d+):(\d+):(\d+)$')
+
+_IP_INTERFACE = re.compile(r'^(\S+)\s+(\S+)\s+(\S+)\s+(?:(\S+)\s+)??'
+                           r'(administratively down|up|down)\s+(\S+)\s*$',
+                           re.IGNORECASE)
+
+_INTERFACE_STATS = re.compile(r'^(\S+)\s+(\S+)' + r'\s+(\d+)' * 7 + r'\s*$')
+
+MAC_HEADER = re.compile(r'^\s*VlanId')
+_MAC_TRAILER = re.compile(r'^\s*Total')
+
+# CLI keyword of the interface types, by the abbreviation shown in the
+# ARP and MAC tables
+INTERFACE_KEYWORDS = {
+    'eth': 'ethernet',
+    'gi': 'gigabitethernet',
+    'te': 'tengigabitethernet',
+    'fo': 'fortygigabitethernet',
+    'hu': 'hundredgigabitethernet',
+    'po': 'port-channel',
+    've': 've',
+}
+_INTERFACE_ABBREVIATIONS = dict((keyword, abbreviation) for abbreviation,
+                                keyword in INTERFACE_KEYWORDS.items())
+
+
+def mac(raw):
+    """Normalize a MAC address to the NAPALM format, e.g. 00:05:33:E5:D7:64."""
+    digits = _MAC_SEPARATORS.sub('', raw)
+    if not _MAC_HEX.match(digits):
+        raise ParseError("Invalid MAC address: {}".format(raw))
+    digits = digits.upper()
+    return ':'.join((digits[0:2], digits[2:4], digits[4:6],
+                     digits[6:8], digits[8:10], digits[10:12]))
+
+
+def cli_mac(raw):
+    """Return a MAC address in the CLI format, e.g. 0005.33e5.d764."""
+    digits = mac(raw).replace(':', '').lower()
+    return '.'.join((digits[0:4], digits[4:8], digits[8:12]))
+
+
+def split_interface(interface):
+    """
+    Split an interface name into the abbreviation of its type and its port.
+
+    'Te 1/0/1' and 'TenGigabitEthernet 1/0/1' both give ('te', '1/0/1');
+    the type of a bare port, e.g. '1/0/1', is None.
+    """
+    fields = interface.split()
+    if len(fields) != 2:
+        return None, interface.strip()
+    interface_type = fields[0].lower()
+    return (_INTERFACE_ABBREVIATIONS.get(interface_type, interface_type),
+            fields[1])
+
+
+def interface_matches(interface, name):
+    """
+    Tell whether the interface filter designates the interface name.
+
+    Both may be a bare port or a type and port, abbreviated or in full;
+    the types are only compared when both are known.
+    """
+    interface_type, port = split_interface(interface)
+    name_type, name_port = split_interface(name)
+    return port == name_port and (interface_type is None or
+                                  name_type is None or
+                                  interface_type == name_type)
+
+
+def _line_filter(conditions):
+    """
+    Compile a filter of raw table rows.
+
+    conditions are regexes that must all be found in a row, each as a
+    lookahead from the start of the line; None when there are none.  A
+    row that does not match is dropped before it is split or parsed.
+    """
+    if not conditions:
+        return None
+    return re.compile(''.join('(?=%s)' % condition
+                              for condition in conditions), re.IGNORECASE)
+
+
+def _rows(output, command, trailer=None):
+    """
+    Yield the lines following the header separator of a table.
+
+    Raise ParseError if the output has no separator line at all, unless
+    it is empty or holds nothing but trailer lines, as the output of a
+    filtered command that matched nothing does.
+    """
+    lines = iter(output.splitlines())
+    for line in lines:
+        if line.strip() and _SEPARATOR.match(line):
+            break
+    else:
+        if any(line.strip() and not (trailer and trailer.match(line))
+               for line in output.splitlines()):
+            raise ParseError("No table header in output of '%s'" % command)
+
+    for line in lines:
+        if line.strip():
+            yield line
+
+
+def parse_facts(output):
+    """Parse 'show system'."""
+    fact_table = {
+        "vendor": "Brocade",
+        "seriel_number": "xxxxx",
+    }
+
+    for line in output.splitlines():
+        match = _KEY_VALUE.match(line)
+        if not match:
+            continue
+
+        key, value = match.groups()
+        if key == 'Up Time':
+            fact_table["uptime"] = value[3:] if value.startswith('up ') \
+                else value
+        elif key.endswith(' Version'):
+            fact_table["model"] = key[:-len(' Version')]
+            fact_table["os_version"] = value
+        elif key == 'Management IP':
+            fact_table["hostname"] = value
+            fact_table["fqdn"] = value
+
+    if "os_version" not in fact_table:
+        raise ParseError("No version in output of 'show system'")
+
+    return fact_table
+
+
+def parse_environment_fan(output):
+    """Parse 'show environment fan'."""
+    fans = dict()
+    for line in output.splitlines():
+        match = _FAN.match(line)
+        if match:
+            fans[match.group(1)] = {'status': match.group(2) == "Ok"}
+        elif line.startswith('Fan '):
+            raise ParseError("Unexpected output from: {}".format(line))
+    if output.strip() and not fans:
+        raise ParseError("No fans in output of 'show environment fan'")
+    return fans
+
+
+def parse_environment_power(output):
+    """Parse 'show environment power'."""
+    powers = dict()
+    for line in output.splitlines():
+        match = _POWER.match(line)
+        if match:
+            powers[match.group(1)] = {'status': match.group(2) == "OK"}
+        elif line.startswith('Power Supply #'):
+            raise ParseError("Unexpected output from: {}".format(line))
+    if output.strip() and not powers:
+        raise ParseError("No power supplies in output of "
+                         "'show environment power'")
+    return powers
+
+
+def parse_environment_temp(output):
+    """Parse 'show environment temp'."""
+    temps = dict()
+    for line in _rows(output, 'show environment temp'):
+        match = _TEMP.match(line)
+        if not match:
+            raise ParseError("Unexpected output from: {}".format(line))
+        index, status, celsius, _ = match.groups()
+        temps[index] = {
+            'temperature': float(celsius),
+            'is_alert': status != "Ok",
+            'is_critical': status != "Ok",
+        }
+    return temps
+
+
+def parse_process_cpu(output):
+    """
+    Parse 'show process cpu'.
+
+    Return the one minute utilization in the NAPALM format, the switch
+    reporting a single figure for all its cores.
+    """
+    match = _CPU.search(output)
+    if not match:
+        raise ParseError("No CPU utilization in: {}".format(output[:80]))
+    return {0: {'%usage': float(match.group(1))}}
+
+
+def parse_process_memory(output):
+    """Parse 'show process memory summary' into RAM sizes in bytes."""
+    total = _MEMORY_TOTAL.search(output)
+    used = _MEMORY_USED.search(output)
+    if not total or not used:
+        raise ParseError("No memory summary in: {}".format(output[:80]))
+    return {
+        'available_ram': int(total.group(1)) * 1024,
+        'used_ram': int(used.group(1)) * 1024,
+    }
+
+
+def parse_vlan_brief(output):
+    """Parse 'show vlan brief'."""
+    vlan_table = []
+    for line in _rows(output, 'show vlan brief'):
+        if line[0].isspace():
+            # Continuation line with more member ports
+            continue
+        match = _VLAN.match(line)
+        if not match:
+            raise ParseError("Unexpected output from: {}".format(line))
+        vlan_table.append({'vlan': match.group(1), 'name': match.group(2)})
+    return vlan_table
+
+
+def arp_age(age):
+    """Convert an ARP age, '-' or hh:mm:ss or seconds, to seconds."""
+    if age == '-':
+        return 0.0
+    match = _AGE.match(age)
+    if match:
+        hours, minutes, seconds = match.groups()
+        return float(int(hours) * 3600 + int(minutes) * 60 + int(seconds))
+    try:
+        return float(age)
+    except ValueError:
+        raise ParseError("Unable to convert age value to float: {}".format(age))
+
+
+def iter_arp(output, ip=None, mac_address=None, interface=None):
+    """
+    Parse 'show arp' into ArpEntry records.
+
+    Rows are filtered on ip, mac_address (any format) and interface
+    (e.g. 'Ve 100' or 'TenGigabitEthernet 1/0/4'), first on the raw line
+    and then on the parsed fields.
+    """
+    conditions = []
+    if ip is not None:
+        conditions.append(r'\s*%s\s' % re.escape(ip))
+    if mac_address is not None:
+        mac_address = mac(mac_address)
+        conditions.append(r'\s*\S+\s+%s\s' % re.escape(cli_mac(mac_address)))
+    if interface is not None:
+        conditions.append(r'\s*\S+\s+\S+\s+(?:\S+ )?%s\s'
+                          % re.escape(split_interface(interface)[1]))
+    line_filter = _line_filter(conditions)
+
+    for line in _rows(output, 'show arp', _ARP_TRAILER):
+        if line_filter is not None and not line_filter.match(line):
+            continue
+        if _ARP_TRAILER.match(line):
+            continue
+        match = _ARP.match(line)
+        if not match:
+            raise ParseError("Unexpected output from: {}".format(line))
+        address, raw_mac, port, _, age, typ = match.groups()
+        entry = ArpEntry(ip=address,
+                         mac=mac(raw_mac),
+                         interface=port,
+                         type=typ,
+                         age=arp_age(age))
+        if (ip is None or entry.ip == ip) and \
+                (mac_address is None or entry.mac == mac_address) and \
+                (interface is None or
+                 interface_matches(interface, entry.interface)):
+            yield entry
+
+
+def parse_arp(output):
+    """Parse 'show arp'."""
+    return [arp_entry_to_dict(entry) for entry in iter_arp(output)]
+
+
+def parse_ip_interface_brief(output):
+    """Parse 'show ip interface brief'."""
+    interface_list = {}
+    for line in _rows(output, 'show ip interface brief'):
+        match = _IP_INTERFACE.match(line)
+        if not match:
+            raise ParseError("Unexpected output from: {}".format(line))
+        interface_type, interface, ip_address, _, status, protocol = \
+            match.groups()
+        interface_list[interface] = {
+            'is_up': 'up' in protocol.lower(),
+            'is_enabled': 'admin' not in status.lower(),
+            'interface_type': interface_type,
+            'ip_address': ip_address
+        }
+    return interface_list
+
+
+def parse_interface_stats_brief(output):
+    """Parse 'show interface stats brief'."""
+    counters_table = []
+    for line in _rows(output, 'show interface stats brief'):
+        match = _INTERFACE_STATS.match(line)
+        if not match:
+            raise ParseError("Unexpected output from: {}".format(line))
+        counters_table.append({
+            'interface_type': match.group(1),
+            'interface': match.group(2),
+            'pkts_rx': match.group(3),
+            'pkts_tx': match.group(4),
+            'err_rx': match.group(5),
+            'err_tx': match.group(6),
+            'discards_rx': match.group(7),
+            'discards_tx': match.group(8),
+            'crc_rx': match.group(9),
+        })
+    return counters_table
+
+
+def parse_mac_address_table(lines, vlan=None, interface=None,
+                            mac_address=None):
+    """
+    Parse the lines of 'show mac-address-table' into MacEntry records.
+
+    lines can be any iterable, so rows are parsed as they stream in.
+    Rows are filtered on vlan, interface (the port, e.g. '0/1', or the
+    name, e.g. 'Eth 0/1' or 'Ethernet 0/1') and mac_address (any format)
+    before a record is built; a precompiled filter drops most of the
+    other rows before they are even split.
+    """
+    conditions = []
+    if vlan is not None:
+        conditions.append(r'\s*%d\s' % int(vlan))
+    if mac_address is not None:
+        mac_address = mac(mac_address)
+        conditions.append(r'\s*\S+\s+\S+\s+%s\s'
+                          % re.escape(cli_mac(mac_address)))
+    if interface is not None:
+        conditions.append(r'.*\s%s\s*$'
+                          % re.escape(split_interface(interface)[1]))
+    line_filter = _line_filter(conditions)
+
+    for line in lines:
+        if line_filter is not None and not line_filter.match(line):
+            continue
+        fields = line.split()
+        if not fields or MAC_HEADER.match(line) or _MAC_TRAILER.match(line):
+            continue
+
+        if len(fields) != 7:
+            raise ParseError("Unexpected output from: {}".format(fields))
+
+        vlan_id, _, raw_mac, typ, state, interface_type, port = fields
+        if vlan is not None and int(vlan_id) != int(vlan):
+            continue
+        if interface is not None and not interface_matches(
+                interface, "%s %s" % (interface_type, port)):
+            continue
+        if mac_address is not None and mac(raw_mac) != mac_address:
+            continue
+
+        yield MacEntry(mac=mac(raw_mac),
+                       interface=port,
+                       vlan=int(vlan_id),
+                       static=typ == "Static",
+                       active=state != "Inactive")
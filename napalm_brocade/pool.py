@@ -0,0 +1,170 @@
+#
+# Copyright 2016 Shiv Haris, Brocade Communication Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.  You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Connection pool.
+
+Keeps prepared netmiko sessions open between BrocadeDriver instances so
+short-lived drivers skip the SSH handshake, authentication and session
+preparation.  Sessions are keyed by (hostname, port, username).
+"""
+import threading
+import time
+
+from napalm_base.exceptions import ConnectionException
+
+# NOS allows a handful of concurrent SSH sessions per switch
+DEFAULT_MAX_SESSIONS = 4
+DEFAULT_IDLE_TIMEOUT = 300
+
+
+class _Slot(object):
+    """Sessions of one key."""
+
+    __slots__ = ('idle', 'busy')
+
+    def __init__(self):
+        """CTOR for the slot."""
+        self.idle = []
+        self.busy = 0
+
+
+class ConnectionPool(object):
+    """Pool of warmed sessions, capped per switch."""
+
+    def __init__(self, max_sessions=DEFAULT_MAX_SESSIONS,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT, clock=time.time):
+        """CTOR for the pool."""
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._clock = clock
+        self._slots = {}
+        self._cond = threading.Condition()
+
+    def acquire(self, key, connect, timeout=None):
+        """
+        Return a session for key.
+
+        An idle session is reused if it passes the keepalive check,
+        otherwise connect() is called to open a new one.  When
+        max_sessions are already in use, wait up to timeout seconds for one
+        to be released and raise ConnectionException after that.
+        """
+        self.evict_idle()
+        conn = self._checkout(key, timeout)
+        if conn is not None:
+            if self._healthy(conn):
+                return conn
+            self._disconnect(conn)
+
+        try:
+            return connect()
+        except Exception:
+            self.discard(key)
+            raise
+
+    def release(self, key, conn):
+        """Return a session to the pool."""
+        with self._cond:
+            slot = self._slots[key]
+            slot.busy -= 1
+            slot.idle.append((conn, self._clock()))
+            self._cond.notify_all()
+        self.evict_idle()
+
+    def discard(self, key, conn=None):
+        """Give up a session that is broken or was never opened."""
+        with self._cond:
+            self._slots[key].busy -= 1
+            self._cond.notify_all()
+        if conn is not None:
+            self._disconnect(conn)
+
+    def evict_idle(self):
+        """
+        Close sessions idle for longer than idle_timeout.
+
+        This runs on every acquire() and release(); a pool left unused
+        keeps its idle sessions open until it is called again, or until
+        close_all().
+        """
+        expired = []
+        with self._cond:
+            horizon = self._clock() - self.idle_timeout
+            for slot in self._slots.values():
+                expired.extend(conn for conn, since in slot.idle
+                               if since <= horizon)
+                slot.idle = [(conn, since) for conn, since in slot.idle
+                             if since > horizon]
+        for conn in expired:
+            self._disconnect(conn)
+
+    def close_all(self):
+        """Close every idle session."""
+        with self._cond:
+            idle = [conn for slot in self._slots.values()
+                    for conn, _ in slot.idle]
+            for slot in self._slots.values():
+                slot.idle = []
+        for conn in idle:
+            self._disconnect(conn)
+
+    def stats(self):
+        """Return the number of idle and busy sessions per key."""
+        with self._cond:
+            return dict((key, {'idle': len(slot.idle), 'busy': slot.busy})
+                        for key, slot in self._slots.items())
+
+    def _checkout(self, key, timeout):
+        """Reserve a session slot and return an idle session, if any."""
+        deadline = None if timeout is None else self._clock() + timeout
+        with self._cond:
+            slot = self._slots.setdefault(key, _Slot())
+            while not slot.idle and slot.busy >= self.max_sessions:
+                remaining = None if deadline is None \
+                    else deadline - self._clock()
+                if remaining is not None and remaining <= 0:
+                    raise ConnectionException(
+                        "No free session to %s:%s after %ss" %
+                        (key[0], key[1], timeout))
+                self._cond.wait(remaining)
+
+            slot.busy += 1
+            if slot.idle:
+                # Most recently used first, it is the least likely to be stale
+                return slot.idle.pop()[0]
+            return None
+
+    @staticmethod
+    def _healthy(conn):
+        """Cheap keepalive check of a session."""
+        try:
+            if hasattr(conn, 'is_alive'):
+                return conn.is_alive()
+            return bool(conn.find_prompt())
+        except Exception:
+            return False
+
+    @staticmethod
+    def _disconnect(conn):
+        """Close a session, ignoring errors on sessions already dead."""
+        try:
+            conn.disconnect()
+        except Exception:
+            pass
+
+
+# Process-wide pool used when optional_args['pool'] is True
+POOL = ConnectionPool()
@@ -0,0 +1,132 @@
+#
+# Copyright 2016 Shiv Haris, Brocade Communication Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.  You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Prompt-aware command reader.
+
+netmiko's send_command() looks the prompt up again before every command
+and polls for the output with delay_factor sleeps of 0.1 to 0.2 seconds,
+which dominates the time of short commands.  PromptReader writes commands
+on the raw channel and returns as soon as their prompts are back:
+
+- the prompt is looked up and paging disabled once per session,
+- prompts are found with a precompiled pattern, in the new data only,
+- every read drains what the channel has; chunks are joined once,
+- between reads it blocks in select() on the SSH channel until data
+  arrives, or polls briefly when the session has no channel to wait on.
+"""
+import re
+import select
+import time
+
+from napalm_base.exceptions import CommandTimeoutException
+
+# Longest pause between reads of a session that cannot be waited on
+MAX_POLL_INTERVAL = 0.01
+
+
+class PromptReader(object):
+    """Reader of command outputs on one CLI session."""
+
+    def __init__(self, connection, timeout=60):
+        """CTOR for the reader; prepare() must be called before reading."""
+        self.connection = connection
+        self.timeout = timeout
+        self.prompt = None
+        self.pattern = None
+
+        channel = getattr(connection, 'remote_conn', None)
+        if channel is not None and not hasattr(channel, 'fileno'):
+            channel = None
+        self._channel = channel
+
+    def prepare(self):
+        """Learn the prompt and disable paging on the session."""
+        self.prompt = self.connection.find_prompt().strip()
+        # Prompts start a line; the echo of a command follows one
+        self.pattern = re.compile('\n' + re.escape(self.prompt))
+        self.run(['terminal length 0'])
+
+    def read(self):
+        """Return whatever output is waiting, possibly nothing."""
+        return self.connection.read_channel()
+
+    def wait(self, deadline, idle):
+        """
+        Wait for more output until deadline.
+
+        idle is how many reads in a row came back empty; without an SSH
+        channel to select() on, the pause grows with it.
+        """
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return
+        if self._channel is not None:
+            select.select([self._channel], [], [], remaining)
+        else:
+            time.sleep(min(0.0005 * 2 ** min(idle, 5), MAX_POLL_INTERVAL,
+                           remaining))
+
+    def run(self, commands, on_data=None):
+        """
+        Write commands and return the raw output once every prompt is back.
+
+        The output holds the echo, output and prompt of every command, see
+        brocade._split_batch_output().  on_data(data) is called on every
+        chunk read.
+        """
+        self.connection.clear_buffer()
+        self.connection.write_channel(''.join(cmd + '\n' for cmd in commands))
+
+        chunks = []
+        tail = ''
+        found = idle = 0
+        keep = len(self.prompt)
+        deadline = time.time() + self.timeout
+        while found < len(commands):
+            data = self.read()
+            if not data:
+                if time.time() > deadline:
+                    raise CommandTimeoutException(
+                        "Timed out waiting for output of %s" % commands)
+                self.wait(deadline, idle)
+                idle += 1
+                continue
+            idle = 0
+            deadline = time.time() + self.timeout
+            if on_data is not None:
+                on_data(data)
+            chunks.append(data)
+            # A prompt split across reads starts in the kept tail
+            window = tail + data.replace('\r', '')
+            found += len(self.pattern.findall(window))
+            tail = window[-keep:]
+        return ''.join(chunks)
+
+
+def session_reader(connection, timeout=60):
+    """
+    Return the PromptReader of connection, preparing it on first use.
+
+    The reader is kept on the connection, so pooled sessions shared by
+    several drivers are only prepared once.
+    """
+    reader = getattr(connection, 'prompt_reader', None)
+    if reader is None or reader.connection is not connection:
+        reader = PromptReader(connection, timeout)
+        reader.prepare()
+        connection.prompt_reader = reader
+    reader.timeout = timeout
+    return reader
@@ -0,0 +1,206 @@
+#
+# Copyright 2016 Shiv Haris, Brocade Communication Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.  You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Record types for ARP and MAC tables.
+
+MacEntry and ArpEntry are the per-row records produced by the parsers.
+MacTable and ArpTable store whole tables column by column in arrays:
+MACs and IPv4 addresses as integers, VLANs and ages as numbers and
+interface names interned once per table.  to_dicts() turns them back
+into the NAPALM return format.
+"""
+import socket
+import struct
+from array import array
+from collections import namedtuple
+
+try:
+    from itertools import izip as zip
+except ImportError:
+    pass
+
+MacEntry = namedtuple('MacEntry', 'mac interface vlan static active')
+ArpEntry = namedtuple('ArpEntry', 'ip mac interface type age')
+
+try:
+    array('Q')
+    _UINT64 = 'Q'
+except ValueError:
+    # Python 2 has no 'Q'; 'L' is 64 bits on LP64 platforms
+    _UINT64 = 'L'
+
+_STATIC = 1
+_ACTIVE = 2
+
+
+def _text(value):
+    """Return value as a unicode string."""
+    if isinstance(value, type(u'')):
+        return value
+    return value.decode('utf-8')
+
+
+def mac_to_int(mac):
+    """Convert a MAC in the NAPALM format to a 48-bit integer."""
+    return int(mac.replace(':', ''), 16)
+
+
+def int_to_mac(value):
+    """Convert a 48-bit integer to a MAC in the NAPALM format."""
+    digits = '%012X' % value
+    return ':'.join((digits[0:2], digits[2:4], digits[4:6],
+                     digits[6:8], digits[8:10], digits[10:12]))
+
+
+def ip_to_int(ip):
+    """Convert a dotted IPv4 address to a 32-bit integer."""
+    return struct.unpack('!I', socket.inet_aton(ip))[0]
+
+
+def int_to_ip(value):
+    """Convert a 32-bit integer to a dotted IPv4 address."""
+    return socket.inet_ntoa(struct.pack('!I', value))
+
+
+def mac_entry_to_dict(entry, moves=-1, last_move=0.0):
+    """
+    Return a MacEntry in the NAPALM get_mac_address_table format.
+
+    moves and last_move are unknown (-1 and 0.0) unless the table is
+    tracked, see napalm_brocade.tracking.
+    """
+    return {
+        'mac': _text(entry.mac),
+        'interface': _text(entry.interface),
+        'vlan': entry.vlan,
+        'static': entry.static,
+        'active': entry.active,
+        'moves': int(moves),
+        'last_move': float(last_move),
+    }
+
+
+def arp_entry_to_dict(entry):
+    """Return an ArpEntry in the NAPALM get_arp_table format."""
+    return {
+        'interface': entry.interface,
+        'mac': entry.mac,
+        'ip': entry.ip,
+        'type': entry.type,
+        'age': entry.age,
+    }
+
+
+class _Strings(object):
+    """Intern table mapping repeated strings to small integers."""
+
+    __slots__ = ('names', '_index')
+
+    def __init__(self):
+        """CTOR for the intern table."""
+        self.names = []
+        self._index = {}
+
+    def index(self, name):
+        """Return the index of name, adding it if needed."""
+        index = self._index.get(name)
+        if index is None:
+            index = self._index[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+
+class MacTable(object):
+    """Columnar MAC address table."""
+
+    def __init__(self, entries=()):
+        """CTOR for the table, optionally filled from MacEntry records."""
+        self.macs = array(_UINT64)
+        self.vlans = array('H')
+        self.flags = array('B')
+        self.interfaces = array('I')
+        self._strings = _Strings()
+        for entry in entries:
+            self.append(entry)
+
+    def append(self, entry):
+        """Add a MacEntry."""
+        self.macs.append(mac_to_int(entry.mac))
+        self.vlans.append(entry.vlan)
+        self.flags.append((_STATIC if entry.static else 0) |
+                          (_ACTIVE if entry.active else 0))
+        self.interfaces.append(self._strings.index(entry.interface))
+
+    def __len__(self):
+        """Return the number of entries."""
+        return len(self.macs)
+
+    def __iter__(self):
+        """Yield the entries as MacEntry records."""
+        names = self._strings.names
+        for mac, vlan, flags, interface in zip(self.macs, self.vlans,
+                                               self.flags, self.interfaces):
+            yield MacEntry(mac=int_to_mac(mac),
+                           interface=names[interface],
+                           vlan=vlan,
+                           static=bool(flags & _STATIC),
+                           active=bool(flags & _ACTIVE))
+
+    def to_dicts(self):
+        """Return the table in the NAPALM get_mac_address_table format."""
+        return [mac_entry_to_dict(entry) for entry in self]
+
+
+class ArpTable(object):
+    """Columnar ARP table."""
+
+    def __init__(self, entries=()):
+        """CTOR for the table, optionally filled from ArpEntry records."""
+        self.ips = array('I')
+        self.macs = array(_UINT64)
+        self.ages = array('d')
+        self.interfaces = array('I')
+        self.types = array('I')
+        self._strings = _Strings()
+        for entry in entries:
+            self.append(entry)
+
+    def append(self, entry):
+        """Add an ArpEntry."""
+        self.ips.append(ip_to_int(entry.ip))
+        self.macs.append(mac_to_int(entry.mac))
+        self.ages.append(entry.age)
+        self.interfaces.append(self._strings.index(entry.interface))
+        self.types.append(self._strings.index(entry.type))
+
+    def __len__(self):
+        """Return the number of entries."""
+        return len(self.ips)
+
+    def __iter__(self):
+        """Yield the entries as ArpEntry records."""
+        names = self._strings.names
+        for ip, mac, age, interface, typ in zip(self.ips, self.macs, self.ages,
+                                                self.interfaces, self.types):
+            yield ArpEntry(ip=int_to_ip(ip),
+                           mac=int_to_mac(mac),
+                           interface=names[interface],
+                           type=names[typ],
+                           age=age)
+
+    def to_dicts(self):
+        """Return the table in the NAPALM get_arp_table format."""
+        return [arp_entry_to_dict(entry) for entry in self]
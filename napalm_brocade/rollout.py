@@ -0,0 +1,220 @@
+#
+# Copyright 2016 Shiv Haris, Brocade Communication Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.  You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Staged config rollout.
+
+Applies one candidate across an inventory in waves: a canary wave first,
+then wave_size switches at a time.  Within a wave every switch is
+checkpointed, loaded and compared concurrently; commits only happen if
+all of them got that far, and the wave is rolled back if any commit
+or health check fails.  A failed wave stops the rollout.
+"""
+import time
+from multiprocessing.pool import ThreadPool
+
+PENDING = 'pending'
+COMMITTED = 'committed'
+DISCARDED = 'discarded'
+ROLLED_BACK = 'rolled_back'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+
+def default_health_check(device):
+    """Check the switch still answers the basic getters."""
+    device.get_facts()
+    device.get_interfaces()
+    return True
+
+
+class RolloutResult(object):
+    """Outcome of the rollout on one host."""
+
+    def __init__(self, hostname, wave):
+        """CTOR for the result."""
+        self.hostname = hostname
+        self.wave = wave
+        self.state = PENDING
+        self.diff = None
+        self.error = None
+        self.timings = {}
+
+    def __repr__(self):
+        """Representation for logs."""
+        return "<RolloutResult %s wave=%d %s>" % (self.hostname, self.wave,
+                                                  self.state)
+
+
+class Rollout(object):
+    """Roll a candidate config out to an inventory of switches in waves."""
+
+    def __init__(self, inventory, filename=None, config=None, replace=False,
+                 canary=1, wave_size=10, health_checks=None, timeout=60,
+                 driver_class=None):
+        """
+        CTOR for the rollout.
+
+        inventory is a list of dicts as for BrocadeFleet.  The candidate is
+        filename or the config string; replace selects
+        load_replace_candidate() over load_merge_candidate().
+        health_checks are callables taking an open driver; a check fails
+        by returning False or raising.
+        """
+        if driver_class is None:
+            from napalm_brocade.brocade import BrocadeDriver
+            driver_class = BrocadeDriver
+
+        self.inventory = list(inventory)
+        self.filename = filename
+        self.config = config
+        self.replace = replace
+        self.canary = canary
+        self.wave_size = wave_size
+        self.health_checks = health_checks or [default_health_check]
+        self.timeout = timeout
+        self.driver_class = driver_class
+
+    def waves(self):
+        """Return the inventory split in waves, canary first."""
+        hosts = self.inventory
+        waves = [hosts[:self.canary]] if self.canary else []
+        rest = hosts[self.canary:]
+        waves.extend(rest[i:i + self.wave_size]
+                     for i in range(0, len(rest), self.wave_size))
+        return [wave for wave in waves if wave]
+
+    def run(self):
+        """Run the rollout and return a RolloutResult per host."""
+        results = []
+        failed = False
+        for index, wave in enumerate(self.waves()):
+            wave_results = [RolloutResult(host['hostname'], index)
+                            for host in wave]
+            results.extend(wave_results)
+            if failed:
+                for result in wave_results:
+                    result.state = SKIPPED
+                continue
+            failed = not self._run_wave(wave, wave_results)
+        return results
+
+    def _run_wave(self, wave, results):
+        """Apply the candidate to one wave; return True on success."""
+        devices = [None] * len(wave)
+        pool = ThreadPool(len(wave))
+        try:
+            prepared = pool.map(
+                lambda i: self._prepare(wave[i], results[i], devices, i),
+                range(len(wave)))
+
+            if not all(prepared):
+                # A host that failed partway may hold a half-loaded candidate
+                pool.map(lambda i: self._discard(devices[i], results[i]),
+                         [i for i in range(len(wave))
+                          if devices[i] is not None])
+                return False
+
+            committed = pool.map(
+                lambda i: self._step(results[i], 'commit',
+                                     devices[i].commit_config),
+                range(len(wave)))
+            for i in range(len(wave)):
+                if committed[i]:
+                    results[i].state = COMMITTED
+
+            healthy = all(committed) and all(pool.map(
+                lambda i: self._step(results[i], 'health',
+                                     lambda: self._healthy(devices[i])),
+                range(len(wave))))
+
+            if not healthy:
+                # A commit that raised may still be partly applied, so every
+                # host a commit was attempted on is rolled back
+                pool.map(lambda i: self._rollback(devices[i], results[i]),
+                         range(len(wave)))
+                return False
+            return True
+        finally:
+            pool.map(self._close, devices)
+            pool.close()
+
+    def _step(self, result, name, func):
+        """Run func as step name of result; return False on failure."""
+        start = time.time()
+        try:
+            ok = func() is not False
+            if not ok:
+                result.error = "%s failed" % name
+        except Exception as e:
+            result.error = e
+            ok = False
+        result.timings[name] = time.time() - start
+        if not ok:
+            result.state = FAILED
+        return ok
+
+    def _prepare(self, host, result, devices, index):
+        """Open, checkpoint, load and compare on one host."""
+        def open_device():
+            device = self.driver_class(
+                host['hostname'], host.get('username'), host.get('password'),
+                timeout=host.get('timeout', self.timeout),
+                optional_args=host.get('optional_args'))
+            device.open()
+            devices[index] = device
+
+        if not self._step(result, 'open', open_device):
+            return False
+        device = devices[index]
+
+        load = device.load_replace_candidate if self.replace \
+            else device.load_merge_candidate
+
+        def compare():
+            result.diff = device.compare_config()
+
+        return (self._step(result, 'checkpoint',
+                           device._checkpoint_running_config) and
+                self._step(result, 'load',
+                           lambda: load(filename=self.filename,
+                                        config=self.config)) and
+                self._step(result, 'compare', compare))
+
+    def _healthy(self, device):
+        """Run every health check against device."""
+        return all(check(device) is not False for check in self.health_checks)
+
+    def _discard(self, device, result):
+        """Drop the loaded candidate of a host that will not commit."""
+        failed = result.state == FAILED
+        if self._step(result, 'discard', device.discard_config) and \
+                not failed:
+            result.state = DISCARDED
+
+    def _rollback(self, device, result):
+        """Roll a host a commit was attempted on back to its checkpoint."""
+        if self._step(result, 'rollback', device.rollback_config):
+            result.state = ROLLED_BACK
+
+    @staticmethod
+    def _close(device):
+        """Close a session, ignoring hosts that never opened."""
+        if device is None:
+            return
+        try:
+            device.close()
+        except Exception:
+            pass
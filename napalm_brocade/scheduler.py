@@ -0,0 +1,313 @@
+#
+# Copyright 2016 Shiv Haris, Brocade Communication Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.  You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Adaptive polling scheduler.
+
+PollScheduler polls getters on many switches as often as each switch can
+take it.  For every (host, getter) it learns the latency of the getter
+and derives the polling interval from it:
+
+    interval = max(base interval, latency / duty_cycle) * backoff
+
+so a getter never keeps a switch busy more than duty_cycle of the time.
+backoff doubles on an error or timeout, or when the latency rises above
+slow_factor times the baseline latency, and halves back on every healthy
+poll.  The baseline is the best latency seen, drifting up towards the
+current latency so that a switch that stays slower is spaced out by the
+duty cycle rather than backed off for good.  In-flight getters are capped
+per switch and overall.
+
+The scheduling itself (ready() and finished()) only reads the clock it
+is given, so it can be driven by a simulation; run() drives it with
+threads and real drivers.
+"""
+import threading
+import time
+from collections import defaultdict
+
+from napalm_base.exceptions import CommandTimeoutException
+
+from napalm_brocade.instrumentation import format_labels
+
+
+class _Job(object):
+    """Polling state of one getter on one switch."""
+
+    __slots__ = ('host', 'getter', 'base_interval', 'due', 'latency',
+                 'baseline', 'backoff', 'running', 'deferred', 'runs',
+                 'errors', 'timeouts')
+
+    def __init__(self, host, getter, base_interval, due):
+        """CTOR for the job."""
+        self.host = host
+        self.getter = getter
+        self.base_interval = base_interval
+        self.due = due
+        self.latency = None
+        self.baseline = None
+        self.backoff = 1.0
+        self.running = False
+        self.deferred = False
+        self.runs = 0
+        self.errors = 0
+        self.timeouts = 0
+
+
+class PollScheduler(object):
+    """Decides which getter to poll on which switch, and when."""
+
+    def __init__(self, hosts, getters, max_in_flight_per_host=1,
+                 max_in_flight=32, duty_cycle=0.1, slow_factor=3.0,
+                 max_backoff=32.0, alpha=0.3, baseline_drift=0.1,
+                 clock=time.time):
+        """
+        CTOR for the scheduler.
+
+        getters maps a getter name to its base interval in seconds.  alpha
+        is the weight of the latest latency in the latency average and
+        baseline_drift the weight of a higher latency in the baseline.
+        """
+        self.max_in_flight_per_host = max_in_flight_per_host
+        self.max_in_flight = max_in_flight
+        self.duty_cycle = duty_cycle
+        self.slow_factor = slow_factor
+        self.max_backoff = max_backoff
+        self.alpha = alpha
+        self.baseline_drift = baseline_drift
+        self.clock = clock
+
+        now = clock()
+        self._jobs = dict(((host, getter), _Job(host, getter, interval, now))
+                          for host in hosts
+                          for getter, interval in getters.items())
+        self._in_flight = defaultdict(int)
+        self._total_in_flight = 0
+        self._lock = threading.Lock()
+        self.counters = defaultdict(int)
+
+    def interval(self, host, getter):
+        """Return the current polling interval of getter on host."""
+        job = self._jobs[(host, getter)]
+        interval = job.base_interval
+        if job.latency is not None:
+            interval = max(interval, job.latency / self.duty_cycle)
+        return interval * job.backoff
+
+    def ready(self, now=None):
+        """
+        Return the (host, getter) pairs to poll now, marked as running.
+
+        Due jobs are taken most overdue first, relative to their interval,
+        as long as the in-flight limits allow; the others are deferred,
+        and counted once until they start.
+        """
+        if now is None:
+            now = self.clock()
+        with self._lock:
+            due = [job for job in self._jobs.values()
+                   if not job.running and job.due <= now]
+            due.sort(key=lambda job: (job.due - now) /
+                     self.interval(job.host, job.getter))
+
+            started = []
+            for job in due:
+                if (self._total_in_flight >= self.max_in_flight or
+                        self._in_flight[job.host] >=
+                        self.max_in_flight_per_host):
+                    if not job.deferred:
+                        job.deferred = True
+                        self.counters['deferred'] += 1
+                    continue
+                job.running = True
+                job.deferred = False
+                self._in_flight[job.host] += 1
+                self._total_in_flight += 1
+                self.counters['started'] += 1
+                started.append((job.host, job.getter))
+            return started
+
+    def finished(self, host, getter, latency, error=None, now=None):
+        """Record the outcome of a poll and schedule the next one."""
+        if now is None:
+            now = self.clock()
+        with self._lock:
+            job = self._jobs[(host, getter)]
+            job.running = False
+            job.runs += 1
+            self._in_flight[host] -= 1
+            self._total_in_flight -= 1
+
+            if error is not None:
+                job.errors += 1
+                if isinstance(error, CommandTimeoutException):
+                    job.timeouts += 1
+                    self.counters['timeouts'] += 1
+                self.counters['errors'] += 1
+                self._back_off(job)
+            else:
+                if job.latency is None:
+                    job.latency = latency
+                else:
+                    job.latency += self.alpha * (latency - job.latency)
+                if latency > self.slow_factor * (job.baseline or latency):
+                    self._back_off(job)
+                else:
+                    job.backoff = max(1.0, job.backoff / 2)
+
+                if job.baseline is None or latency < job.baseline:
+                    job.baseline = latency
+                else:
+                    job.baseline += self.baseline_drift * \
+                        (latency - job.baseline)
+
+            job.due = now + self.interval(host, getter)
+
+    def _back_off(self, job):
+        """Double the interval of job, up to max_backoff."""
+        job.backoff = min(self.max_backoff, job.backoff * 2)
+        self.counters['backoffs'] += 1
+
+    def next_due(self):
+        """Return when the next idle job is due, or None."""
+        with self._lock:
+            due = [job.due for job in self._jobs.values() if not job.running]
+        return min(due) if due else None
+
+    def stats(self):
+        """Return the state of every job, keyed by (host, getter)."""
+        with self._lock:
+            return dict((key, {
+                'interval': self.interval(*key),
+                'latency': job.latency,
+                'backoff': job.backoff,
+                'runs': job.runs,
+                'errors': job.errors,
+                'timeouts': job.timeouts,
+                'due': job.due,
+            }) for key, job in self._jobs.items())
+
+    def render(self, prefix='napalm_brocade_scheduler'):
+        """Return the scheduler metrics in the Prometheus text format."""
+        lines = ['%s_%s_total %d' % (prefix, name, value)
+                 for name, value in sorted(self.counters.items())]
+        lines.append('%s_in_flight %d' % (prefix, self._total_in_flight))
+        for (host, getter), stats in sorted(self.stats().items()):
+            labels = format_labels((('host', host), ('getter', getter)))
+            for name, metric in (('interval', 'interval_seconds'),
+                                 ('latency', 'latency_seconds'),
+                                 ('backoff', 'backoff')):
+                if stats[name] is not None:
+                    lines.append('%s_%s%s %s' % (prefix, metric, labels,
+                                                 repr(float(stats[name]))))
+        return '\n'.join(lines) + '\n'
+
+    def run(self, connect, handle=None, duration=None, stop=None,
+            poll_timeout=None):
+        """
+        Poll with real drivers until duration elapses or stop is set.
+
+        connect(host) returns an open driver; it is closed after every
+        poll, so pass optional_args={'pool': True} to reuse sessions.
+        handle(host, getter, result, error) receives every outcome.
+
+        A poll still running after poll_timeout seconds is given up: handle
+        gets a CommandTimeoutException right away, and whatever the poll
+        returns later is dropped.  Its thread cannot be interrupted, and
+        the switch is still busy with it, so its in-flight slot is only
+        freed, and the timeout backs the getter off, once it returns.
+        """
+        stop = stop or threading.Event()
+        wake = threading.Event()
+        end = None if duration is None else self.clock() + duration
+        # [start, thread, timeout error] of the polls in flight, by
+        # (host, getter); the error is set once the poll is given up
+        polls = {}
+        lock = threading.Lock()
+
+        def finish(host, getter, result, error):
+            with lock:
+                start, _, timeout = polls.pop((host, getter))
+            self.finished(host, getter, self.clock() - start,
+                          timeout or error)
+            wake.set()
+            if handle is not None and timeout is None:
+                handle(host, getter, result, error)
+
+        def poll(host, getter):
+            result = error = None
+            try:
+                device = connect(host)
+                try:
+                    result = getattr(device, getter)()
+                finally:
+                    device.close()
+            except Exception as e:
+                error = e
+            finish(host, getter, result, error)
+
+        def give_up(host, getter):
+            error = CommandTimeoutException(
+                "%s on %s did not finish in %ss" %
+                (getter, host, poll_timeout))
+            with lock:
+                state = polls.get((host, getter))
+                if state is None or state[2] is not None:
+                    return
+                state[2] = error
+            if handle is not None:
+                handle(host, getter, None, error)
+
+        try:
+            while not stop.is_set() and (end is None or self.clock() < end):
+                for host, getter in self.ready():
+                    thread = threading.Thread(target=poll,
+                                              args=(host, getter))
+                    thread.daemon = True
+                    with lock:
+                        polls[(host, getter)] = [self.clock(), thread, None]
+                    thread.start()
+
+                wake.clear()
+                now = self.clock()
+                expiry = None
+                if poll_timeout is not None:
+                    with lock:
+                        running = [(key, start) for key, (start, _, timeout)
+                                   in polls.items() if timeout is None]
+                    for (host, getter), start in running:
+                        if now - start >= poll_timeout:
+                            give_up(host, getter)
+                        elif expiry is None or start + poll_timeout < expiry:
+                            expiry = start + poll_timeout
+
+                # Deferred jobs are already due: wait for a poll to finish
+                next_due = self.next_due()
+                wait = 1.0 if next_due is None or next_due <= now \
+                    else next_due - now
+                if expiry is not None:
+                    wait = min(wait, expiry - now)
+                wake.wait(min(wait, 1.0))
+        finally:
+            with lock:
+                running = [(key, start, thread) for key, (start, thread, _)
+                           in polls.items()]
+            for (host, getter), start, thread in running:
+                if poll_timeout is None:
+                    thread.join()
+                    continue
+                thread.join(max(0, start + poll_timeout - self.clock()))
+                if thread.is_alive():
+                    give_up(host, getter)
@@ -0,0 +1,86 @@
+#
+# Copyright 2016 Shiv Haris, Brocade Communication Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.  You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Multi-getter snapshots.
+
+BrocadeDriver.get_snapshot() plans the CLI commands of the requested
+getters with plan(), sends them as one batch and returns the parsed
+results together in a Snapshot.
+"""
+import time
+from collections import OrderedDict
+
+# Bumped whenever the layout of Snapshot.to_dict() changes
+SNAPSHOT_VERSION = 1
+
+
+def plan(getters, commands_of):
+    """
+    Return the commands needed by getters, each command once.
+
+    commands_of maps a getter to its commands; getters missing from it
+    need no CLI command.  Commands keep the order of first use.
+    """
+    commands = OrderedDict()
+    for getter in getters:
+        for command in commands_of.get(getter, ()):
+            commands[command] = None
+    return list(commands)
+
+
+class Snapshot(object):
+    """Results of several getters collected in one pass."""
+
+    def __init__(self, hostname, commands, timestamp=None):
+        """CTOR for the snapshot."""
+        self.version = SNAPSHOT_VERSION
+        self.hostname = hostname
+        self.commands = commands
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.sections = OrderedDict()
+        self.errors = OrderedDict()
+        self.timings = OrderedDict()
+
+    def __getitem__(self, getter):
+        """Return the result of getter."""
+        return self.sections[getter]
+
+    def __contains__(self, getter):
+        """Whether getter succeeded."""
+        return getter in self.sections
+
+    @property
+    def ok(self):
+        """True when every getter succeeded."""
+        return not self.errors
+
+    def to_dict(self):
+        """Return the snapshot as a JSON serializable dict."""
+        return {
+            'version': self.version,
+            'hostname': self.hostname,
+            'timestamp': self.timestamp,
+            'commands': list(self.commands),
+            'sections': dict(self.sections),
+            'errors': dict((getter, str(error))
+                           for getter, error in self.errors.items()),
+            'timings': dict(self.timings),
+        }
+
+    def __repr__(self):
+        """Representation for logs."""
+        return "<Snapshot %s v%d %s>" % (self.hostname, self.version,
+                                         ', '.join(self.sections))
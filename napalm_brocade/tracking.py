@@ -0,0 +1,165 @@
+#
+# Copyright 2016 Shiv Haris, Brocade Communication Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.  You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+MAC and ARP table tracking.
+
+MacTracker and ArpTracker keep the last table of one switch, indexed by
+every lookup field, and turn each new poll into the list of entries that
+were added, removed or moved since the previous one.  A MAC moves when
+it is learnt on another interface; an IP moves when it resolves to
+another MAC or interface.  The trackers count the moves, which fills in
+the 'moves' and 'last_move' fields of get_mac_address_table().
+"""
+import time
+from collections import defaultdict
+
+from napalm_brocade.records import arp_entry_to_dict, mac_entry_to_dict
+
+ADDED = 'added'
+REMOVED = 'removed'
+MOVED = 'moved'
+
+
+class _Tracker(object):
+    """Indexed snapshot of a table and the moves of its entries."""
+
+    # Fields identifying an entry, fields whose change is a move and
+    # fields the entries are indexed by
+    key_fields = ()
+    location_fields = ()
+    index_fields = ()
+    # Turns an entry into the NAPALM format
+    serializer = None
+
+    def __init__(self, clock=time.time):
+        """CTOR for the tracker."""
+        self._clock = clock
+        self._entries = {}
+        self._moves = {}
+        self._indexes = dict((field, defaultdict(set))
+                             for field in self.index_fields)
+
+    def _key(self, entry):
+        """Return the identity of entry."""
+        return tuple(getattr(entry, field) for field in self.key_fields)
+
+    def _index(self, key, entry):
+        """Add entry to the indexes."""
+        for field, index in self._indexes.items():
+            index[getattr(entry, field)].add(key)
+
+    def _unindex(self, key, entry):
+        """Remove entry from the indexes."""
+        for field, index in self._indexes.items():
+            keys = index[getattr(entry, field)]
+            keys.discard(key)
+            if not keys:
+                del index[getattr(entry, field)]
+
+    def to_dict(self, entry):
+        """Return entry in the NAPALM format, see serializer."""
+        return self.serializer(entry)
+
+    def _change(self, change, entry, previous=None):
+        """Return a change record."""
+        return {
+            'change': change,
+            'entry': self.to_dict(entry),
+            'previous': self.to_dict(previous) if previous else None,
+        }
+
+    def update(self, entries, timestamp=None):
+        """
+        Record a new poll of the table.
+
+        Return a change per entry added, removed or moved since the last
+        poll, as dicts with the keys 'change' (ADDED, REMOVED or MOVED),
+        'entry' and, for moves, 'previous', both in the NAPALM format.
+        The first poll reports every entry as added.
+        """
+        if timestamp is None:
+            timestamp = self._clock()
+
+        current = {}
+        for entry in entries:
+            current[self._key(entry)] = entry
+
+        changes = []
+        for key in [key for key in self._entries if key not in current]:
+            entry = self._entries.pop(key)
+            self._unindex(key, entry)
+            self._moves.pop(key, None)
+            changes.append(self._change(REMOVED, entry))
+
+        for key, entry in current.items():
+            previous = self._entries.get(key)
+            self._entries[key] = entry
+            if previous is None:
+                self._index(key, entry)
+                changes.append(self._change(ADDED, entry))
+                continue
+
+            # The indexed fields are all key or location fields, so only
+            # a move needs reindexing
+            if any(getattr(entry, field) != getattr(previous, field)
+                   for field in self.location_fields):
+                self._unindex(key, previous)
+                self._index(key, entry)
+                moves, _ = self._moves.get(key, (0, 0.0))
+                self._moves[key] = (moves + 1, timestamp)
+                changes.append(self._change(MOVED, entry, previous))
+        return changes
+
+    def find(self, **criteria):
+        """Return the tracked entries matching every field=value given."""
+        keys = None
+        for field, value in criteria.items():
+            matches = self._indexes[field].get(value, set())
+            keys = matches if keys is None else keys & matches
+        if keys is None:
+            keys = self._entries
+        return [self.to_dict(self._entries[key]) for key in keys]
+
+    def table(self):
+        """Return the whole tracked table."""
+        return self.find()
+
+    def __len__(self):
+        """Number of tracked entries."""
+        return len(self._entries)
+
+
+class MacTracker(_Tracker):
+    """Tracker of a MAC address table; entries are MacEntry records."""
+
+    key_fields = ('mac', 'vlan')
+    location_fields = ('interface',)
+    index_fields = ('mac', 'vlan', 'interface')
+    serializer = staticmethod(mac_entry_to_dict)
+
+    def to_dict(self, entry):
+        """Return entry with its moves, see mac_entry_to_dict()."""
+        moves, last_move = self._moves.get(self._key(entry), (0, 0.0))
+        return self.serializer(entry, moves, last_move)
+
+
+class ArpTracker(_Tracker):
+    """Tracker of an ARP table; entries are ArpEntry records."""
+
+    key_fields = ('ip',)
+    location_fields = ('mac', 'interface')
+    index_fields = ('ip', 'mac', 'interface')
+    serializer = staticmethod(arp_entry_to_dict)
@@ -151,14 +151,17 @@ def main():
             st = device.discard_config()
 
         elif choice == 'compare':
-            st = device._checkpoint_running_config()
             st = device.compare_config()
             print st
 
         elif choice == 'rollback':
             st = device.rollback_config()
-            st = device.reboot()
-            break
+            report = device.rollback_report
+            print "Rolled back (%s)" % report['mode']
+            for step, elapsed in report['timings'].items():
+                print "    %-8s %.2fs" % (step, elapsed)
+            if report['mode'] == 'reload':
+                break
 
         elif choice == 'commit':
             st = device.commit_config()
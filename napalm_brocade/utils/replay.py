@@ -0,0 +1,406 @@
+#
+# Copyright 2016 Shiv Haris, Brocade Communication Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License.  You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations under
+# the License.
+
+"""
+Record and replay of CLI sessions.
+
+record() wraps the open session of a BrocadeDriver and captures the output
+and duration of every command into a Transcript, which can be saved as
+JSON.  ReplayConnection plays a Transcript back in place of the netmiko
+connection, through send_command() as well as the raw channel used by the
+batched and streamed reads, so getters run offline end to end.
+ShellConnection serves it from a thread over a local socket instead, with
+the recorded delays, to measure the reads against a realistic session.
+
+    transcript = replay.record(device)
+    device.get_interfaces()
+    transcript.save('sw1.json')
+
+    device.device = replay.ReplayConnection(replay.Transcript.load('sw1.json'))
+"""
+import json
+import os
+import socket
+import threading
+import time
+from collections import defaultdict
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+DEFAULT_PROMPT = 'sw0#'
+
+# Commands preparing a session; replayed as empty output unless recorded
+SESSION_COMMANDS = ('terminal length 0',)
+
+
+class Transcript(object):
+    """Outputs and durations of the commands run on one switch."""
+
+    def __init__(self, hostname=None, prompt=DEFAULT_PROMPT, entries=None):
+        """CTOR for the transcript."""
+        self.hostname = hostname
+        self.prompt = prompt
+        self.entries = list(entries or [])
+
+    def add(self, command, output, elapsed=0.0):
+        """Record output of command, which took elapsed seconds."""
+        self.entries.append({'command': command, 'output': output,
+                             'elapsed': elapsed})
+
+    def lookup(self, command):
+        """Return the recorded entries of command, oldest first."""
+        entries = [entry for entry in self.entries
+                   if entry['command'] == command]
+        if not entries:
+            raise KeyError("No recorded output for %r" % command)
+        return entries
+
+    def save(self, path):
+        """Write the transcript to path as JSON."""
+        with open(path, 'w') as f:
+            json.dump({'hostname': self.hostname, 'prompt': self.prompt,
+                       'entries': self.entries}, f, indent=1)
+
+    @classmethod
+    def load(cls, path):
+        """Read a transcript written by save()."""
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data.get('hostname'), data.get('prompt', DEFAULT_PROMPT),
+                   data['entries'])
+
+    @classmethod
+    def from_directory(cls, directory, prompt=DEFAULT_PROMPT):
+        """
+        Build a transcript from a mocked_data test case directory.
+
+        Every <command>.txt file, spaces in the command replaced by
+        underscores, is the output of that command.
+        """
+        transcript = cls(prompt=prompt)
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith('.txt'):
+                continue
+            with open(os.path.join(directory, filename)) as f:
+                transcript.add(filename[:-4].replace('_', ' '), f.read())
+        return transcript
+
+
+class ReplayConnection(object):
+    """
+    Fake netmiko connection serving the outputs of a Transcript.
+
+    A command recorded several times returns its recordings in turn, then
+    keeps returning the last one.  With speed > 0 every command sleeps for
+    its recorded duration times speed.  Channel reads return at most
+    chunk_size characters, like a real session.
+    """
+
+    def __init__(self, transcript, speed=0.0, chunk_size=4096):
+        """CTOR for the connection."""
+        self.transcript = transcript
+        self.speed = speed
+        self.chunk_size = chunk_size
+        self.calls = defaultdict(int)
+        self._buffer = ''
+        self._offset = 0
+
+    def _entries(self, command):
+        """Return the recorded entries of command."""
+        return self.transcript.lookup(command)
+
+    def _output(self, command):
+        """Return the next recorded output of command."""
+        try:
+            entries = self._entries(command)
+        except KeyError:
+            if command not in SESSION_COMMANDS:
+                raise
+            entries = [{'output': ''}]
+        entry = entries[min(self.calls[command], len(entries) - 1)]
+        self.calls[command] += 1
+        if self.speed:
+            time.sleep(entry.get('elapsed', 0.0) * self.speed)
+        return entry['output']
+
+    def find_prompt(self):
+        """Return the recorded prompt."""
+        return self.transcript.prompt
+
+    def send_command(self, command, *args, **kwargs):
+        """Return the recorded output of command."""
+        return self._output(command)
+
+    def send_config_set(self, commands, *args, **kwargs):
+        """Accept a config set; nothing is recorded for those."""
+        return ''
+
+    def clear_buffer(self):
+        """Drop unread channel output."""
+        self._buffer = ''
+        self._offset = 0
+
+    def write_channel(self, data):
+        """Queue the echo, output and prompt of every command in data."""
+        chunks = [self._buffer[self._offset:]]
+        for command in data.split('\n'):
+            if command.strip():
+                chunks.append('%s\n%s\n%s' % (command, self._output(command),
+                                              self.transcript.prompt))
+        self._buffer = ''.join(chunks)
+        self._offset = 0
+
+    def read_channel(self):
+        """Return the next chunk of queued output."""
+        data = self._buffer[self._offset:self._offset + self.chunk_size]
+        self._offset += len(data)
+        return data
+
+    def is_alive(self):
+        """Replayed sessions never drop."""
+        return True
+
+    def disconnect(self):
+        """Nothing to close."""
+
+
+class ShellConnection(ReplayConnection):
+    """
+    Fake shell serving a Transcript from a thread over a local socket.
+
+    Every command line written is echoed, then its output follows after
+    its recorded duration times speed, in chunks of chunk_size characters
+    chunk_delay seconds apart, then the prompt.  remote_conn is the
+    socket, so readers can select() on it like on an SSH channel.
+    """
+
+    def __init__(self, transcript, speed=1.0, chunk_size=4096,
+                 chunk_delay=0.0):
+        """CTOR for the shell; disconnect() stops it."""
+        super(ShellConnection, self).__init__(transcript, speed, chunk_size)
+        self.chunk_delay = chunk_delay
+        self.remote_conn, self._shell = socket.socketpair()
+        self.remote_conn.setblocking(False)
+        self._lines = queue.Queue()
+        self._pending = ''
+        thread = threading.Thread(target=self._serve)
+        thread.daemon = True
+        thread.start()
+
+    def _send(self, data):
+        """Write data to the client end."""
+        self._shell.sendall(data.encode('utf-8'))
+
+    def _serve(self):
+        """Answer the command lines written, one at a time."""
+        try:
+            command = self._lines.get()
+            while command is not None:
+                self._send(command + '\r\n')
+                output = self._output(command).replace('\n', '\r\n')
+                for start in range(0, len(output), self.chunk_size):
+                    if start and self.chunk_delay:
+                        time.sleep(self.chunk_delay)
+                    self._send(output[start:start + self.chunk_size])
+                self._send('\r\n' + self.transcript.prompt)
+                command = self._lines.get()
+        except socket.error:
+            # The client end was closed mid-answer
+            pass
+        finally:
+            self._shell.close()
+
+    def write_channel(self, data):
+        """Queue every complete command line in data."""
+        lines = (self._pending + data).split('\n')
+        self._pending = lines.pop()
+        for command in lines:
+            if command.strip():
+                self._lines.put(command.strip())
+
+    def read_channel(self):
+        """Return what the shell has sent so far, without blocking."""
+        chunks = []
+        while True:
+            try:
+                data = self.remote_conn.recv(65536)
+            except socket.error:
+                break
+            if not data:
+                break
+            chunks.append(data)
+        return b''.join(chunks).decode('utf-8', 'ignore')
+
+    def clear_buffer(self):
+        """Drop the output sent so far."""
+        self.read_channel()
+
+    def disconnect(self):
+        """Stop the shell and close the socket."""
+        self._lines.put(None)
+        self.remote_conn.close()
+
+
+class RecordingConnection(object):
+    """
+    Wrapper around a netmiko connection recording every command.
+
+    Commands written to the raw channel are recorded once their prompt
+    has been read back; the duration of a batched command runs from the
+    write of the batch to its prompt.  Commands run on exec channels of
+    the session's transport are recorded too.
+    """
+
+    def __init__(self, connection, transcript, clock=time.time):
+        """CTOR for the wrapper."""
+        self.connection = connection
+        self.transcript = transcript
+        self.clock = clock
+        self._pending = []
+        self._read = ''
+
+    def __getattr__(self, name):
+        """Delegate everything not recorded to the connection."""
+        return getattr(self.connection, name)
+
+    @property
+    def remote_conn(self):
+        """The session channel, recording the exec channels it opens."""
+        return _RecordingChannel(self.connection.remote_conn, self)
+
+    def find_prompt(self, *args, **kwargs):
+        """Return the prompt, remembering it in the transcript."""
+        prompt = self.connection.find_prompt(*args, **kwargs)
+        self.transcript.prompt = prompt.strip()
+        return prompt
+
+    def send_command(self, command, *args, **kwargs):
+        """Send command and record its output."""
+        start = self.clock()
+        output = self.connection.send_command(command, *args, **kwargs)
+        self.transcript.add(command, output, self.clock() - start)
+        return output
+
+    def write_channel(self, data):
+        """Write data, remembering the commands it holds."""
+        start = self.clock()
+        self._pending.extend((command, start) for command in data.split('\n')
+                             if command.strip())
+        self._read = ''
+        return self.connection.write_channel(data)
+
+    def read_channel(self):
+        """Read from the channel, recording the commands it completes."""
+        data = self.connection.read_channel()
+        if not self._pending or not data:
+            return data
+
+        self._read += data.replace('\r\n', '\n').replace('\r', '\n')
+        # Prompts start a line, as PromptReader finds them
+        prompt = '\n' + self.transcript.prompt
+        while self._pending and prompt in self._read:
+            chunk, self._read = self._read.split(prompt, 1)
+            command, start = self._pending.pop(0)
+            lines = chunk.split('\n')
+            if lines and command.strip() in lines[0]:
+                lines = lines[1:]
+            self.transcript.add(command, '\n'.join(lines).strip('\n'),
+                                self.clock() - start)
+        return data
+
+
+class _RecordingChannel(object):
+    """
+    Wrapper around a paramiko channel recording its exec command.
+
+    The output is recorded, as send_command() would return it, once the
+    command has been read to the end.  Channels opened on its transport
+    are wrapped as well.
+    """
+
+    def __init__(self, channel, recorder):
+        """CTOR for the wrapper."""
+        self.channel = channel
+        self.recorder = recorder
+        self._command = None
+        self._start = None
+        self._chunks = []
+
+    def __getattr__(self, name):
+        """Delegate everything not recorded to the channel."""
+        return getattr(self.channel, name)
+
+    def get_transport(self):
+        """Return the transport, recording the channels it opens."""
+        return _RecordingTransport(self.channel.get_transport(),
+                                   self.recorder)
+
+    def exec_command(self, command):
+        """Run command on the channel, remembering it."""
+        self._command = command
+        self._start = self.recorder.clock()
+        self._chunks = []
+        return self.channel.exec_command(command)
+
+    def recv(self, nbytes):
+        """Read from the channel, recording the command at its end."""
+        data = self.channel.recv(nbytes)
+        if self._command is None:
+            return data
+        if data:
+            self._chunks.append(data)
+            return data
+
+        output = b''.join(self._chunks)
+        if not isinstance(output, str):
+            output = output.decode('utf-8', 'replace')
+        self.recorder.transcript.add(
+            self._command, output.replace('\r\n', '\n').strip('\n'),
+            self.recorder.clock() - self._start)
+        self._command = None
+        return data
+
+
+class _RecordingTransport(object):
+    """Wrapper around a paramiko transport recording its channels."""
+
+    def __init__(self, transport, recorder):
+        """CTOR for the wrapper."""
+        self.transport = transport
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        """Delegate everything not recorded to the transport."""
+        return getattr(self.transport, name)
+
+    def open_session(self, *args, **kwargs):
+        """Open a channel whose exec command is recorded."""
+        return _RecordingChannel(
+            self.transport.open_session(*args, **kwargs), self.recorder)
+
+
+def record(driver, transcript=None):
+    """
+    Record the commands driver sends from now on.
+
+    driver must be open.  Return the Transcript being filled in.
+    """
+    if transcript is None:
+        transcript = Transcript(driver.hostname)
+    driver.device = RecordingConnection(driver.device, transcript)
+    return transcript
@@ -0,0 +1,64 @@
+"""
+Export benchmark for ARP and MAC tables.
+
+Writes a 100k-row table as JSON, the way the interactive tool dumps it,
+and with the columnar export to Parquet and Feather, and reports the
+write time and file size of each.  Requires pyarrow.
+
+    python test/benchmark/bench_export.py
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from bench_memory import ROWS, arp_entries, mac_entries
+from napalm_brocade.export import ColumnarWriter
+from napalm_brocade.records import arp_entry_to_dict, mac_entry_to_dict
+
+
+def write_json(path, getter, table):
+    """Write table as JSON."""
+    with open(path, 'w') as output:
+        json.dump(table, output, sort_keys=True, indent=4)
+
+
+def write_columnar(format):
+    """Return a writer of table in format."""
+    def write(path, getter, table):
+        with ColumnarWriter(path, getter, format=format) as writer:
+            writer.write('sw0', table)
+    return write
+
+
+def main():
+    """Print the write time and size of every format."""
+    directory = tempfile.mkdtemp()
+    try:
+        cases = [
+            ('get_mac_address_table', mac_entries, mac_entry_to_dict),
+            ('get_arp_table', arp_entries, arp_entry_to_dict),
+        ]
+        formats = [
+            ('json', write_json),
+            ('parquet', write_columnar('parquet')),
+            ('feather', write_columnar('feather')),
+        ]
+        for getter, entries, to_dict in cases:
+            table = [to_dict(entry) for entry in entries()]
+            for name, write in formats:
+                path = os.path.join(directory, '%s.%s' % (getter, name))
+                start = time.time()
+                write(path, getter, table)
+                elapsed = time.time() - start
+                print("%-22s %-8s %7.3f s %10d bytes %6.1f bytes/entry" % (
+                    getter, name, elapsed, os.path.getsize(path),
+                    os.path.getsize(path) / float(ROWS)))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
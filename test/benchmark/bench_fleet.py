@@ -0,0 +1,89 @@
+"""
+Fleet polling benchmark.
+
+Polls an inventory of fake switches with BrocadeFleet, each one a
+ShellConnection (a local fake shell) answering 'show system' after
+SWITCH_DELAY seconds, and prints the wall time against polling the hosts
+one after the other.  A second run has more hung switches than workers
+to show that a sweep is bounded by host_timeout, not by the read
+timeout of the hung sessions.
+
+    python test/benchmark/bench_fleet.py
+"""
+
+import os
+import time
+
+from bench_parsers import MOCKED_DATA
+from napalm_brocade.brocade import BrocadeDriver
+from napalm_brocade.fleet import BrocadeFleet
+from napalm_brocade.utils.replay import ShellConnection, Transcript
+
+HOSTS = 100
+WORKERS = 16
+SWITCH_DELAY = 0.05
+# A hung switch answers long after host_timeout
+HUNG = 24
+HUNG_DELAY = 30
+HOST_TIMEOUT = 1
+
+
+class ShellDriver(BrocadeDriver):
+    """BrocadeDriver whose session is a local fake shell."""
+
+    def _connect(self):
+        transcript = Transcript.from_directory(
+            os.path.join(MOCKED_DATA, 'test_get_facts', 'normal'))
+        delay = HUNG_DELAY if self.hostname.startswith('hung') \
+            else SWITCH_DELAY
+        for entry in transcript.entries:
+            entry['elapsed'] = delay
+        return ShellConnection(transcript)
+
+
+def inventory(healthy, hung=0):
+    """Return an inventory of healthy and hung fake switches."""
+    return ([{'hostname': 'sw%d' % i} for i in range(healthy)] +
+            [{'hostname': 'hung%d' % i, 'timeout': HUNG_DELAY * 2}
+             for i in range(hung)])
+
+
+def serial(hosts):
+    """Poll hosts one after the other; return the wall time."""
+    start = time.time()
+    for host in hosts:
+        device = ShellDriver(host['hostname'], 'admin', 'pw')
+        device.open()
+        try:
+            device.get_facts()
+        finally:
+            device.close()
+    return time.time() - start
+
+
+def fleet(hosts):
+    """Poll hosts with BrocadeFleet; return the wall time and timeouts."""
+    start = time.time()
+    results = BrocadeFleet(hosts, ['get_facts'], max_workers=WORKERS,
+                           host_timeout=HOST_TIMEOUT,
+                           driver_class=ShellDriver).poll_all()
+    timeouts = len([result for result in results.values()
+                    if 'timeout' in result.errors])
+    return time.time() - start, timeouts
+
+
+def main():
+    """Print the wall time of each way of polling."""
+    hosts = inventory(HOSTS)
+    elapsed, _ = fleet(hosts)
+    print("%d switches, %d ms each: serial %6.2f s, fleet of %d %6.2f s"
+          % (HOSTS, SWITCH_DELAY * 1000, serial(hosts), WORKERS, elapsed))
+
+    elapsed, timeouts = fleet(inventory(HOSTS, HUNG))
+    print("%d switches + %d hung, host_timeout %ss: fleet of %d %6.2f s, "
+          "%d timeouts" % (HOSTS, HUNG, HOST_TIMEOUT, WORKERS, elapsed,
+                           timeouts))
+
+
+if __name__ == '__main__':
+    main()
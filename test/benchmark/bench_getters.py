@@ -0,0 +1,63 @@
+"""
+Getter benchmarks.
+
+Runs every getter end to end, from the session reads to the NAPALM
+result, against a ReplayConnection serving the captured CLI fixtures
+scaled to 10, 1k and 100k distinct table rows.  Needs pytest-benchmark:
+
+    py.test test/benchmark/bench_getters.py --benchmark-only
+"""
+
+import os
+
+import pytest
+
+from bench_parsers import MOCKED_DATA, scaled_output
+from napalm_brocade.brocade import BrocadeDriver
+from napalm_brocade.utils.replay import ReplayConnection, Transcript
+
+ROWS = [10, 1000, 100000]
+
+# (getter, test case, table command, number of header lines)
+TABLES = [
+    ('get_arp_table', 'test_get_arp_table', 'show arp', 3),
+    ('get_interfaces', 'test_get_interfaces', 'show ip interface brief', 3),
+    ('get_interfaces_counters', 'test_get_interfaces_counters',
+     'show interface stats brief', 3),
+    ('get_vlan_table', 'test_get_vlan_table', 'show vlan brief', 6),
+    ('get_mac_address_table', 'test_get_mac_address_table',
+     'show mac-address-table', 1),
+]
+
+# Getters whose output does not grow with the network
+FIXED = [
+    ('get_facts', 'test_get_facts'),
+    ('get_environment', 'test_get_environment'),
+]
+
+
+def make_driver(transcript):
+    """Return a driver replaying transcript."""
+    driver = BrocadeDriver('bench', 'admin', 'password')
+    driver.device = ReplayConnection(transcript)
+    return driver
+
+
+@pytest.mark.parametrize('rows', ROWS)
+@pytest.mark.parametrize('getter, test_case, command, header', TABLES)
+def test_table_getter(benchmark, getter, test_case, command, header, rows):
+    transcript = Transcript()
+    transcript.add(command, scaled_output(test_case, command, header, rows))
+    driver = make_driver(transcript)
+
+    result = benchmark(getattr(driver, getter))
+    assert result
+
+
+@pytest.mark.parametrize('getter, test_case', FIXED)
+def test_fixed_getter(benchmark, getter, test_case):
+    driver = make_driver(Transcript.from_directory(
+        os.path.join(MOCKED_DATA, test_case, 'normal')))
+
+    result = benchmark(getattr(driver, getter))
+    assert result
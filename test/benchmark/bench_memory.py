@@ -0,0 +1,75 @@
+"""
+Memory benchmark for ARP and MAC tables.
+
+Builds a 100k-row table as a list of dicts and as a columnar table and
+reports the bytes used per entry by each.
+
+    python test/benchmark/bench_memory.py
+"""
+
+import sys
+
+from napalm_brocade.records import ArpEntry, ArpTable, MacEntry, MacTable, \
+    arp_entry_to_dict, mac_entry_to_dict
+
+ROWS = 100000
+
+
+def deep_size(obj, seen=None):
+    """Return the size of obj and everything it references."""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen)
+                    for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(deep_size(item, seen) for item in obj)
+    elif hasattr(obj, '__dict__'):
+        size += deep_size(vars(obj), seen)
+    elif hasattr(obj, '__slots__'):
+        size += sum(deep_size(getattr(obj, name), seen)
+                    for name in obj.__slots__)
+    return size
+
+
+def mac_entries():
+    """Yield ROWS distinct MAC entries spread over 48 ports and 100 VLANs."""
+    for i in range(ROWS):
+        digits = '%012X' % (0x0027F8000000 + i)
+        yield MacEntry(mac=':'.join(digits[j:j + 2] for j in range(0, 12, 2)),
+                       interface='1/0/%d' % (i % 48 + 1),
+                       vlan=i % 100 + 1,
+                       static=False,
+                       active=True)
+
+
+def arp_entries():
+    """Yield ROWS distinct ARP entries."""
+    for i, entry in enumerate(mac_entries()):
+        yield ArpEntry(ip='10.%d.%d.%d' % (i >> 16, (i >> 8) & 255, i & 255),
+                       mac=entry.mac,
+                       interface='Ve %d' % entry.vlan,
+                       type='Dynamic',
+                       age=float(i % 300))
+
+
+def main():
+    """Print bytes per entry for dicts and columnar tables."""
+    cases = [
+        ('mac', mac_entries, mac_entry_to_dict, MacTable),
+        ('arp', arp_entries, arp_entry_to_dict, ArpTable),
+    ]
+    for name, entries, to_dict, table_class in cases:
+        dicts = [to_dict(entry) for entry in entries()]
+        table = table_class(entries())
+        print("%s dicts:    %6.1f bytes/entry" % (name, deep_size(dicts) / float(ROWS)))
+        print("%s columnar: %6.1f bytes/entry" % (name, deep_size(table) / float(ROWS)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Parse cost benchmark.
+
+Scales the captured CLI fixtures up to 10k data lines and reports the
+time each parser takes per 10k lines of output.
+
+    python test/benchmark/bench_parsers.py
+"""
+
+import os
+import re
+import timeit
+
+from napalm_brocade import parsers
+
+MOCKED_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           os.pardir, 'unit', 'mocked_data')
+
+LINES = 10000
+
+# (test case, command, parser, number of header lines)
+CASES = [
+    ('test_get_arp_table', 'show arp', parsers.parse_arp, 3),
+    ('test_get_interfaces', 'show ip interface brief',
+     parsers.parse_ip_interface_brief, 3),
+    ('test_get_interfaces_counters', 'show interface stats brief',
+     parsers.parse_interface_stats_brief, 3),
+    ('test_get_vlan_table', 'show vlan brief', parsers.parse_vlan_brief, 6),
+    ('test_get_mac_address_table', 'show mac-address-table',
+     lambda output: list(parsers.parse_mac_address_table(output.splitlines())),
+     1),
+]
+
+
+# Per-row values of a table, and how the n-th row renders them
+_UNIQUE = [
+    (re.compile(r'\b[0-9a-f]{4}\.[0-9a-f]{4}\.[0-9a-f]{4}\b'),
+     lambda n: '0027.%04x.%04x' % (n >> 16, n & 0xffff)),
+    (re.compile(r'\b\d+\.\d+\.\d+\.\d+\b'),
+     lambda n: '10.%d.%d.%d' % (n >> 16 & 255, n >> 8 & 255, n & 255)),
+    (re.compile(r'\b\d+/\d+/\d+\b|\b\d+/\d+\b(?!/)'),
+     lambda n: '%d/%d/%d' % (n // 4096 + 1, n // 64 % 64, n % 64)),
+    (re.compile(r'\bVe \d+'), lambda n: 'Ve %d' % n),
+    # VLAN id leading a row
+    (re.compile(r'^\d+'), lambda n: '%d' % n),
+]
+
+
+def scaled_output(test_case, command, header, count=LINES):
+    """
+    Repeat the data rows of a fixture until it has count rows.
+
+    Every row gets its own MAC, IP address, port and VLAN, so the tables
+    keyed on them really hold count entries.
+    """
+    filename = '%s.txt' % command.replace(' ', '_')
+    with open(os.path.join(MOCKED_DATA, test_case, 'normal', filename)) as f:
+        lines = f.read().splitlines()
+    rows = [line for line in lines[header:] if not line.startswith('Total')]
+    rows = (rows * (count // len(rows) + 1))[:count]
+    for n, row in enumerate(rows, 1):
+        for pattern, value in _UNIQUE:
+            row = pattern.sub(value(n), row)
+        rows[n - 1] = row
+    return '\n'.join(lines[:header] + rows) + '\n'
+
+
+def main():
+    """Run every parser and print its cost per 10k lines."""
+    for test_case, command, parser, header in CASES:
+        output = scaled_output(test_case, command, header)
+        runs = 10
+        elapsed = min(timeit.repeat(lambda: parser(output), number=runs,
+                                    repeat=3)) / runs
+        print("%-30s %8.2f ms / %d lines" % (command, elapsed * 1000, LINES))
+
+
+if __name__ == '__main__':
+    main()
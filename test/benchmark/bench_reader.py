@@ -0,0 +1,84 @@
+"""
+Per-command latency benchmark of the command reads.
+
+Sends commands to a ShellConnection, a local fake shell answering after
+a configurable delay, with PromptReader and with the read loop of
+netmiko's send_command(), and prints the mean latency of each.  netmiko
+is not needed: its loop is reproduced with the sleeps of the default
+delay_factor of 1, a 0.1s find_prompt() wait, a 0.2s wait after the
+write and 0.2s between empty reads.
+
+    python test/benchmark/bench_reader.py
+"""
+
+import re
+import time
+
+from napalm_brocade.reader import session_reader
+from napalm_brocade.utils.replay import ShellConnection, Transcript
+
+REPEAT = 10
+
+# (command, switch response time in seconds, output lines)
+CASES = [
+    ('show system', 0.0, 10),
+    ('show system', 0.005, 10),
+    ('show system', 0.05, 10),
+    ('show arp', 0.05, 5000),
+]
+
+
+def netmiko_send_command(connection, command, delay_factor=1):
+    """The waits and polling of netmiko's send_command()."""
+    connection.clear_buffer()
+    time.sleep(delay_factor * 0.1)
+    prompt = connection.find_prompt()
+    time.sleep(delay_factor * 0.2)
+    connection.clear_buffer()
+    connection.write_channel(command + '\n')
+    output = ''
+    pattern = re.escape(prompt)
+    while True:
+        data = connection.read_channel()
+        if data:
+            output += data
+            if re.search(pattern, output):
+                return output
+        else:
+            time.sleep(delay_factor * 0.2)
+
+
+def prompt_reader_send_command(connection, command):
+    """Read command with the PromptReader of the session."""
+    return session_reader(connection).run([command])
+
+
+def mean_latency(send, command, delay, lines):
+    """Return the mean time of send(connection, command) in seconds."""
+    transcript = Transcript()
+    transcript.add(command, '\n'.join('line %d' % i for i in range(lines)),
+                   delay)
+    connection = ShellConnection(transcript)
+    try:
+        send(connection, command)
+        start = time.time()
+        for _ in range(REPEAT):
+            send(connection, command)
+        return (time.time() - start) / REPEAT
+    finally:
+        connection.disconnect()
+
+
+def main():
+    """Print the latency of each reader per case."""
+    for command, delay, lines in CASES:
+        netmiko = mean_latency(netmiko_send_command, command, delay, lines)
+        reader = mean_latency(prompt_reader_send_command, command, delay,
+                              lines)
+        print("%-12s %5d lines, switch %5.1f ms: netmiko %6.1f ms, "
+              "PromptReader %6.1f ms" % (command, lines, delay * 1000,
+                                         netmiko * 1000, reader * 1000))
+
+
+if __name__ == '__main__':
+    main()
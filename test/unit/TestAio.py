@@ -0,0 +1,100 @@
+"""Tests for the asyncio front-end."""
+
+import sys
+import threading
+import time
+import unittest
+
+if sys.version_info >= (3, 7):
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+    from napalm_brocade.aio import AsyncBrocadeDriver
+
+
+class FakeDriver(object):
+    """Test double that blocks like a real session."""
+
+    latency = 0.1
+
+    def __init__(self, hostname, username, password, timeout=60,
+                 optional_args=None):
+        self.hostname = hostname
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def open(self):
+        pass
+
+    def get_facts(self):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.latency)
+        with self.lock:
+            self.active -= 1
+        return {'hostname': self.hostname}
+
+
+@unittest.skipIf(sys.version_info < (3, 7), "requires Python 3.7")
+class TestAsyncBrocadeDriver(unittest.TestCase):
+    """Group of tests for AsyncBrocadeDriver."""
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.addCleanup(self.loop.close)
+
+    def make_device(self, hostname):
+        return AsyncBrocadeDriver(hostname, 'admin', 'pw',
+                                  driver_class=FakeDriver)
+
+    def test_devices_polled_concurrently(self):
+        devices = [self.make_device('sw%d' % i) for i in range(20)]
+        calls = asyncio.gather(*[device.get_facts() for device in devices])
+        start = time.time()
+        results = self.loop.run_until_complete(calls)
+        self.assertLess(time.time() - start, 20 * FakeDriver.latency / 4)
+        self.assertEqual(results[3], {'hostname': 'sw3'})
+
+    def test_calls_on_one_device_serialized(self):
+        device = self.make_device('sw0')
+        calls = asyncio.gather(*[device.get_facts() for _ in range(3)])
+        self.loop.run_until_complete(calls)
+        self.assertEqual(device.driver.max_active, 1)
+
+    def test_cancelled_call_keeps_session(self):
+        device = self.make_device('sw0')
+
+        async def poll():
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(device.get_facts(),
+                                       FakeDriver.latency / 4)
+            return await device.get_facts()
+
+        self.assertEqual(self.loop.run_until_complete(poll()),
+                         {'hostname': 'sw0'})
+        self.assertEqual(device.driver.max_active, 1)
+
+    def test_waiting_calls_hold_no_thread(self):
+        # Queued calls on a busy device do not take the only worker
+        executor = ThreadPoolExecutor(1)
+        self.addCleanup(executor.shutdown)
+        busy = AsyncBrocadeDriver('sw0', 'admin', 'pw', executor=executor,
+                                  driver_class=FakeDriver)
+        other = AsyncBrocadeDriver('sw1', 'admin', 'pw', executor=executor,
+                                   driver_class=FakeDriver)
+        finished = []
+
+        async def poll(device):
+            await device.get_facts()
+            finished.append(device.driver.hostname)
+
+        calls = [poll(busy) for _ in range(3)] + [poll(other)]
+        self.loop.run_until_complete(asyncio.gather(*calls))
+        self.assertEqual(finished[:2], ['sw0', 'sw1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
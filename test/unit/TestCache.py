@@ -0,0 +1,89 @@
+"""Tests for the result cache."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from napalm_brocade.cache import ResultCache, SqliteResultCache
+
+
+class FakeClock(object):
+    """Clock that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CacheTests(object):
+    """Tests shared by every cache implementation."""
+
+    def make_cache(self, **kwargs):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = self.make_cache(max_entries=2, default_ttl=10,
+                                     clock=self.clock)
+
+    def test_hit_and_miss(self):
+        self.assertIsNone(self.cache.get('sw0', 'show system'))
+        self.cache.set('sw0', 'show system', 'output')
+        self.assertEqual(self.cache.get('sw0', 'show system'), 'output')
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_ttl_expiry(self):
+        self.cache.set('sw0', 'show vlan brief', 'vlans', ttl=5)
+        self.clock.now += 4
+        self.assertEqual(self.cache.get('sw0', 'show vlan brief'), 'vlans')
+        self.clock.now += 2
+        self.assertIsNone(self.cache.get('sw0', 'show vlan brief'))
+
+    def test_lru_eviction(self):
+        self.cache.set('sw0', 'a', '1')
+        self.clock.now += 1
+        self.cache.set('sw0', 'b', '2')
+        self.clock.now += 1
+        self.cache.get('sw0', 'a')
+        self.clock.now += 1
+        self.cache.set('sw0', 'c', '3')
+        self.assertIsNone(self.cache.get('sw0', 'b'))
+        self.assertEqual(self.cache.get('sw0', 'a'), '1')
+        self.assertEqual(self.cache.get('sw0', 'c'), '3')
+
+    def test_invalidate_host(self):
+        self.cache.set('sw0', 'a', '1')
+        self.cache.set('sw1', 'a', '1')
+        self.cache.invalidate('sw0')
+        self.assertIsNone(self.cache.get('sw0', 'a'))
+        self.assertEqual(self.cache.get('sw1', 'a'), '1')
+
+
+class TestResultCache(CacheTests, unittest.TestCase):
+    """Group of tests for the in-memory cache."""
+
+    def make_cache(self, **kwargs):
+        return ResultCache(**kwargs)
+
+
+class TestSqliteResultCache(CacheTests, unittest.TestCase):
+    """Group of tests for the sqlite backed cache."""
+
+    def make_cache(self, **kwargs):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        return SqliteResultCache(os.path.join(self.tmpdir, 'cache.db'),
+                                 **kwargs)
+
+    def test_shared_between_instances(self):
+        self.cache.set('sw0', 'show system', 'output')
+        other = SqliteResultCache(self.cache.path, clock=self.clock)
+        self.assertEqual(other.get('sw0', 'show system'), 'output')
+
+
+if __name__ == '__main__':
+    unittest.main()
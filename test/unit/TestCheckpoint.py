@@ -0,0 +1,70 @@
+"""Tests for the checkpoint store."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from napalm_brocade.checkpoint import CheckpointStore
+from napalm_brocade.diff import config_hash
+
+RUNNING_A = "hostname sw1\ninterface Ve 100\n ip address 10.0.0.1/24\n!\n"
+RUNNING_B = "hostname sw1\ninterface Ve 100\n ip address 10.0.0.2/24\n!\n"
+
+
+class TestCheckpointStore(unittest.TestCase):
+    """Group of tests for CheckpointStore."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = CheckpointStore(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def objects(self):
+        return os.listdir(os.path.join(self.directory, 'objects'))
+
+    def test_save_returns_content_hash(self):
+        version = self.store.save('sw1', RUNNING_A)
+        self.assertEqual(version, config_hash(RUNNING_A))
+        self.assertEqual(self.store.latest('sw1'), version)
+        self.assertEqual(self.store.load(version), RUNNING_A)
+
+    def test_unchanged_config_not_recorded_again(self):
+        self.store.save('sw1', RUNNING_A, timestamp=1)
+        self.store.save('sw1', RUNNING_A, timestamp=2)
+        self.assertEqual(self.store.history('sw1'),
+                         [(1.0, config_hash(RUNNING_A))])
+
+    def test_history_in_order(self):
+        self.store.save('sw1', RUNNING_A, timestamp=1)
+        self.store.save('sw1', RUNNING_B, timestamp=2)
+        self.store.save('sw1', RUNNING_A, timestamp=3)
+        self.assertEqual([v for _, v in self.store.history('sw1')],
+                         [config_hash(RUNNING_A), config_hash(RUNNING_B),
+                          config_hash(RUNNING_A)])
+        self.assertEqual(len(self.objects()), 2)
+
+    def test_objects_shared_across_hosts_and_names(self):
+        self.store.save('sw1', RUNNING_A)
+        self.store.save('sw2', RUNNING_A)
+        self.store.save('sw2', RUNNING_A, name='startup')
+        self.assertEqual(len(self.objects()), 1)
+        self.assertEqual(self.store.latest('sw2', 'startup'),
+                         config_hash(RUNNING_A))
+        self.assertIsNone(self.store.latest('sw3'))
+
+    def test_flash_copy(self):
+        self.assertIsNone(self.store.flash('sw1'))
+        self.store.record_flash('sw1', config_hash(RUNNING_A), 'f' * 32)
+        self.assertEqual(self.store.flash('sw1'),
+                         (config_hash(RUNNING_A), 'f' * 32))
+        self.assertIsNone(self.store.flash('sw1', 'startup'))
+
+    def test_unknown_version(self):
+        self.assertRaises(KeyError, self.store.load, '0' * 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,271 @@
+"""Tests for sending commands over the session channel."""
+
+import unittest
+
+from napalm_base.exceptions import CommandErrorException, \
+    CommandTimeoutException
+
+from napalm_brocade.brocade import ENVIRONMENT_SECTIONS, BrocadeDriver, \
+    _split_batch_output
+from napalm_brocade.utils.replay import ReplayConnection, record
+
+OUTPUTS = {
+    'show environment fan': 'Fan 1 is Ok, speed is 6945 RPM\n'
+                            'Fan 2 is Ok, speed is 6876 RPM\n'
+                            'Fan 3 is Absent, speed is 0 RPM',
+    'show environment power': 'Power Supply:\n'
+                              'Power Supply #1 is OK\n'
+                              'Power Supply #2 is faulty',
+    'show environment temp': 'Sensor  State      Centigrade   Fahrenheit\n'
+                             '  ID\n'
+                             '==========================================\n'
+                             '1       Ok         39           102\n'
+                             '2       Ok         46           114',
+    'show process cpu': 'Realtime Statistics:\n'
+                        'Total CPU Utilization: 4.10%\n'
+                        'CPU Utilization One minute: 3.25%; '
+                        'Five minutes: 3.14%; Fifteen minutes: 3.09%',
+    'show process memory summary': '%Memory Used: 49.658936%; '
+                                   'TotalMemory: 3902472 KB; '
+                                   'Total Used: 1937904 KB; '
+                                   'Total Free: 1964568 KB',
+    'show mac-address-table':
+        'VlanId/BDId  Type  Mac-address     Type     State     Ports\n'
+        '1            Vlan  0005.33e5.d764  Dynamic  Active    Te 1/0/1\n'
+        '1            Vlan  0027.f8ca.4311  Static   Active    Te 1/0/2\n'
+        '2000         Vlan  0027.f8ca.4312  Dynamic  Inactive  Te 1/0/3\n'
+        'Total MAC addresses    : 3',
+    'show mac-address-table interface tengigabitethernet 1/0/2':
+        'VlanId/BDId  Type  Mac-address     Type     State     Ports\n'
+        '1            Vlan  0027.f8ca.4311  Static   Active    Te 1/0/2\n'
+        'Total MAC addresses    : 1',
+    'show mac-address-table vlan 2000':
+        'VlanId/BDId  Type  Mac-address     Type     State     Ports\n'
+        '2000         Vlan  0027.f8ca.4312  Dynamic  Inactive  Te 1/0/3\n'
+        'Total MAC addresses    : 1',
+}
+
+
+class FakeSession(object):
+    """Test double of a netmiko session with a raw channel."""
+
+    prompt = 'sw0#'
+
+    def __init__(self, outputs, chunk_size=7):
+        self.outputs = outputs
+        self.chunk_size = chunk_size
+        self.writes = []
+        self._buffer = ''
+
+    def find_prompt(self):
+        return self.prompt
+
+    def send_command(self, cmd, *args, **kwargs):
+        self.writes.append(cmd + '\n')
+        return self.outputs.get(cmd, '')
+
+    def clear_buffer(self):
+        self._buffer = ''
+
+    def write_channel(self, data):
+        self.writes.append(data)
+        for cmd in data.split('\n'):
+            if cmd.strip():
+                output = self.outputs.get(cmd, '').replace('\n', '\r\n')
+                self._buffer += '%s\r\n%s\r\n%s' % (cmd, output, self.prompt)
+
+    def read_channel(self):
+        data = self._buffer[:self.chunk_size]
+        self._buffer = self._buffer[self.chunk_size:]
+        return data
+
+
+class TestBatch(unittest.TestCase):
+    """Group of tests for the batched commands."""
+
+    def setUp(self):
+        self.device = BrocadeDriver('sw0', 'admin', 'pw')
+        self.device.device = FakeSession(OUTPUTS)
+
+    def test_split_batch_output(self):
+        output = ('show a\r\nfirst\r\nsw0#show b\r\n'
+                  'second\r\nlines\r\nsw0#')
+        self.assertEqual(_split_batch_output(output, 'sw0#',
+                                             ['show a', 'show b']),
+                         ['first', 'second\nlines'])
+
+    def test_split_batch_output_prompt_in_output(self):
+        output = ('show a\r\ndescription to sw0# uplink\r\nsw0#show b\r\n'
+                  'second\r\nsw0#')
+        self.assertEqual(_split_batch_output(output, 'sw0#',
+                                             ['show a', 'show b']),
+                         ['description to sw0# uplink', 'second'])
+
+    def test_split_batch_output_missing_prompt(self):
+        self.assertRaises(CommandErrorException, _split_batch_output,
+                          'show a\r\nfirst\r\n', 'sw0#',
+                          ['show a', 'show b', 'show c'])
+
+    def test_one_write_for_the_batch(self):
+        commands = ['show environment fan', 'show environment power']
+        self.assertEqual(self.device.send_commands(commands),
+                         [OUTPUTS[cmd] for cmd in commands])
+        # Paging is disabled once per session, then one write per batch
+        self.assertEqual(self.device.device.writes[1:],
+                         [''.join(cmd + '\n' for cmd in commands)])
+
+    def test_environment_keeps_every_row(self):
+        environment = self.device.get_environment()
+        self.assertEqual(sorted(environment['fans']), ['1', '2', '3'])
+        self.assertEqual(environment['power'],
+                         {'1': {'status': True}, '2': {'status': False}})
+        self.assertEqual(sorted(environment['temperature']), ['1', '2'])
+
+
+class SilentSession(FakeSession):
+    """Session that never answers."""
+
+    def write_channel(self, data):
+        self.writes.append(data)
+
+
+class TestStreaming(unittest.TestCase):
+    """Group of tests for the commands read line by line."""
+
+    def setUp(self):
+        self.device = BrocadeDriver('sw0', 'admin', 'pw')
+        self.device.device = FakeSession(OUTPUTS, chunk_size=5)
+
+    def test_lines(self):
+        self.assertEqual(
+            list(self.device._iter_command_lines('show mac-address-table')),
+            OUTPUTS['show mac-address-table'].split('\n'))
+
+    def test_mac_address_table_filters(self):
+        entries = list(self.device.iter_mac_address_table())
+        self.assertEqual([entry.vlan for entry in entries], [1, 1, 2000])
+        entries = list(self.device.iter_mac_address_table(
+            interface='Te 1/0/2'))
+        self.assertEqual([entry.static for entry in entries], [True])
+        entries = list(self.device.iter_mac_address_table(vlan='2000'))
+        self.assertEqual([(entry.interface, entry.active)
+                          for entry in entries], [('1/0/3', False)])
+        # The filters are passed down to the switch
+        self.assertEqual(
+            [data for data in self.device.device.writes
+             if data.startswith('show mac-address-table ')],
+            ['show mac-address-table interface tengigabitethernet 1/0/2\n',
+             'show mac-address-table vlan 2000\n'])
+
+    def test_early_stop_drains_output(self):
+        lines = self.device._iter_command_lines('show mac-address-table')
+        next(lines)
+        lines.close()
+        self.assertEqual(self.device.device.read_channel(), '')
+        self.assertEqual(self.device.send_commands(['show process cpu',
+                                                    'show environment fan']),
+                         [OUTPUTS['show process cpu'],
+                          OUTPUTS['show environment fan']])
+
+    def test_timeout(self):
+        self.device.device = SilentSession(OUTPUTS)
+        self.device.timeout = 0.05
+        self.assertRaises(CommandTimeoutException, list,
+                          self.device._iter_command_lines('show arp'))
+
+
+class FakeExecChannel(object):
+    """Test double of a paramiko channel running one command."""
+
+    def __init__(self, session):
+        self.session = session
+        self._data = b''
+
+    def settimeout(self, timeout):
+        pass
+
+    def exec_command(self, cmd):
+        self.session.execs.append(cmd)
+        self._data = self.session.outputs[cmd].replace(
+            '\n', '\r\n').encode('utf-8')
+
+    def recv(self, nbytes):
+        data, self._data = self._data[:5], self._data[5:]
+        return data
+
+    def close(self):
+        pass
+
+
+class FakeTransport(object):
+    """Test double of the paramiko transport of a session."""
+
+    def __init__(self, session, refuse):
+        self.session = session
+        self.refuse = refuse
+
+    def get_transport(self):
+        return self
+
+    def open_session(self):
+        if self.refuse:
+            raise EOFError("exec channels refused")
+        return FakeExecChannel(self.session)
+
+
+class ChannelSession(FakeSession):
+    """FakeSession whose transport can open exec channels."""
+
+    def __init__(self, outputs, refuse=False):
+        super(ChannelSession, self).__init__(outputs)
+        self.execs = []
+        self.remote_conn = FakeTransport(self, refuse)
+
+
+class TestChannels(unittest.TestCase):
+    """Group of tests for the commands run on parallel channels."""
+
+    def setUp(self):
+        self.device = BrocadeDriver('sw0', 'admin', 'pw')
+        self.device.device = ChannelSession(OUTPUTS)
+
+    def test_environment_fan_out(self):
+        environment = self.device.get_environment()
+        self.assertEqual(sorted(self.device.device.execs),
+                         sorted(command for command, _
+                                in ENVIRONMENT_SECTIONS.values()))
+        self.assertEqual(self.device.device.writes, [])
+        self.assertEqual(sorted(environment['fans']), ['1', '2', '3'])
+        self.assertEqual(environment['cpu'], {0: {'%usage': 3.25}})
+        self.assertEqual(environment['memory']['used_ram'], 1937904 * 1024)
+
+    def test_environment_sections(self):
+        environment = self.device.get_environment(
+            sections=['temperature', 'cpu'])
+        self.assertEqual(sorted(self.device.device.execs),
+                         ['show environment temp', 'show process cpu'])
+        self.assertEqual(sorted(environment), ['cpu', 'temperature'])
+        self.assertRaises(ValueError, self.device.get_environment,
+                          sections=['fans', 'voltage'])
+
+    def test_fallback_to_batch(self):
+        self.device.device = ChannelSession(OUTPUTS, refuse=True)
+        expected = BrocadeDriver('sw0', 'admin', 'pw')
+        expected.device = FakeSession(OUTPUTS)
+        self.assertEqual(self.device.get_environment(),
+                         expected.get_environment())
+        self.assertFalse(self.device.parallel_channels)
+        self.assertIn('show environment fan\n',
+                      ''.join(self.device.device.writes))
+
+    def test_recorded_for_replay(self):
+        transcript = record(self.device)
+        environment = self.device.get_environment()
+        self.assertEqual(len(self.device.device.execs),
+                         len(ENVIRONMENT_SECTIONS))
+        self.device.device = ReplayConnection(transcript)
+        self.assertEqual(self.device.get_environment(), environment)
+
+
+if __name__ == '__main__':
+    unittest.main()
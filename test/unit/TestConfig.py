@@ -0,0 +1,378 @@
+"""Tests for the config workflow of the driver."""
+
+import hashlib
+import shutil
+import tempfile
+import unittest
+
+from napalm_base.exceptions import MergeConfigException, \
+    ReplaceConfigException
+
+from napalm_brocade import brocade
+from napalm_brocade.checkpoint import CheckpointStore
+from napalm_brocade.instrumentation import Instrumentation
+
+RUNNING = "hostname sw0\ninterface Vlan 100\n!\n"
+CHANGED = "hostname sw0\ninterface Vlan 100\n!\ninterface Vlan 200\n!\n"
+RUNNING_PATH = brocade.FLASH_DIR + '/_running.cfg'
+
+
+class FakeFileClient(object):
+    """Test double of an SFTP or SCP client writing to the fake flash."""
+
+    def __init__(self, session, kind):
+        self.session = session
+        self.kind = kind
+
+    def putfo(self, fl, remote_path):
+        data = fl.read()
+        if self.session.corrupt:
+            data = data[:-1]
+        self.session.flash[remote_path] = hashlib.md5(data).hexdigest()
+        self.session.uploads.append((self.kind, remote_path))
+
+    def close(self):
+        pass
+
+
+class FakeTransport(object):
+    """Test double of the paramiko transport of a session."""
+
+    def __init__(self, session):
+        self.session = session
+
+    def get_transport(self):
+        return self
+
+    def open_sftp_client(self):
+        if not self.session.sftp:
+            raise EOFError("subsystem request failed")
+        return FakeFileClient(self.session, 'sftp')
+
+
+class ConfigSession(object):
+    """Test double of a netmiko session running config commands."""
+
+    def __init__(self, running):
+        self.running = running
+        self.commands = []
+        self.config_sets = []
+        self.config_set_error = None
+        # MD5 of the files on flash, by path
+        self.flash = {}
+        self.remote_conn = FakeTransport(self)
+        self.sftp = True
+        self.corrupt = False
+        self.uploads = []
+
+    def send_command(self, cmd, *args, **kwargs):
+        self.commands.append(cmd)
+        if cmd == 'show running-config':
+            return self.running
+        if cmd == 'copy running-config flash://_running.cfg':
+            self.flash[RUNNING_PATH] = hashlib.md5(
+                self.running.encode('utf-8')).hexdigest()
+        elif cmd.startswith('oscmd rm '):
+            self.flash.pop(cmd.split()[-1], None)
+        elif cmd.startswith('oscmd md5sum '):
+            path = cmd.split()[-1]
+            if path not in self.flash:
+                return 'md5sum: %s: No such file or directory' % path
+            return '%s  %s' % (self.flash[path], path)
+        return ''
+
+    def send_config_set(self, commands):
+        self.config_sets.append(commands)
+        if self.config_set_error is not None:
+            raise self.config_set_error
+        self.running = RUNNING
+        return ''
+
+
+class TestCheckpoint(unittest.TestCase):
+    """Group of tests for the checkpoints of the running config."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.device = brocade.BrocadeDriver(
+            'sw0', 'admin', 'pw',
+            optional_args={'checkpoints': CheckpointStore(self.directory)})
+        self.device.device = ConfigSession(RUNNING)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def copies(self):
+        return self.device.device.commands.count(
+            'copy running-config flash://_running.cfg')
+
+    def test_store_is_opt_in(self):
+        self.device = brocade.BrocadeDriver('sw0', 'admin', 'pw')
+        self.device.device = ConfigSession(RUNNING)
+        self.assertIsNone(self.device.checkpoints)
+        self.device._checkpoint_running_config()
+        self.device._checkpoint_running_config()
+        self.assertEqual(self.copies(), 2)
+        self.assertRaises(ValueError, self.device.rollback_config,
+                          version='0' * 40)
+
+    def test_unchanged_config_not_copied_again(self):
+        version = self.device._checkpoint_running_config()
+        self.assertEqual(self.device._checkpoint_running_config(), version)
+        self.assertEqual(self.copies(), 1)
+
+    def test_changed_config_copied(self):
+        self.device._checkpoint_running_config()
+        self.device.device.running = CHANGED
+        self.device._checkpoint_running_config()
+        self.assertEqual(self.copies(), 2)
+
+    def test_force(self):
+        self.device._checkpoint_running_config()
+        self.device._checkpoint_running_config(force=True)
+        self.assertEqual(self.copies(), 2)
+
+    def test_missing_flash_copy_copied_again(self):
+        self.device._checkpoint_running_config()
+        del self.device.device.flash[RUNNING_PATH]
+        self.device._checkpoint_running_config()
+        self.assertEqual(self.copies(), 2)
+
+    def test_stale_flash_copy_copied_again(self):
+        self.device._checkpoint_running_config()
+        self.device.device.flash[RUNNING_PATH] = '0' * 32
+        self.device._checkpoint_running_config()
+        self.assertEqual(self.copies(), 2)
+
+
+class TestLoadCandidate(unittest.TestCase):
+    """Group of tests for loading a candidate over the session."""
+
+    def setUp(self):
+        self.device = brocade.BrocadeDriver('sw0', 'admin', 'pw')
+        self.device.device = ConfigSession(RUNNING)
+        self._scp_client = brocade._scp_client
+        brocade._scp_client = lambda transport: FakeFileClient(
+            transport.session, 'scp')
+
+    def tearDown(self):
+        brocade._scp_client = self._scp_client
+
+    def test_sftp_upload(self):
+        self.device.load_merge_candidate(config='interface Vlan 200\n')
+        self.assertEqual(self.device.device.uploads,
+                         [('sftp', brocade.CANDIDATE_PATH)])
+        self.assertIn('oscmd md5sum %s' % brocade.CANDIDATE_PATH,
+                      self.device.device.commands)
+
+    def test_scp_fallback(self):
+        self.device.device.sftp = False
+        self.device.load_replace_candidate(config=CHANGED)
+        self.assertEqual(self.device.device.uploads,
+                         [('scp', brocade.CANDIDATE_PATH)])
+
+    def test_scp(self):
+        self.device.config_transfer = 'scp'
+        self.device.load_merge_candidate(config='interface Vlan 200\n')
+        self.assertEqual(self.device.device.uploads,
+                         [('scp', brocade.CANDIDATE_PATH)])
+
+    def test_checksum_mismatch(self):
+        self.device.device.corrupt = True
+        self.assertRaises(MergeConfigException,
+                          self.device.load_merge_candidate,
+                          config='interface Vlan 200\n')
+        self.assertRaises(ReplaceConfigException,
+                          self.device.load_replace_candidate, config=CHANGED)
+        # The candidate never reached flash: nothing to compare
+        self.assertEqual(self.device.compare_config(), '')
+
+    def test_spans(self):
+        spans = []
+        self.device.instrumentation = Instrumentation([spans.append])
+        self.device.load_merge_candidate(config='interface Vlan 200\n')
+        self.device.commit_config()
+        self.device.discard_config()
+        self.assertEqual(
+            [(span.name, span.attrs.get('command')) for span in spans],
+            [('command', 'oscmd rm %s' % brocade.CANDIDATE_PATH),
+             ('upload', None),
+             ('command', 'oscmd md5sum %s' % brocade.CANDIDATE_PATH),
+             ('command', 'copy flash://_candidate.cfg running-config'),
+             ('command', 'oscmd rm %s' % brocade.CANDIDATE_PATH)])
+        self.assertEqual(spans[1].bytes, len('interface Vlan 200\n'))
+
+    def test_candidate_required(self):
+        self.assertRaises(MergeConfigException,
+                          self.device.load_merge_candidate)
+
+
+class TestCompareConfig(unittest.TestCase):
+    """Group of tests for compare_config()."""
+
+    def setUp(self):
+        self.device = brocade.BrocadeDriver('sw0', 'admin', 'pw')
+        self.device.device = ConfigSession(RUNNING)
+
+    def fetches(self):
+        return self.device.device.commands.count('show running-config')
+
+    def test_no_candidate(self):
+        self.assertEqual(self.device.compare_config(), '')
+
+    def test_merge(self):
+        self.device.load_merge_candidate(config='interface Vlan 200\n!\n')
+        text = self.device.compare_config()
+        self.assertEqual(self.device.config_changes,
+                         [('+', ('interface Vlan 200',))])
+        self.assertIn('+interface Vlan 200', text)
+        self.assertNotIn('\n-', text)
+
+    def test_replace(self):
+        self.device.load_replace_candidate(config='hostname sw0\n')
+        text = self.device.compare_config()
+        self.assertEqual(self.device.config_changes,
+                         [('-', ('interface Vlan 100',))])
+        self.assertIn('-interface Vlan 100', text)
+
+    def test_replace_commit_removes(self):
+        self.device.load_replace_candidate(config='hostname sw0\n')
+        self.device.commit_config()
+        self.assertEqual(self.device.device.config_sets,
+                         [['no interface Vlan 100']])
+
+    def test_merge_commit_removes_nothing(self):
+        self.device.load_merge_candidate(config='hostname sw0\n')
+        self.device.commit_config()
+        self.assertEqual(self.device.device.config_sets, [])
+
+    def test_running_config_fetched_once(self):
+        self.device.load_merge_candidate(config='interface Vlan 200\n!\n')
+        self.device.compare_config()
+        self.device.compare_config()
+        self.assertEqual(self.fetches(), 1)
+        # A commit changes the running config
+        self.device.commit_config()
+        self.device.device.running = CHANGED
+        self.device.load_replace_candidate(config=CHANGED)
+        self.assertEqual(self.device.compare_config(), '')
+        self.assertEqual(self.fetches(), 2)
+
+    def test_discarded(self):
+        self.device.load_merge_candidate(config='interface Vlan 200\n!\n')
+        self.device.discard_config()
+        self.assertEqual(self.device.compare_config(), '')
+
+
+class TestRollback(unittest.TestCase):
+    """Group of tests for rollback_config()."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.device = brocade.BrocadeDriver(
+            'sw0', 'admin', 'pw',
+            optional_args={'checkpoints': CheckpointStore(self.directory)})
+        self.device.device = ConfigSession(RUNNING)
+        self.device._checkpoint_running_config()
+        self.device.device.running = CHANGED
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def reloaded(self):
+        return 'reload system\ny\n' in self.device.device.commands
+
+    def test_live(self):
+        self.device.rollback_config()
+        self.assertEqual(self.device.rollback_report['mode'], 'live')
+        self.assertEqual(self.device.device.config_sets,
+                         [['no interface Vlan 200']])
+        self.assertEqual(self.device.device.running, RUNNING)
+        self.assertFalse(self.reloaded())
+
+    def test_live_without_store(self):
+        self.device = brocade.BrocadeDriver('sw0', 'admin', 'pw')
+        self.device.device = ConfigSession(RUNNING)
+        self.device._checkpoint_running_config()
+        self.device.load_merge_candidate(config='interface Vlan 200\n!\n')
+        self.device.commit_config()
+        self.device.device.running = CHANGED
+        self.device.rollback_config()
+        self.assertEqual(self.device.rollback_report['mode'], 'live')
+        self.assertEqual(self.device.device.config_sets,
+                         [['no interface Vlan 200']])
+        self.assertFalse(self.reloaded())
+
+    def test_no_checkpoint_reloads(self):
+        self.device = brocade.BrocadeDriver('sw0', 'admin', 'pw')
+        self.device.device = ConfigSession(CHANGED)
+        self.device.rollback_config()
+        self.assertEqual(self.device.rollback_report['mode'], 'reload')
+        self.assertTrue(self.reloaded())
+
+    def test_live_error_falls_back_to_reload(self):
+        error = IOError('channel closed')
+        self.device.device.config_set_error = error
+        self.device.rollback_config()
+        self.assertEqual(self.device.rollback_report['mode'], 'reload')
+        self.assertIs(self.device.rollback_report['error'], error)
+        self.assertIn('copy flash://_running.cfg running-config',
+                      self.device.device.commands)
+        self.assertTrue(self.reloaded())
+
+    def test_reload_mode(self):
+        self.device.rollback_mode = 'reload'
+        self.device.rollback_config()
+        self.assertEqual(self.device.rollback_report['mode'], 'reload')
+        self.assertEqual(self.device.device.config_sets, [])
+        self.assertTrue(self.reloaded())
+
+
+class TestCacheInvalidation(unittest.TestCase):
+    """Group of tests for the cached getter output after config changes."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.device = brocade.BrocadeDriver(
+            'sw0', 'admin', 'pw',
+            optional_args={'cache': True, 'prompt_reader': False,
+                           'checkpoints': CheckpointStore(self.directory)})
+        self.device.device = ConfigSession(RUNNING)
+        self.get_facts()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def get_facts(self):
+        return self.device.send_command('show version', getter='get_facts')
+
+    def fetches(self):
+        return self.device.device.commands.count('show version')
+
+    def test_cached(self):
+        self.get_facts()
+        self.assertEqual(self.fetches(), 1)
+
+    def test_commit(self):
+        self.device.load_merge_candidate(config='interface Vlan 200\n!\n')
+        self.get_facts()
+        self.assertEqual(self.fetches(), 2)
+        self.device.commit_config()
+        self.get_facts()
+        self.assertEqual(self.fetches(), 3)
+
+    def test_load_replace(self):
+        self.device.load_replace_candidate(config=CHANGED)
+        self.get_facts()
+        self.assertEqual(self.fetches(), 2)
+
+    def test_rollback(self):
+        self.device._checkpoint_running_config()
+        self.device.device.running = CHANGED
+        self.device.rollback_config()
+        self.get_facts()
+        self.assertEqual(self.fetches(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+"""Tests for the interface counter sampler."""
+
+import unittest
+
+from napalm_brocade.counters import CounterSampler
+
+
+def table(pkts_rx, crc_rx=0, interface='1/0/1'):
+    return [{'interface_type': 'Te', 'interface': interface,
+             'pkts_rx': str(pkts_rx), 'pkts_tx': '10', 'err_rx': '0',
+             'err_tx': '0', 'discards_rx': '0', 'discards_tx': '0',
+             'crc_rx': str(crc_rx)}]
+
+
+class TestCounterSampler(unittest.TestCase):
+    """Group of tests for CounterSampler."""
+
+    def setUp(self):
+        self.sampler = CounterSampler(counter_bits=32)
+
+    def test_first_sample_has_no_rates(self):
+        result = self.sampler.sample(table(100), timestamp=0)
+        self.assertEqual(result[0]['counters']['pkts_rx'], 100)
+        self.assertIsNone(result[0]['rates'])
+
+    def test_deltas_and_rates(self):
+        self.sampler.sample(table(100), timestamp=0)
+        result = self.sampler.sample(table(400, crc_rx=3), timestamp=30)
+        self.assertEqual(result[0]['deltas']['pkts_rx'], 300)
+        self.assertEqual(result[0]['deltas']['crc_rx'], 3)
+        self.assertEqual(result[0]['rates']['pkts_rx'], 10.0)
+        self.assertEqual(result[0]['interval'], 30)
+
+    def test_unchanged_interfaces_skipped(self):
+        self.sampler.sample(table(100), timestamp=0)
+        self.assertEqual(self.sampler.sample(table(100), timestamp=30), [])
+
+    def test_counter_wrap(self):
+        self.sampler.sample(table(2 ** 32 - 10), timestamp=0)
+        result = self.sampler.sample(table(5), timestamp=30)
+        self.assertEqual(result[0]['deltas']['pkts_rx'], 15)
+
+    def test_counter_clear(self):
+        self.sampler.sample(table(5000), timestamp=0)
+        result = self.sampler.sample(table(20), timestamp=30)
+        self.assertEqual(result[0]['deltas']['pkts_rx'], 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+"""Tests for the local config diff."""
+
+import re
+import time
+import unittest
+
+from napalm_brocade import diff
+
+RUNNING = """\
+hostname sw0
+!
+interface TenGigabitEthernet 1/0/1
+ description uplink
+ no shutdown
+!
+interface TenGigabitEthernet 1/0/2
+ shutdown
+!
+interface Vlan 100
+!
+rbridge-id 1
+ ip route 0.0.0.0/0 10.24.86.1
+!
+"""
+
+
+def apply_diff(lines, text):
+    """Apply the unified diff text to lines, checking every hunk range."""
+    result = []
+    position = 0
+    hunks = re.split(r'^(@@ .* @@)$', text, flags=re.M)[1:]
+    for header, body in zip(hunks[::2], hunks[1::2]):
+        old_start, old_len, new_start, new_len = [
+            int(n) if n else 1 for n in re.match(
+                r'@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@',
+                header).groups()]
+        body = body.strip('\n').split('\n')
+        old = [line[1:] for line in body if line[0] in ' -']
+        new = [line[1:] for line in body if line[0] in ' +']
+        assert (len(old), len(new)) == (old_len, new_len), header
+        # An empty range starts after the line it names
+        start = old_start if old_len == 0 else old_start - 1
+        assert start >= position, header
+        result.extend(lines[position:start])
+        assert lines[start:start + old_len] == old, header
+        result.extend(new)
+        position = start + old_len
+    return result + lines[position:]
+
+
+class TestDiff(unittest.TestCase):
+    """Group of tests for the config diff."""
+
+    def test_tree(self):
+        tree = diff.parse_config(RUNNING)
+        self.assertEqual(list(tree['interface TenGigabitEthernet 1/0/1']),
+                         ['description uplink', 'no shutdown'])
+        self.assertEqual(tree['interface Vlan 100'], {})
+
+    def test_tree_cached_by_hash(self):
+        self.assertIs(diff.parse_config(RUNNING), diff.parse_config(RUNNING))
+
+    def test_no_changes(self):
+        self.assertEqual(diff.compare(RUNNING, RUNNING), ([], ''))
+
+    def test_replace_changes(self):
+        candidate = RUNNING.replace('\n shutdown\n', '\n no shutdown\n')
+        candidate = candidate.replace('interface Vlan 100\n!\n', '')
+        changes, text = diff.compare(RUNNING, candidate)
+        self.assertEqual(sorted(changes), [
+            ('+', ('interface TenGigabitEthernet 1/0/2', 'no shutdown')),
+            ('-', ('interface TenGigabitEthernet 1/0/2', 'shutdown')),
+            ('-', ('interface Vlan 100',)),
+        ])
+        self.assertIn('-interface Vlan 100', text)
+        self.assertIn('+ no shutdown', text)
+
+    def test_text_diff_applies(self):
+        candidate = RUNNING.replace('\n shutdown\n', '\n no shutdown\n')
+        candidate = candidate.replace('interface Vlan 100\n!\n', '')
+        candidate += 'interface Vlan 200\n description new\n!\n'
+        for merge in (False, True):
+            _, text = diff.compare(RUNNING, candidate, merge=merge)
+            running = diff.parse_config(RUNNING)
+            target = diff.parse_config(candidate)
+            if merge:
+                target = diff.merge_trees(running, target)
+            self.assertEqual(text.split('\n')[:2],
+                             ['--- running-config', '+++ candidate'])
+            self.assertEqual(apply_diff(diff.render(running), text),
+                             diff.render(target))
+
+    def test_text_diff_ranges(self):
+        candidate = RUNNING.replace('interface Vlan 100\n',
+                                    'interface Vlan 100\n shutdown\n')
+        _, text = diff.compare(RUNNING, candidate)
+        self.assertEqual(text.split('\n')[2:], [
+            '@@ -9 +9,3 @@',
+            ' interface Vlan 100',
+            '+ shutdown',
+            '+!'])
+
+    def test_duplicate_siblings(self):
+        running = 'banner motd\n line\n ===\n line\n!\n'
+        tree = diff.parse_config(running)
+        self.assertEqual(diff.render(tree), ['banner motd', ' line', ' ===',
+                                             ' line', '!'])
+        changes, text = diff.compare(running,
+                                     'banner motd\n line\n ===\n!\n')
+        # The second 'line' is the one gone
+        self.assertEqual(changes, [('-', ('banner motd',
+                                          diff.Repeat('line', 1)))])
+        self.assertEqual(text.split('\n')[2:], [
+            '@@ -1,5 +1,4 @@', ' banner motd', '  line', '  ===', '- line',
+            ' !'])
+        self.assertEqual(diff.compare(running, running), ([], ''))
+
+    def test_merge_only_adds(self):
+        changes, text = diff.compare(RUNNING, 'interface Vlan 200\n!\n'
+                                     'rbridge-id 1\n ip route 10.0.0.0/8 10.1.1.1\n',
+                                     merge=True)
+        self.assertEqual(changes, [
+            ('+', ('rbridge-id 1', 'ip route 10.0.0.0/8 10.1.1.1')),
+            ('+', ('interface Vlan 200',)),
+        ])
+        self.assertNotIn('\n-', text)
+
+    def test_large_config(self):
+        blocks = ['interface TenGigabitEthernet 1/0/%d\n description port %d\n'
+                  ' no shutdown\n!' % (i, i) for i in range(12500)]
+        running = '\n'.join(blocks)
+        candidate = running.replace('description port 77\n',
+                                    'description changed\n')
+        start = time.time()
+        changes, _ = diff.compare(running, candidate)
+        self.assertEqual(len(changes), 2)
+        self.assertLess(time.time() - start, 2)
+
+    def test_inverse_commands(self):
+        changed = RUNNING.replace('\n shutdown\n', '\n no shutdown\n')
+        changed = changed.replace('interface Vlan 100\n!\n',
+                                  'interface Vlan 200\n description new\n!\n')
+        commands = diff.commands(diff.parse_config(changed),
+                                 diff.parse_config(RUNNING))
+        self.assertEqual(commands, [
+            'no interface Vlan 200',
+            'interface TenGigabitEthernet 1/0/2', 'shutdown', 'exit',
+            'interface Vlan 100',
+        ])
+
+    def test_inverse_commands_nested_block(self):
+        target = diff.parse_config(RUNNING + 'router bgp\n local-as 100\n'
+                                   ' address-family ipv4 unicast\n'
+                                   '  neighbor 10.0.0.1 activate\n!\n')
+        commands = diff.commands(diff.parse_config(RUNNING), target)
+        self.assertEqual(commands, [
+            'router bgp', 'local-as 100', 'address-family ipv4 unicast',
+            'neighbor 10.0.0.1 activate', 'exit', 'exit',
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
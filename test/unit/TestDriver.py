@@ -14,12 +14,17 @@
 
 """Tests."""
 
+import os
 import unittest
 
 from napalm_brocade import brocade
+from napalm_brocade.utils.replay import ReplayConnection, Transcript
 from napalm_base.test.base import TestConfigNetworkDriver, TestGettersNetworkDriver
 import json
 
+MOCKED_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'mocked_data')
+
 
 class TestConfigDriver(unittest.TestCase, TestConfigNetworkDriver):
     """Group of tests that test Configuration related methods."""
@@ -64,8 +69,19 @@ class TestGetterDriver(unittest.TestCase, TestGettersNetworkDriver):
             cls.device.open()
 
 
-class FakeDevice:
-    """Test double."""
+class FakeDevice(ReplayConnection):
+    """Test double replaying the mocked_data of the running test."""
+
+    def __init__(self):
+        super(FakeDevice, self).__init__(Transcript())
+        self.current_test = None
+        self.current_test_case = 'normal'
+
+    def _entries(self, command):
+        """Return the fixture output of command for the running test."""
+        directory = os.path.join(MOCKED_DATA, self.current_test,
+                                 self.current_test_case)
+        return Transcript.from_directory(directory).lookup(command)
 
     @staticmethod
     def read_json_file(filename):
@@ -0,0 +1,123 @@
+"""Tests for the columnar export."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from napalm_brocade import export
+from napalm_brocade.fleet import FleetResult
+from napalm_brocade.records import MacEntry, MacTable
+
+ARP_TABLE = [
+    {'interface': 'Ve 100', 'mac': '00:27:F8:CA:76:81',
+     'ip': '10.24.86.1', 'type': 'Dynamic', 'age': 10.0},
+    {'interface': 'Ve 200', 'mac': '00:27:F8:CA:76:82',
+     'ip': '10.24.87.1', 'type': 'Dynamic', 'age': 0.0},
+]
+
+INTERFACES = {
+    '0/2': {'interface_type': 'Ethernet', 'ip_address': '10.10.10.1',
+            'is_enabled': True, 'is_up': True},
+    '0/1': {'interface_type': 'Ethernet', 'ip_address': 'unassigned',
+            'is_enabled': False, 'is_up': False},
+}
+
+
+def mac_table(count, offset=0):
+    return MacTable(MacEntry(mac='00:27:F8:%02X:%02X:%02X' % (
+        (i >> 16) & 255, (i >> 8) & 255, i & 255),
+        interface='1/0/%d' % (i % 48 + 1), vlan=i % 100 + 1,
+        static=False, active=True) for i in range(offset, offset + count))
+
+
+class TestRows(unittest.TestCase):
+    """Group of tests for the conversion of getter results to rows."""
+
+    def test_arp(self):
+        self.assertEqual(list(export.rows('get_arp_table', ARP_TABLE))[0],
+                         ('Ve 100', 0x0027F8CA7681, 0x0A185601, 'Dynamic',
+                          10.0))
+
+    def test_interfaces(self):
+        self.assertEqual(list(export.rows('get_interfaces', INTERFACES)), [
+            ('0/1', 'Ethernet', None, False, False),
+            ('0/2', 'Ethernet', 0x0A0A0A01, True, True)])
+
+    def test_counters(self):
+        row = next(export.rows('get_interfaces_counters', [{
+            'interface_type': 'Te', 'interface': '1/0/1', 'pkts_rx': '12',
+            'pkts_tx': '34', 'err_rx': '0', 'err_tx': '0',
+            'discards_rx': '0', 'discards_tx': '1'}]))
+        self.assertEqual(row, ('Te', '1/0/1', 12, 34, 0, 0, 0, 1, None))
+
+    def test_compact_table(self):
+        self.assertEqual(next(export.rows('get_mac_address_table',
+                                          mac_table(1))),
+                         (0x0027F8000000, '1/0/1', 1, False, True, -1, 0.0))
+
+    def test_unknown_getter(self):
+        self.assertRaises(ValueError, export.rows, 'get_facts', {})
+
+
+@unittest.skipIf(export.pyarrow is None, "requires pyarrow")
+class TestColumnarWriter(unittest.TestCase):
+    """Group of tests for ColumnarWriter."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def read(self, path, format):
+        if format == 'parquet':
+            return export.pyarrow.parquet.read_table(path)
+        return export.pyarrow.ipc.open_file(path).read_all()
+
+    def test_batches(self):
+        for format in export.FORMATS:
+            path = os.path.join(self.directory, 'mac.' + format)
+            with export.ColumnarWriter(path, 'get_mac_address_table',
+                                       format=format,
+                                       batch_size=100) as writer:
+                writer.write('nos1', mac_table(250), timestamp=1000.0)
+                writer.write('nos2', mac_table(60, offset=250),
+                             timestamp=1001.0)
+            self.assertEqual(writer.rows, 310)
+
+            table = self.read(path, format)
+            self.assertEqual(table.schema, export.schema(
+                'get_mac_address_table'))
+            self.assertEqual(table.num_rows, 310)
+            columns = table.to_pydict()
+            self.assertEqual(columns['hostname'][249:251], ['nos1', 'nos2'])
+            self.assertEqual(columns['interface'][299], '1/0/12')
+            self.assertEqual(columns['mac'][309], 0x0027F8000000 + 309)
+            self.assertEqual(len(set(columns['timestamp'])), 2)
+
+    def test_fleet(self):
+        ok = FleetResult('nos1')
+        ok.results['get_arp_table'] = ARP_TABLE
+        failed = FleetResult('nos2')
+        failed.errors['get_arp_table'] = Exception('timed out')
+
+        path = os.path.join(self.directory, 'arp.parquet')
+        with export.ColumnarWriter(path, 'get_arp_table') as writer:
+            self.assertEqual(writer.write_fleet({'nos1': ok, 'nos2': failed}),
+                             2)
+        columns = self.read(path, 'parquet').to_pydict()
+        self.assertEqual(columns['hostname'], ['nos1', 'nos1'])
+        self.assertEqual(columns['ip'], [0x0A185601, 0x0A185701])
+
+    def test_export(self):
+        path = os.path.join(self.directory, 'interfaces.feather')
+        self.assertEqual(export.export(path, 'get_interfaces',
+                                       {'nos1': INTERFACES,
+                                        'nos2': INTERFACES},
+                                       format='feather'), 4)
+        columns = self.read(path, 'feather').to_pydict()
+        self.assertEqual(columns['ip_address'],
+                         [None, 0x0A0A0A01, None, 0x0A0A0A01])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+"""Tests for the filters of the ARP and MAC address table getters."""
+
+import os
+import unittest
+
+from napalm_brocade import brocade
+from napalm_brocade.records import ArpEntry, MacEntry
+from napalm_brocade.utils.replay import ReplayConnection, Transcript
+
+MOCKED_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'mocked_data')
+
+
+def fixture(test_case, command):
+    """Return the fixture output of command."""
+    return Transcript.from_directory(
+        os.path.join(MOCKED_DATA, test_case, 'normal')).lookup(command)[0][
+            'output']
+
+
+class TestCommands(unittest.TestCase):
+    """Group of tests for the filtered CLI commands."""
+
+    def test_arp_command(self):
+        self.assertEqual(brocade._arp_command(), 'show arp')
+        self.assertEqual(brocade._arp_command(ip='10.0.0.1',
+                                              mac='00:27:F8:CA:43:10'),
+                         'show arp ip 10.0.0.1')
+        self.assertEqual(brocade._arp_command(mac='00:27:F8:CA:43:10'),
+                         'show arp mac-address 0027.f8ca.4310')
+        self.assertEqual(brocade._arp_command(interface='Ve 100'),
+                         'show arp interface ve 100')
+        self.assertEqual(brocade._arp_command(interface='Ethernet 0/1'),
+                         'show arp interface ethernet 0/1')
+
+    def test_mac_address_table_command(self):
+        command = brocade._mac_address_table_command
+        self.assertEqual(command(vlan=10, mac='0027.f8ca.4310'),
+                         'show mac-address-table address 0027.f8ca.4310')
+        self.assertEqual(command(vlan=10, interface='Te 1/0/1'),
+                         'show mac-address-table interface '
+                         'tengigabitethernet 1/0/1')
+        self.assertEqual(command(interface='TenGigabitEthernet 1/0/1'),
+                         'show mac-address-table interface '
+                         'tengigabitethernet 1/0/1')
+        # A bare port cannot be passed on; the rows are filtered instead
+        self.assertEqual(command(vlan='10', interface='1/0/1'),
+                         'show mac-address-table vlan 10')
+
+
+class TestFilteredGetters(unittest.TestCase):
+    """Group of tests for the filtered getters against a replay."""
+
+    def setUp(self):
+        self.transcript = Transcript()
+        self.device = brocade.BrocadeDriver('sw0', 'admin', 'pw')
+        self.device.device = ReplayConnection(self.transcript)
+
+    def test_mac_lookup_pushed_down(self):
+        output = fixture('test_get_mac_address_table',
+                         'show mac-address-table')
+        # Stands for the single row the switch returns
+        self.transcript.add('show mac-address-table address 0027.f8ca.4311',
+                            output)
+        table = self.device.get_mac_address_table(mac='00:27:F8:CA:43:11')
+        self.assertEqual([(e['vlan'], e['interface']) for e in table],
+                         [(1, '1/0/2')])
+
+    def test_rejected_pushdown(self):
+        rejected = ("                         ^\n"
+                    "% Invalid input detected at '^' marker.")
+        self.transcript.add('show arp ip 10.24.90.1', rejected)
+        self.transcript.add('show arp',
+                            fixture('test_get_arp_table', 'show arp'))
+        self.transcript.add('show mac-address-table vlan 2000', rejected)
+        self.transcript.add('show mac-address-table',
+                            fixture('test_get_mac_address_table',
+                                    'show mac-address-table'))
+
+        table = self.device.get_arp_table(ip='10.24.90.1')
+        self.assertEqual([e['interface'] for e in table], ['Te 1/0/4'])
+        self.assertFalse(self.device.filter_pushdown)
+        # Remembered for the session: no filtered command is tried again
+        table = self.device.get_mac_address_table(vlan=2000)
+        self.assertEqual([e['mac'] for e in table], ['00:27:F8:CA:43:12'])
+        self.assertNotIn('show mac-address-table vlan 2000',
+                         self.device.device.calls)
+
+        self.device.filter_pushdown = True
+        table = self.device.get_mac_address_table(vlan=2000)
+        self.assertEqual([e['mac'] for e in table], ['00:27:F8:CA:43:12'])
+        self.assertEqual(
+            self.device.device.calls['show mac-address-table vlan 2000'], 1)
+        self.assertFalse(self.device.filter_pushdown)
+
+    def test_arp_filtered_in_stream(self):
+        # The ARP table is already collected: filter it instead of
+        # asking the switch again
+        self.device._prefetched = {
+            'show arp': fixture('test_get_arp_table', 'show arp')}
+        table = self.device.get_arp_table(interface='Te 1/0/4')
+        self.assertEqual([e['ip'] for e in table], ['10.24.90.1'])
+        self.assertEqual(dict(self.device.device.calls), {})
+
+
+class FakeNetconf(object):
+    """Test double of NetconfTransport, with the records it builds."""
+
+    def iter_arp(self):
+        return iter([
+            ArpEntry(ip='10.24.86.1', mac='00:05:33:E5:D7:64',
+                     interface='ve 100', type='Dynamic', age=312.0),
+            ArpEntry(ip='10.24.90.1', mac='00:27:F8:CA:43:11',
+                     interface='tengigabitethernet 1/0/4', type='Static',
+                     age=-1.0)])
+
+    def iter_mac_address_table(self):
+        return iter([
+            MacEntry(mac='00:27:F8:CA:43:11', interface='1/0/2', vlan=1,
+                     static=True, active=True),
+            MacEntry(mac='00:27:F8:CA:43:12', interface='1/0/3', vlan=2000,
+                     static=False, active=False)])
+
+
+class TestNetconfFilters(unittest.TestCase):
+    """Group of tests for the filters of the NETCONF getters."""
+
+    def setUp(self):
+        self.device = brocade.BrocadeDriver('sw0', 'admin', 'pw')
+        self.device.netconf = FakeNetconf()
+
+    def test_arp_interface(self):
+        for interface in ('Te 1/0/4', 'TenGigabitEthernet 1/0/4', '1/0/4'):
+            table = self.device.get_arp_table(interface=interface)
+            self.assertEqual([e['ip'] for e in table], ['10.24.90.1'])
+        table = self.device.get_arp_table(interface='Ve 100')
+        self.assertEqual([e['ip'] for e in table], ['10.24.86.1'])
+
+    def test_mac_address_table_interface(self):
+        for interface in ('Te 1/0/3', 'TenGigabitEthernet 1/0/3', '1/0/3'):
+            table = self.device.get_mac_address_table(interface=interface)
+            self.assertEqual([e['vlan'] for e in table], [2000])
+
+
+if __name__ == '__main__':
+    unittest.main()
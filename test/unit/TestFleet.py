@@ -0,0 +1,108 @@
+"""Tests for the fleet poller."""
+
+import time
+import unittest
+
+from napalm_brocade.fleet import BrocadeFleet
+
+
+class FakeDriver(object):
+    """Test double with a configurable per-call latency."""
+
+    latency = 0.05
+    hang = ()
+    broken = ()
+
+    def __init__(self, hostname, username, password, timeout=60,
+                 optional_args=None):
+        self.hostname = hostname
+
+    def open(self):
+        if self.hostname in self.broken:
+            raise IOError("connection refused")
+        time.sleep(self.latency)
+
+    def close(self):
+        pass
+
+    def get_facts(self):
+        if self.hostname in self.hang:
+            time.sleep(5)
+        time.sleep(self.latency)
+        return {'hostname': self.hostname}
+
+
+def inventory(count):
+    return [{'hostname': 'sw%d' % i, 'username': 'admin', 'password': 'pw'}
+            for i in range(count)]
+
+
+class TestBrocadeFleet(unittest.TestCase):
+    """Group of tests for BrocadeFleet."""
+
+    def test_results_per_host(self):
+        fleet = BrocadeFleet(inventory(4), ['get_facts'], driver_class=FakeDriver)
+        results = fleet.poll_all()
+        self.assertEqual(sorted(results), ['sw0', 'sw1', 'sw2', 'sw3'])
+        self.assertTrue(all(r.ok for r in results.values()))
+        self.assertEqual(results['sw2'].results['get_facts'], {'hostname': 'sw2'})
+
+    def test_runs_concurrently(self):
+        hosts = inventory(40)
+        fleet = BrocadeFleet(hosts, ['get_facts'], max_workers=40,
+                             driver_class=FakeDriver)
+        start = time.time()
+        results = fleet.poll_all()
+        elapsed = time.time() - start
+        serial = len(hosts) * 2 * FakeDriver.latency
+        self.assertEqual(len(results), 40)
+        self.assertLess(elapsed, serial / 4)
+
+    def test_open_error_reported(self):
+        driver = type('BrokenDriver', (FakeDriver,), {'broken': ('sw1',)})
+        fleet = BrocadeFleet(inventory(2), ['get_facts'], driver_class=driver)
+        results = fleet.poll_all()
+        self.assertTrue(results['sw0'].ok)
+        self.assertIn('open', results['sw1'].errors)
+
+    def test_driver_error_reported(self):
+        def driver(hostname, *args, **kwargs):
+            if hostname == 'sw1':
+                raise ValueError("unknown optional argument")
+            return FakeDriver(hostname, *args, **kwargs)
+        fleet = BrocadeFleet(inventory(2), ['get_facts'], host_timeout=5,
+                             driver_class=driver)
+        start = time.time()
+        results = fleet.poll_all()
+        self.assertLess(time.time() - start, 1)
+        self.assertTrue(results['sw0'].ok)
+        self.assertIsInstance(results['sw1'].errors['open'], ValueError)
+
+    def test_host_timeout(self):
+        driver = type('HangingDriver', (FakeDriver,), {'hang': ('sw0',)})
+        fleet = BrocadeFleet(inventory(3), ['get_facts'], host_timeout=0.5,
+                             driver_class=driver)
+        start = time.time()
+        results = list(fleet.poll())
+        self.assertLess(time.time() - start, 2)
+        self.assertEqual(results[-1].hostname, 'sw0')
+        self.assertIn('timeout', results[-1].errors)
+
+
+    def test_hung_workers_replaced(self):
+        # Every worker hangs on the first hosts; the others still run
+        driver = type('HangingDriver', (FakeDriver,),
+                      {'hang': ('sw0', 'sw1')})
+        fleet = BrocadeFleet(inventory(4), ['get_facts'], max_workers=2,
+                             host_timeout=0.5, driver_class=driver)
+        start = time.time()
+        results = fleet.poll_all()
+        self.assertLess(time.time() - start, 2)
+        self.assertIn('timeout', results['sw0'].errors)
+        self.assertIn('timeout', results['sw1'].errors)
+        self.assertTrue(results['sw2'].ok)
+        self.assertTrue(results['sw3'].ok)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+"""Tests for the import cost of the package."""
+
+import subprocess
+import sys
+import unittest
+
+# Budget, in microseconds, for importing the package and its parsers
+IMPORT_BUDGET_US = 100000
+
+# Modules only the driver itself needs
+HEAVY_MODULES = ('napalm_brocade.brocade', 'napalm_base', 'netmiko',
+                 'paramiko')
+
+
+def run_python(*args):
+    """Run python with args; return its (stdout, stderr)."""
+    process = subprocess.Popen((sys.executable,) + args,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = process.communicate()
+    if process.returncode != 0:
+        raise AssertionError(err.decode('utf-8', 'replace'))
+    return out.decode('utf-8'), err.decode('utf-8')
+
+
+class TestImport(unittest.TestCase):
+    """Group of tests for the import cost."""
+
+    @unittest.skipIf(sys.version_info < (3, 7),
+                     "the driver is imported eagerly before python 3.7")
+    def test_parsers_standalone(self):
+        out, _ = run_python('-c', 'import sys, napalm_brocade.parsers; '
+                            'print(" ".join(sorted(sys.modules)))')
+        loaded = out.split()
+        self.assertEqual([module for module in HEAVY_MODULES
+                          if module in loaded], [])
+
+    @unittest.skipIf(sys.version_info < (3, 7), "needs python -X importtime")
+    def test_import_time_budget(self):
+        _, err = run_python('-X', 'importtime', '-c',
+                            'import napalm_brocade.parsers')
+        total = 0
+        for line in err.splitlines():
+            if not line.startswith('import time:'):
+                continue
+            _, cumulative, name = line.split('|')
+            # Only top level imports; nested ones are in their cumulative
+            if name.strip().startswith('napalm_brocade') and \
+                    len(name) - len(name.lstrip()) == 1:
+                total += int(cumulative)
+        self.assertGreater(total, 0)
+        self.assertLess(total, IMPORT_BUDGET_US)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""Tests for the instrumentation of the device interactions."""
+
+import socket
+import unittest
+
+from napalm_brocade.instrumentation import Instrumentation, Metrics, \
+    StatsdHook, command_template
+
+
+class FakeClock(object):
+    """Clock advancing by a fixed step on every call."""
+
+    def __init__(self, step=0.5):
+        self.now = 100.0
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Group of tests for Instrumentation and its hooks."""
+
+    def setUp(self):
+        self.spans = []
+        self.clock = FakeClock()
+        self.instrumentation = Instrumentation([self.spans.append],
+                                               clock=self.clock)
+
+    def test_span(self):
+        with self.instrumentation.span('command', 'sw1',
+                                       command='show arp') as span:
+            span.received('', self.clock())
+            span.received('abc', self.clock())
+            span.received('de', self.clock())
+        self.assertEqual(self.spans, [span])
+        self.assertEqual(span.bytes, 5)
+        self.assertEqual(span.time_to_first_byte, 1.0)
+        self.assertEqual(span.duration, 2.0)
+        self.assertEqual(span.attrs, {'command': 'show arp'})
+
+    def test_span_error(self):
+        def fail():
+            with self.instrumentation.span('connect', 'sw1'):
+                raise IOError('refused')
+        self.assertRaises(IOError, fail)
+        self.assertIsInstance(self.spans[0].error, IOError)
+
+    def test_failing_hook_ignored(self):
+        def broken(span):
+            raise RuntimeError('broken hook')
+        self.instrumentation.add_hook(broken)
+        with self.instrumentation.span('parse', 'sw1'):
+            pass
+        self.assertEqual(len(self.spans), 1)
+
+    def test_metrics(self):
+        metrics = Metrics(buckets=(0.1, 1.0))
+        self.instrumentation.add_hook(metrics)
+        for _ in range(2):
+            with self.instrumentation.span('command', 'sw1',
+                                           command='show arp') as span:
+                span.bytes = 10
+        text = metrics.render()
+        labels = 'span="command",host="sw1",command="show arp"'
+        self.assertIn('napalm_brocade_spans_total{%s} 2.0' % labels, text)
+        self.assertIn('napalm_brocade_bytes_total{%s} 20.0' % labels, text)
+        self.assertIn('napalm_brocade_span_seconds_bucket{%s,le="1.0"} 2'
+                      % labels, text)
+        self.assertIn('napalm_brocade_span_seconds_bucket{%s,le="0.1"} 0'
+                      % labels, text)
+        self.assertIn('napalm_brocade_span_seconds_count{%s} 2' % labels, text)
+
+    def test_metrics_bounded_per_lookup(self):
+        metrics = Metrics()
+        self.instrumentation.add_hook(metrics)
+        for ip in ('10.0.0.1', '10.0.0.2', '10.0.0.3'):
+            with self.instrumentation.span('command', 'sw1',
+                                           command='show arp ip %s' % ip,
+                                           getter='get_arp_table'):
+                pass
+        self.assertEqual(
+            [labels for name, labels in metrics.counters
+             if name == 'spans_total'],
+            [(('span', 'command'), ('host', 'sw1'),
+              ('command', 'show arp ip <ip>'), ('getter', 'get_arp_table'))])
+
+    def test_command_template(self):
+        self.assertEqual(
+            command_template('show mac-address-table address 0027.f8ca.4311'),
+            'show mac-address-table address <mac>')
+        self.assertEqual(
+            command_template('show mac-address-table interface '
+                             'tengigabitethernet 1/0/2; '
+                             'show mac-address-table vlan 2000'),
+            'show mac-address-table interface tengigabitethernet <port>; '
+            'show mac-address-table vlan <n>')
+        self.assertEqual(command_template('show system'), 'show system')
+
+    def test_statsd(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        server.bind(('127.0.0.1', 0))
+        server.settimeout(5)
+        self.addCleanup(server.close)
+        self.instrumentation.add_hook(
+            StatsdHook(port=server.getsockname()[1]))
+
+        with self.instrumentation.span('command', '10.1.1.1') as span:
+            span.bytes = 42
+        packet = server.recv(1024).decode('ascii')
+        self.assertEqual(packet.split('\n'), [
+            'napalm_brocade.command.10_1_1_1:500|ms',
+            'napalm_brocade.command.10_1_1_1.bytes:42|c'])
+
+
+if __name__ == '__main__':
+    unittest.main()
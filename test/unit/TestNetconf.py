@@ -0,0 +1,125 @@
+"""Tests for the NETCONF transport."""
+
+import unittest
+
+from napalm_base.exceptions import CommandErrorException
+
+from napalm_brocade.netconf import NetconfTransport
+
+REPLY = ('<rpc-reply xmlns="urn:ietf:params:xml:ns:netconf:base:1.0">'
+         '%s</rpc-reply>')
+
+MAC_ROW = ('<mac-address-table><vlanid>%d</vlanid>'
+           '<mac-address>0027.f8ca.43%02x</mac-address>'
+           '<mac-type>dynamic</mac-type><mac-state>active</mac-state>'
+           '<forwarding-interface><interface-type>tengigabitethernet'
+           '</interface-type><interface-name>1/0/%d</interface-name>'
+           '</forwarding-interface></mac-address-table>')
+
+ARP_ROW = ('<arp-entry><ip-address>10.24.86.%d</ip-address>'
+           '<mac-address>0005.33e5.d764</mac-address>'
+           '<interface-type>Ve</interface-type>'
+           '<interface-name>100</interface-name>'
+           '<age>00:05:12</age><entry-type>dynamic</entry-type>'
+           '</arp-entry>')
+
+
+class FakeReply(object):
+    """Test double for an ncclient RPCReply."""
+
+    def __init__(self, xml):
+        self.xml = xml
+
+
+class FakeManager(object):
+    """Test double for an ncclient Manager serving canned pages."""
+
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.requests = []
+
+    def dispatch(self, request):
+        self.requests.append(request)
+        return FakeReply(REPLY % self.pages.pop(0))
+
+
+class TestNetconfTransport(unittest.TestCase):
+    """Group of tests for NetconfTransport."""
+
+    def make_transport(self, pages):
+        self.manager = FakeManager(pages)
+        return NetconfTransport(self.manager, lambda xml: xml)
+
+    def test_mac_table_paged(self):
+        page1 = ''.join(MAC_ROW % (1, i, i) for i in range(3))
+        page2 = ''.join(MAC_ROW % (2, i, i) for i in range(3, 5))
+        transport = self.make_transport([
+            page1 + '<has-more>true</has-more>',
+            page2 + '<has-more>false</has-more>'])
+
+        entries = list(transport.iter_mac_address_table())
+        self.assertEqual(len(entries), 5)
+        self.assertEqual(entries[0].mac, '00:27:F8:CA:43:00')
+        self.assertEqual(entries[4].vlan, 2)
+        self.assertEqual(entries[4].interface, '1/0/4')
+        self.assertIn('<last-mac-address>0027.f8ca.4302</last-mac-address>',
+                      self.manager.requests[1])
+
+    def test_vlans(self):
+        transport = self.make_transport([
+            '<vlan><vlan-id>1</vlan-id><vlan-name>default</vlan-name>'
+            '<interface><interface-type>tengigabitethernet</interface-type>'
+            '<interface-name>1/0/1</interface-name></interface></vlan>'
+            '<vlan><vlan-id>2000</vlan-id><vlan-name>VLAN2000</vlan-name>'
+            '</vlan><has-more>false</has-more>'])
+        self.assertEqual(list(transport.iter_vlans()),
+                         [{'vlan': '1', 'name': 'default'},
+                          {'vlan': '2000', 'name': 'VLAN2000'}])
+
+    def test_interfaces(self):
+        transport = self.make_transport([
+            '<interface><interface-type>ethernet</interface-type>'
+            '<interface-name>0/2</interface-name>'
+            '<ip-address><ipv4>10.10.10.1/24</ipv4></ip-address>'
+            '<if-state>up</if-state><line-protocol-state>up'
+            '</line-protocol-state></interface>'])
+        self.assertEqual(transport.get_interfaces(), {
+            '0/2': {'is_up': True, 'is_enabled': True,
+                    'interface_type': 'ethernet',
+                    'ip_address': '10.10.10.1'}})
+
+    def test_arp(self):
+        transport = self.make_transport([
+            '<arp-entry><ip-address>10.24.86.1</ip-address>'
+            '<mac-address>0005.33e5.d764</mac-address>'
+            '<interface-type>Ve</interface-type>'
+            '<interface-name>100</interface-name>'
+            '<age>00:05:12</age><entry-type>dynamic</entry-type>'
+            '</arp-entry>'])
+        entry = next(transport.iter_arp())
+        self.assertEqual(entry.interface, 'Ve 100')
+        self.assertEqual(entry.age, 312.0)
+
+    def test_arp_paged(self):
+        transport = self.make_transport([
+            ''.join(ARP_ROW % i for i in range(3)) +
+            '<has-more>true</has-more>',
+            ARP_ROW % 3 + '<has-more>false</has-more>'])
+        entries = list(transport.iter_arp())
+        self.assertEqual([entry.ip for entry in entries],
+                         ['10.24.86.%d' % i for i in range(4)])
+        self.assertIn('<last-rcvd-ip-address>10.24.86.2'
+                      '</last-rcvd-ip-address>', self.manager.requests[1])
+
+    def test_more_rows_without_page_request(self):
+        transport = self.make_transport([
+            '<interface><interface-type>ethernet</interface-type>'
+            '<interface-name>0/2</interface-name></interface>'
+            '<has-more>true</has-more>'])
+        rows = transport._paged('get-ip-interface', 'urn:x', 'interface')
+        next(rows)
+        self.assertRaises(CommandErrorException, next, rows)
+
+
+if __name__ == '__main__':
+    unittest.main()
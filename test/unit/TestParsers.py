@@ -0,0 +1,160 @@
+"""Tests for the CLI output parsers."""
+
+import json
+import os
+import unittest
+
+from napalm_brocade import parsers
+
+MOCKED_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'mocked_data')
+
+
+def read_output(test_case, command):
+    """Return the captured output of command for test_case."""
+    filename = '%s.txt' % command.replace(' ', '_')
+    with open(os.path.join(MOCKED_DATA, test_case, 'normal', filename)) as f:
+        return f.read()
+
+
+def read_expected(test_case):
+    """Return the expected result of test_case."""
+    path = os.path.join(MOCKED_DATA, test_case, 'normal', 'expected_result.json')
+    with open(path) as f:
+        return json.load(f)
+
+
+class TestParsers(unittest.TestCase):
+    """Group of tests for the parsers against captured output."""
+
+    def test_parse_facts(self):
+        output = read_output('test_get_facts', 'show system')
+        self.assertEqual(parsers.parse_facts(output),
+                         read_expected('test_get_facts'))
+
+    def test_parse_environment(self):
+        expected = read_expected('test_get_environment')
+        self.assertEqual(parsers.parse_environment_fan(
+            read_output('test_get_environment', 'show environment fan')),
+            expected['fans'])
+        self.assertEqual(parsers.parse_environment_power(
+            read_output('test_get_environment', 'show environment power')),
+            expected['power'])
+        self.assertEqual(parsers.parse_environment_temp(
+            read_output('test_get_environment', 'show environment temp')),
+            expected['temperature'])
+        cpu = parsers.parse_process_cpu(
+            read_output('test_get_environment', 'show process cpu'))
+        self.assertEqual(json.loads(json.dumps(cpu)), expected['cpu'])
+        self.assertEqual(parsers.parse_process_memory(
+            read_output('test_get_environment',
+                        'show process memory summary')),
+            expected['memory'])
+
+    def test_parse_vlan_brief(self):
+        output = read_output('test_get_vlan_table', 'show vlan brief')
+        self.assertEqual(parsers.parse_vlan_brief(output),
+                         read_expected('test_get_vlan_table'))
+
+    def test_parse_arp(self):
+        output = read_output('test_get_arp_table', 'show arp')
+        self.assertEqual(parsers.parse_arp(output),
+                         read_expected('test_get_arp_table'))
+
+    def test_parse_ip_interface_brief(self):
+        output = read_output('test_get_interfaces', 'show ip interface brief')
+        self.assertEqual(parsers.parse_ip_interface_brief(output),
+                         read_expected('test_get_interfaces'))
+
+    def test_parse_interface_stats_brief(self):
+        output = read_output('test_get_interfaces_counters',
+                             'show interface stats brief')
+        self.assertEqual(parsers.parse_interface_stats_brief(output),
+                         read_expected('test_get_interfaces_counters'))
+
+    def test_parse_mac_address_table(self):
+        output = read_output('test_get_mac_address_table',
+                             'show mac-address-table')
+        expected = read_expected('test_get_mac_address_table')
+        entries = list(parsers.parse_mac_address_table(output.splitlines()))
+        self.assertEqual([e.mac for e in entries], [e['mac'] for e in expected])
+        self.assertEqual([e.static for e in entries],
+                         [e['static'] for e in expected])
+
+    def test_parse_mac_address_table_filters(self):
+        lines = read_output('test_get_mac_address_table',
+                            'show mac-address-table').splitlines()
+        entries = list(parsers.parse_mac_address_table(lines, vlan=2000))
+        self.assertEqual([e.interface for e in entries], ['1/0/3'])
+        for interface in ('Te 1/0/2', 'TenGigabitEthernet 1/0/2', '1/0/2'):
+            entries = list(parsers.parse_mac_address_table(
+                lines, interface=interface))
+            self.assertEqual([e.vlan for e in entries], [1])
+        self.assertEqual(list(parsers.parse_mac_address_table(
+            lines, interface='Gi 1/0/2')), [])
+
+    def test_parse_mac_address_table_mac_filter(self):
+        lines = read_output('test_get_mac_address_table',
+                            'show mac-address-table').splitlines()
+        entries = list(parsers.parse_mac_address_table(
+            lines, mac_address='00:27:F8:CA:43:12'))
+        self.assertEqual([(e.vlan, e.interface) for e in entries],
+                         [(2000, '1/0/3')])
+        self.assertEqual(list(parsers.parse_mac_address_table(
+            lines, vlan=1, mac_address='0027.f8ca.4312')), [])
+
+    def test_iter_arp_filters(self):
+        output = read_output('test_get_arp_table', 'show arp')
+        self.assertEqual([e.mac for e in parsers.iter_arp(
+            output, ip='10.24.86.2')], ['00:27:F8:CA:43:10'])
+        self.assertEqual([e.ip for e in parsers.iter_arp(
+            output, mac_address='00-27-f8-ca-43-11')], ['10.24.90.1'])
+        self.assertEqual([e.ip for e in parsers.iter_arp(
+            output, interface='Ve 100')], ['10.24.86.1', '10.24.86.2'])
+        self.assertEqual([e.ip for e in parsers.iter_arp(
+            output, interface='TenGigabitEthernet 1/0/4')], ['10.24.90.1'])
+        # Only whole addresses match
+        self.assertEqual(list(parsers.iter_arp(output, ip='10.24.86.')), [])
+
+    def test_iter_arp_no_match(self):
+        # A filtered 'show arp' with no match prints no table at all
+        self.assertEqual(list(parsers.iter_arp('', ip='10.24.86.9')), [])
+        self.assertEqual(list(parsers.iter_arp(
+            'Entries in VRF default-vrf : 0\n', ip='10.24.86.9')), [])
+        self.assertRaises(parsers.ParseError, list,
+                          parsers.iter_arp('% No such interface\n'))
+
+    def test_split_interface(self):
+        self.assertEqual(parsers.split_interface('Te 1/0/1'), ('te', '1/0/1'))
+        self.assertEqual(parsers.split_interface('TenGigabitEthernet 1/0/1'),
+                         ('te', '1/0/1'))
+        self.assertEqual(parsers.split_interface('Ethernet 0/1'),
+                         ('eth', '0/1'))
+        self.assertEqual(parsers.split_interface('1/0/1'), (None, '1/0/1'))
+
+    def test_cli_mac(self):
+        self.assertEqual(parsers.cli_mac('00:05:33:E5:D7:64'),
+                         '0005.33e5.d764')
+
+    def test_mac(self):
+        self.assertEqual(parsers.mac('0005.33e5.d764'), '00:05:33:E5:D7:64')
+        self.assertEqual(parsers.mac('00-05-33-e5-d7-64'), '00:05:33:E5:D7:64')
+        self.assertRaises(parsers.ParseError, parsers.mac, '0005.33e5')
+
+    def test_format_drift_fails(self):
+        output = read_output('test_get_arp_table', 'show arp')
+        output += '10.1.1.1 unexpected\n'
+        self.assertRaises(parsers.ParseError, parsers.parse_arp, output)
+        self.assertRaises(parsers.ParseError, parsers.parse_vlan_brief,
+                          'No VLANs\n')
+        self.assertRaises(parsers.ParseError, parsers.parse_facts, '')
+        self.assertRaises(parsers.ParseError, parsers.parse_environment_fan,
+                          'Fans:\n  1  Ok  6945 RPM\n')
+        self.assertRaises(parsers.ParseError,
+                          parsers.parse_environment_power,
+                          'PSU1 present, OK\n')
+        self.assertEqual(parsers.parse_environment_fan(''), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""Tests for the connection pool."""
+
+import threading
+import time
+import unittest
+
+from napalm_base.exceptions import ConnectionException
+from napalm_brocade.pool import ConnectionPool
+
+KEY = ('10.0.0.1', 22, 'admin')
+
+
+class FakeConnection(object):
+    """Test double for a netmiko session."""
+
+    def __init__(self):
+        self.alive = True
+        self.disconnected = False
+
+    def is_alive(self):
+        return self.alive
+
+    def disconnect(self):
+        self.disconnected = True
+
+
+class TestConnectionPool(unittest.TestCase):
+    """Group of tests for ConnectionPool."""
+
+    def setUp(self):
+        self.now = 1000.0
+        self.pool = ConnectionPool(max_sessions=2, idle_timeout=60,
+                                   clock=lambda: self.now)
+        self.opened = []
+
+    def connect(self):
+        conn = FakeConnection()
+        self.opened.append(conn)
+        return conn
+
+    def test_session_reused(self):
+        conn = self.pool.acquire(KEY, self.connect)
+        self.pool.release(KEY, conn)
+        self.assertIs(self.pool.acquire(KEY, self.connect), conn)
+        self.assertEqual(len(self.opened), 1)
+
+    def test_dead_session_replaced(self):
+        conn = self.pool.acquire(KEY, self.connect)
+        self.pool.release(KEY, conn)
+        conn.alive = False
+        other = self.pool.acquire(KEY, self.connect)
+        self.assertIsNot(other, conn)
+        self.assertTrue(conn.disconnected)
+
+    def test_idle_sessions_evicted(self):
+        conn = self.pool.acquire(KEY, self.connect)
+        self.pool.release(KEY, conn)
+        self.now += 61
+        self.pool.evict_idle()
+        self.assertTrue(conn.disconnected)
+        self.assertEqual(self.pool.stats()[KEY], {'idle': 0, 'busy': 0})
+
+    def test_idle_sessions_evicted_on_acquire(self):
+        other_key = ('10.0.0.2', 22, 'admin')
+        conn = self.pool.acquire(KEY, self.connect)
+        self.pool.release(KEY, conn)
+        self.now += 61
+        self.pool.acquire(other_key, self.connect)
+        self.assertTrue(conn.disconnected)
+        self.assertEqual(self.pool.stats()[KEY], {'idle': 0, 'busy': 0})
+
+    def test_sessions_capped_per_switch(self):
+        self.pool.acquire(KEY, self.connect)
+        self.pool.acquire(KEY, self.connect)
+        self.assertRaises(ConnectionException, self.pool.acquire, KEY,
+                          self.connect, timeout=0)
+
+    def test_waits_for_release(self):
+        pool = ConnectionPool(max_sessions=1)
+        conn = pool.acquire(KEY, self.connect)
+        timer = threading.Timer(0.1, pool.release, (KEY, conn))
+        timer.start()
+        start = time.time()
+        self.assertIs(pool.acquire(KEY, self.connect, timeout=5), conn)
+        self.assertGreaterEqual(time.time() - start, 0.05)
+
+    def test_failed_connect_frees_slot(self):
+        def fail():
+            raise ConnectionException("refused")
+        pool = ConnectionPool(max_sessions=1)
+        self.assertRaises(ConnectionException, pool.acquire, KEY, fail)
+        self.assertEqual(pool.stats()[KEY]['busy'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
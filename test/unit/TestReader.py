@@ -0,0 +1,89 @@
+"""Tests for the prompt-aware command reader."""
+
+import time
+import unittest
+
+from napalm_base.exceptions import CommandTimeoutException
+
+from napalm_brocade.brocade import BrocadeDriver, _split_batch_output
+from napalm_brocade.reader import PromptReader, session_reader
+from napalm_brocade.utils.replay import ReplayConnection, ShellConnection, \
+    Transcript
+
+ROWS = '\n'.join('10.0.0.%d  0027.f8ca.76%02x  Ve 100' % (i, i)
+                 for i in range(200))
+
+
+def transcript():
+    transcript = Transcript(prompt='sw0#')
+    transcript.add('show system', 'Stack MAC : 00:27:F8:CA:76:80', 0.05)
+    transcript.add('show arp', ROWS, 0.02)
+    transcript.add('show version', 'Firmware name: 7.0.1', 5.0)
+    return transcript
+
+
+class TestPromptReader(unittest.TestCase):
+    """Group of tests for PromptReader."""
+
+    def shell(self, **kwargs):
+        connection = ShellConnection(transcript(), **kwargs)
+        self.addCleanup(connection.disconnect)
+        return connection
+
+    def test_prepare_once_per_session(self):
+        connection = ReplayConnection(transcript())
+        reader = session_reader(connection)
+        self.assertEqual(reader.prompt, 'sw0#')
+        self.assertIs(session_reader(connection), reader)
+        self.assertEqual(connection.calls['terminal length 0'], 1)
+
+    def test_chunked_output(self):
+        # Small chunks split the rows and the prompts across reads
+        reader = session_reader(self.shell(chunk_size=7))
+        commands = ['show arp', 'show system', 'show arp']
+        outputs = _split_batch_output(reader.run(commands), reader.prompt,
+                                      commands)
+        self.assertEqual(outputs, [ROWS, 'Stack MAC : 00:27:F8:CA:76:80',
+                                   ROWS])
+
+    def test_returns_on_prompt(self):
+        reader = session_reader(self.shell())
+        start = time.time()
+        output = reader.run(['show system'])
+        elapsed = time.time() - start
+        self.assertTrue(output.endswith('\nsw0#'))
+        # The shell answers after 50ms; the read stops at the prompt, with
+        # nothing read past it, and no fixed sleep of seconds comes on top
+        self.assertEqual(reader.read(), '')
+        self.assertGreaterEqual(elapsed, 0.05)
+        self.assertLess(elapsed, 1.0)
+
+    def test_timeout(self):
+        reader = PromptReader(self.shell(), timeout=0.2)
+        reader.prepare()
+        self.assertRaises(CommandTimeoutException, reader.run,
+                          ['show version'])
+
+
+class TestDriverReader(unittest.TestCase):
+    """Group of tests for the driver commands read by PromptReader."""
+
+    def setUp(self):
+        self.device = BrocadeDriver('sw0', 'admin', 'pw')
+        self.device.device = ShellConnection(transcript(), speed=0.0)
+        self.addCleanup(self.device.device.disconnect)
+
+    def test_send_command(self):
+        self.assertEqual(self.device.send_command('show arp'), ROWS)
+        self.assertEqual(self.device.send_commands(['show system',
+                                                    'show arp']),
+                         ['Stack MAC : 00:27:F8:CA:76:80', ROWS])
+        self.assertEqual(self.device.device.calls['terminal length 0'], 1)
+
+    def test_streamed_lines(self):
+        self.assertEqual(list(self.device._iter_command_lines('show arp')),
+                         ROWS.split('\n'))
+
+
+if __name__ == '__main__':
+    unittest.main()
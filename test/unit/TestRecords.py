@@ -0,0 +1,52 @@
+"""Tests for the compact ARP and MAC tables."""
+
+import json
+import os
+import unittest
+
+from napalm_brocade import parsers
+from napalm_brocade.records import ArpTable, MacTable, int_to_mac, mac_to_int
+
+MOCKED_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'mocked_data')
+
+
+def read_case(test_case, command):
+    """Return the captured output and expected result of test_case."""
+    path = os.path.join(MOCKED_DATA, test_case, 'normal')
+    with open(os.path.join(path, '%s.txt' % command.replace(' ', '_'))) as f:
+        output = f.read()
+    with open(os.path.join(path, 'expected_result.json')) as f:
+        expected = json.load(f)
+    return output, expected
+
+
+class TestRecords(unittest.TestCase):
+    """Group of tests for the columnar tables."""
+
+    def test_mac_int_round_trip(self):
+        self.assertEqual(mac_to_int('00:05:33:E5:D7:64'), 0x000533E5D764)
+        self.assertEqual(int_to_mac(0x000533E5D764), '00:05:33:E5:D7:64')
+
+    def test_mac_table_to_dicts(self):
+        output, expected = read_case('test_get_mac_address_table',
+                                     'show mac-address-table')
+        table = MacTable(parsers.parse_mac_address_table(output.splitlines()))
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.to_dicts(), expected)
+
+    def test_arp_table_to_dicts(self):
+        output, expected = read_case('test_get_arp_table', 'show arp')
+        table = ArpTable(parsers.iter_arp(output))
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.to_dicts(), expected)
+
+    def test_interface_names_interned(self):
+        output, _ = read_case('test_get_arp_table', 'show arp')
+        table = ArpTable(list(parsers.iter_arp(output)) * 100)
+        self.assertEqual(len(table), 300)
+        self.assertEqual(len(table._strings.names), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
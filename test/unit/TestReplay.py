@@ -0,0 +1,76 @@
+"""Tests for the session record and replay."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from napalm_brocade.utils.replay import RecordingConnection, \
+    ReplayConnection, Transcript
+
+MOCKED_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'mocked_data')
+
+
+def read_all(connection):
+    output = ''
+    data = connection.read_channel()
+    while data:
+        output += data
+        data = connection.read_channel()
+    return output
+
+
+class TestReplay(unittest.TestCase):
+    """Group of tests for Transcript and ReplayConnection."""
+
+    def setUp(self):
+        self.transcript = Transcript(prompt='sw0#')
+        self.transcript.add('show arp', 'first', 0.5)
+        self.transcript.add('show arp', 'second', 0.5)
+        self.transcript.add('show vlan brief', 'vlans', 0.1)
+
+    def test_send_command(self):
+        connection = ReplayConnection(self.transcript)
+        self.assertEqual([connection.send_command('show arp')
+                          for _ in range(3)], ['first', 'second', 'second'])
+        self.assertRaises(KeyError, connection.send_command, 'show lldp')
+
+    def test_channel(self):
+        connection = ReplayConnection(self.transcript, chunk_size=5)
+        connection.write_channel('show vlan brief\nshow arp\n')
+        self.assertEqual(read_all(connection),
+                         'show vlan brief\nvlans\nsw0#show arp\nfirst\nsw0#')
+
+    def test_from_directory(self):
+        transcript = Transcript.from_directory(
+            os.path.join(MOCKED_DATA, 'test_get_environment', 'normal'))
+        self.assertIn('Fan', transcript.lookup('show environment fan')[0]
+                      ['output'])
+        self.assertEqual(len(transcript.entries), 5)
+
+    def test_save_load(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'sw0.json')
+        self.transcript.save(path)
+        loaded = Transcript.load(path)
+        self.assertEqual(loaded.entries, self.transcript.entries)
+        self.assertEqual(loaded.prompt, 'sw0#')
+
+    def test_record_round_trip(self):
+        recorded = Transcript()
+        connection = RecordingConnection(
+            ReplayConnection(self.transcript, chunk_size=3), recorded)
+        self.assertEqual(connection.send_command('show arp'), 'first')
+        connection.find_prompt()
+        connection.write_channel('show vlan brief\nshow arp\n')
+        read_all(connection)
+        self.assertEqual([(e['command'], e['output'])
+                          for e in recorded.entries],
+                         [('show arp', 'first'), ('show vlan brief', 'vlans'),
+                          ('show arp', 'second')])
+
+
+if __name__ == '__main__':
+    unittest.main()
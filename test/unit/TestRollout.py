@@ -0,0 +1,136 @@
+"""Tests for the staged config rollout."""
+
+import unittest
+
+from napalm_brocade import rollout
+from napalm_brocade.rollout import Rollout
+
+
+class FakeDriver(object):
+    """Test double recording the config workflow calls."""
+
+    calls = None
+    fail = {}
+
+    def __init__(self, hostname, username, password, timeout=60,
+                 optional_args=None):
+        self.hostname = hostname
+        if self.fail.get(hostname) == 'init':
+            raise ValueError("bad optional_args for %s" % hostname)
+
+    def _record(self, name):
+        self.calls.append((self.hostname, name))
+        if self.fail.get(self.hostname) == name:
+            raise RuntimeError("%s failed on %s" % (name, self.hostname))
+
+    def open(self):
+        self._record('open')
+
+    def close(self):
+        self._record('close')
+
+    def _checkpoint_running_config(self):
+        self._record('checkpoint')
+
+    def load_merge_candidate(self, filename=None, config=None):
+        self._record('load')
+
+    def compare_config(self):
+        self._record('compare')
+        return '+vlan 2000'
+
+    def commit_config(self):
+        self._record('commit')
+
+    def discard_config(self):
+        self._record('discard')
+
+    def rollback_config(self):
+        self._record('rollback')
+
+    def get_facts(self):
+        self._record('get_facts')
+        return {}
+
+    def get_interfaces(self):
+        self._record('get_interfaces')
+        return {}
+
+
+def inventory(count):
+    return [{'hostname': 'sw%d' % i} for i in range(count)]
+
+
+class TestRollout(unittest.TestCase):
+    """Group of tests for Rollout."""
+
+    def setUp(self):
+        FakeDriver.calls = []
+        FakeDriver.fail = {}
+
+    def calls(self, name):
+        return sorted(host for host, call in FakeDriver.calls if call == name)
+
+    def test_waves(self):
+        waves = Rollout(inventory(8), config='x', canary=1, wave_size=3,
+                        driver_class=FakeDriver).waves()
+        self.assertEqual([len(wave) for wave in waves], [1, 3, 3, 1])
+
+    def test_all_waves_committed(self):
+        results = Rollout(inventory(5), config='vlan 2000', canary=1,
+                          wave_size=2, driver_class=FakeDriver).run()
+        self.assertEqual(set(r.state for r in results), set([rollout.COMMITTED]))
+        self.assertEqual(results[0].diff, '+vlan 2000')
+        self.assertEqual(len(self.calls('commit')), 5)
+        self.assertEqual(len(self.calls('close')), 5)
+
+    def test_failed_load_discards_wave(self):
+        FakeDriver.fail = {'sw2': 'load'}
+        results = Rollout(inventory(6), config='x', canary=1, wave_size=2,
+                          driver_class=FakeDriver).run()
+        states = dict((r.hostname, r.state) for r in results)
+        self.assertEqual(states['sw0'], rollout.COMMITTED)
+        self.assertEqual(states['sw1'], rollout.DISCARDED)
+        self.assertEqual(states['sw2'], rollout.FAILED)
+        self.assertEqual(states['sw3'], rollout.SKIPPED)
+        self.assertNotIn('sw1', self.calls('commit'))
+        # The half-loaded candidate of the failed host is dropped too
+        self.assertEqual(self.calls('discard'), ['sw1', 'sw2'])
+
+    def test_failed_constructor_discards_wave(self):
+        FakeDriver.fail = {'sw2': 'init'}
+        results = Rollout(inventory(4), config='x', canary=0, wave_size=4,
+                          driver_class=FakeDriver).run()
+        states = dict((r.hostname, r.state) for r in results)
+        self.assertEqual(states['sw2'], rollout.FAILED)
+        self.assertIsInstance(results[2].error, ValueError)
+        self.assertEqual(self.calls('discard'), ['sw0', 'sw1', 'sw3'])
+        self.assertEqual(self.calls('close'), ['sw0', 'sw1', 'sw3'])
+
+    def test_failed_health_check_rolls_back_wave(self):
+        FakeDriver.fail = {'sw1': 'get_interfaces'}
+        results = Rollout(inventory(5), config='x', canary=1, wave_size=2,
+                          driver_class=FakeDriver).run()
+        states = dict((r.hostname, r.state) for r in results)
+        self.assertEqual(states['sw0'], rollout.COMMITTED)
+        self.assertEqual(states['sw1'], rollout.ROLLED_BACK)
+        self.assertEqual(states['sw2'], rollout.ROLLED_BACK)
+        self.assertEqual(states['sw4'], rollout.SKIPPED)
+        self.assertEqual(self.calls('rollback'), ['sw1', 'sw2'])
+
+    def test_failed_commit_rolls_back_wave(self):
+        FakeDriver.fail = {'sw2': 'commit'}
+        results = Rollout(inventory(5), config='x', canary=1, wave_size=2,
+                          driver_class=FakeDriver).run()
+        states = dict((r.hostname, r.state) for r in results)
+        self.assertEqual(states['sw0'], rollout.COMMITTED)
+        self.assertEqual(states['sw1'], rollout.ROLLED_BACK)
+        # The commit raised partway through, so it is rolled back as well
+        self.assertEqual(states['sw2'], rollout.ROLLED_BACK)
+        self.assertIsInstance(results[2].error, RuntimeError)
+        self.assertEqual(states['sw3'], rollout.SKIPPED)
+        self.assertEqual(self.calls('rollback'), ['sw1', 'sw2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
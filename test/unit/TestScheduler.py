@@ -0,0 +1,221 @@
+"""Tests for the adaptive polling scheduler, against simulated switches."""
+
+import heapq
+import threading
+import unittest
+from collections import defaultdict
+
+from napalm_base.exceptions import CommandTimeoutException
+
+from napalm_brocade.scheduler import PollScheduler
+
+
+class Simulation(object):
+    """
+    Discrete-event simulation of a PollScheduler against fake switches.
+
+    latency(host, getter, now, in_flight) returns how long a poll takes,
+    or None for a poll that times out after timeout seconds.
+    """
+
+    def __init__(self, hosts, getters, latency, timeout=60, **kwargs):
+        self.now = 0.0
+        self.scheduler = PollScheduler(hosts, getters,
+                                       clock=lambda: self.now, **kwargs)
+        self.latency = latency
+        self.timeout = timeout
+        self.polls = []
+        self.peak_in_flight = defaultdict(int)
+        self.peak_total = 0
+        self._in_flight = defaultdict(int)
+        self._events = []
+
+    def run(self, duration):
+        end = self.now + duration
+        while self.now <= end:
+            for host, getter in self.scheduler.ready(self.now):
+                self._in_flight[host] += 1
+                self.peak_in_flight[host] = max(self.peak_in_flight[host],
+                                                self._in_flight[host])
+                latency = self.latency(host, getter, self.now,
+                                       self._in_flight[host])
+                error = None
+                if latency is None:
+                    latency = self.timeout
+                    error = CommandTimeoutException("simulated timeout")
+                heapq.heappush(self._events, (self.now + latency, host,
+                                              getter, self.now, error))
+            self.peak_total = max(self.peak_total, len(self._events))
+
+            next_due = self.scheduler.next_due()
+            if self._events and (next_due is None or next_due <= self.now or
+                                 self._events[0][0] <= next_due):
+                finish, host, getter, start, error = \
+                    heapq.heappop(self._events)
+                self.now = finish
+                self._in_flight[host] -= 1
+                self.scheduler.finished(host, getter, finish - start, error)
+                self.polls.append((start, host, getter, error))
+            elif next_due is not None:
+                self.now = next_due
+            else:
+                break
+
+    def runs(self, host, getter):
+        return len([poll for poll in self.polls
+                    if poll[1:3] == (host, getter)])
+
+    def starts(self, host, getter):
+        return [poll[0] for poll in self.polls if poll[1:3] == (host, getter)]
+
+
+GETTERS = {'get_facts': 10, 'get_mac_address_table': 10}
+
+
+def fixed_latency(table):
+    """Latency from a {(host, getter): seconds} table."""
+    return lambda host, getter, now, in_flight: table[(host, getter)]
+
+
+class TestPollScheduler(unittest.TestCase):
+    """Group of tests for PollScheduler."""
+
+    def test_expensive_command_spaced_out(self):
+        simulation = Simulation(['nos1'], GETTERS, fixed_latency({
+            ('nos1', 'get_facts'): 0.2,
+            ('nos1', 'get_mac_address_table'): 5.0}), duty_cycle=0.1)
+        simulation.run(600)
+        # 0.2s stays on the base interval, 5s is spaced to 50s
+        self.assertGreaterEqual(simulation.runs('nos1', 'get_facts'), 55)
+        self.assertLessEqual(
+            simulation.runs('nos1', 'get_mac_address_table'), 13)
+        self.assertEqual(
+            simulation.scheduler.interval('nos1', 'get_mac_address_table'),
+            50.0)
+
+    def test_fast_switch_polled_more_often(self):
+        simulation = Simulation(['nos1', 'slx1'], GETTERS, fixed_latency({
+            ('nos1', 'get_facts'): 0.5,
+            ('nos1', 'get_mac_address_table'): 8.0,
+            ('slx1', 'get_facts'): 0.1,
+            ('slx1', 'get_mac_address_table'): 0.5}))
+        simulation.run(600)
+        self.assertGreater(simulation.runs('slx1', 'get_mac_address_table'),
+                           5 * simulation.runs('nos1',
+                                               'get_mac_address_table'))
+
+    def test_in_flight_limits(self):
+        hosts = ['sw%d' % i for i in range(20)]
+        simulation = Simulation(
+            hosts, GETTERS, lambda host, getter, now, in_flight: 1.0,
+            max_in_flight_per_host=1, max_in_flight=5)
+        simulation.run(300)
+        self.assertEqual(max(simulation.peak_in_flight.values()), 1)
+        self.assertEqual(simulation.peak_total, 5)
+        self.assertGreater(simulation.scheduler.counters['deferred'], 0)
+        for host in hosts:
+            self.assertGreater(simulation.runs(host, 'get_facts'), 0)
+
+    def test_deferral_counted_once(self):
+        scheduler = PollScheduler(['nos1'], GETTERS, clock=lambda: 0.0)
+        self.assertEqual(len(scheduler.ready()), 1)
+        for _ in range(5):
+            self.assertEqual(scheduler.ready(), [])
+        self.assertEqual(scheduler.counters['deferred'], 1)
+
+    def test_backoff_on_timeouts_and_recovery(self):
+        def latency(host, getter, now, in_flight):
+            # The control plane is overloaded between 100s and 400s
+            if 100 <= now < 400:
+                return None
+            return 1.0
+
+        simulation = Simulation(['nos1'], {'get_interfaces_counters': 10},
+                                latency, timeout=30)
+        simulation.run(100)
+        self.assertEqual(
+            simulation.scheduler.interval('nos1', 'get_interfaces_counters'),
+            10.0)
+        simulation.run(300)
+        starts = simulation.starts('nos1', 'get_interfaces_counters')
+        during = [start for start in starts if 100 <= start < 400]
+        # Without backoff there would be 300 / (30 + 10) ~ 7 polls
+        self.assertLessEqual(len(during), 4)
+        self.assertGreater(simulation.scheduler.counters['timeouts'], 0)
+
+        simulation.run(1500)
+        self.assertEqual(
+            simulation.scheduler.interval('nos1', 'get_interfaces_counters'),
+            10.0)
+
+    def test_backoff_on_latency_rise(self):
+        def latency(host, getter, now, in_flight):
+            return 6.0 if now > 60 else 0.5
+
+        simulation = Simulation(['nos1'], {'get_facts': 10}, latency)
+        simulation.run(200)
+        stats = simulation.scheduler.stats()[('nos1', 'get_facts')]
+        self.assertGreater(stats['backoff'], 1.0)
+        self.assertGreater(stats['interval'], 60.0)
+
+    def test_render(self):
+        simulation = Simulation(['nos1'], {'get_facts': 10},
+                                lambda host, getter, now, in_flight: 0.5)
+        simulation.run(30)
+        text = simulation.scheduler.render()
+        self.assertIn('napalm_brocade_scheduler_started_total 3', text)
+        self.assertIn('napalm_brocade_scheduler_interval_seconds'
+                      '{host="nos1",getter="get_facts"} 10.0', text)
+
+
+class FakeDriver(object):
+    """Driver whose get_facts() blocks until released on hung switches."""
+
+    def __init__(self, host, release):
+        self.host = host
+        self.release = release
+
+    def get_facts(self):
+        if self.host == 'hung1':
+            self.release.wait(5)
+        return {'hostname': self.host}
+
+    def close(self):
+        pass
+
+
+class TestRun(unittest.TestCase):
+    """Group of tests for PollScheduler.run() with threads."""
+
+    def test_hung_poll_given_up(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        starts = []
+        outcomes = []
+
+        def connect(host):
+            starts.append((host, release.is_set()))
+            return FakeDriver(host, release)
+
+        scheduler = PollScheduler(['nos1', 'hung1'], {'get_facts': 0.05})
+        timer = threading.Timer(0.4, release.set)
+        timer.start()
+        self.addCleanup(timer.cancel)
+        scheduler.run(connect, lambda host, getter, result, error:
+                      outcomes.append((host, result, error)),
+                      duration=0.8, poll_timeout=0.1)
+
+        hung = [(result, error) for host, result, error in outcomes
+                if host == 'hung1']
+        # The timeout is reported at once, but the switch is not polled
+        # again until the hung poll returns
+        self.assertIsInstance(hung[0][1], CommandTimeoutException)
+        self.assertEqual([released for host, released in starts
+                          if host == 'hung1'][:2], [False, True])
+        self.assertIn(({'hostname': 'hung1'}, None), hung[1:])
+        self.assertEqual(scheduler.counters['timeouts'], 1)
+        self.assertIn(('nos1', {'hostname': 'nos1'}, None), outcomes)
+
+
+if __name__ == '__main__':
+    unittest.main()
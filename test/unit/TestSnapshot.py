@@ -0,0 +1,104 @@
+"""Tests for the multi-getter snapshots."""
+
+import json
+import os
+import unittest
+
+from napalm_brocade.brocade import SNAPSHOT_COMMANDS, BrocadeDriver
+from napalm_brocade.snapshot import SNAPSHOT_VERSION, Snapshot, plan
+from napalm_brocade.utils.replay import ReplayConnection, Transcript
+
+MOCKED_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'mocked_data')
+
+COMMANDS = {
+    'get_facts': ('show system',),
+    'get_interfaces': ('show ip interface brief',),
+    'get_interfaces_ip': ('show ip interface brief', 'show ipv6 interface'),
+}
+
+
+class TestSnapshot(unittest.TestCase):
+    """Group of tests for plan() and Snapshot."""
+
+    def test_plan_dedupes_shared_commands(self):
+        self.assertEqual(
+            plan(['get_interfaces', 'get_facts', 'get_interfaces_ip'],
+                 COMMANDS),
+            ['show ip interface brief', 'show system', 'show ipv6 interface'])
+
+    def test_plan_skips_getters_without_commands(self):
+        self.assertEqual(plan(['get_lldp_neighbors', 'get_facts'], COMMANDS),
+                         ['show system'])
+
+    def test_snapshot(self):
+        snapshot = Snapshot('sw1', ['show system'], timestamp=1000.0)
+        snapshot.sections['get_facts'] = {'vendor': 'Brocade'}
+        snapshot.errors['get_arp_table'] = ValueError('bad output')
+        snapshot.timings['collect'] = 0.5
+
+        self.assertEqual(snapshot['get_facts'], {'vendor': 'Brocade'})
+        self.assertNotIn('get_arp_table', snapshot)
+        self.assertFalse(snapshot.ok)
+        data = json.loads(json.dumps(snapshot.to_dict()))
+        self.assertEqual(data['version'], SNAPSHOT_VERSION)
+        self.assertEqual(data['errors'], {'get_arp_table': 'bad output'})
+        self.assertEqual(data['timestamp'], 1000.0)
+
+
+class TestGetSnapshot(unittest.TestCase):
+    """Group of tests for BrocadeDriver.get_snapshot() against a replay."""
+
+    def setUp(self):
+        self.transcript = Transcript()
+        self.expected = {}
+        for getter in SNAPSHOT_COMMANDS:
+            directory = os.path.join(MOCKED_DATA, 'test_%s' % getter,
+                                     'normal')
+            self.transcript.entries.extend(
+                Transcript.from_directory(directory).entries)
+            with open(os.path.join(directory, 'expected_result.json')) as f:
+                self.expected[getter] = json.load(f)
+        self.device = BrocadeDriver('sw0', 'admin', 'pw')
+        self.device.device = ReplayConnection(self.transcript)
+
+    def test_commands_sent_once(self):
+        snapshot = self.device.get_snapshot()
+        self.assertTrue(snapshot.ok, snapshot.errors)
+        calls = dict(self.device.device.calls)
+        calls.pop('terminal length 0', None)
+        self.assertEqual(calls, dict((entry['command'], 1)
+                                     for entry in self.transcript.entries))
+
+    def test_getter_results(self):
+        snapshot = self.device.get_snapshot()
+        for getter in SNAPSHOT_COMMANDS:
+            # Compared as JSON, which has no integer keys
+            self.assertEqual(json.loads(json.dumps(snapshot[getter])),
+                             self.expected[getter], getter)
+
+    def test_rejected_command(self):
+        # Only get_environment needs the memory summary
+        for entry in self.transcript.entries:
+            if entry['command'] == 'show process memory summary':
+                entry['output'] = "% Invalid input detected at '^' marker."
+        snapshot = self.device.get_snapshot()
+        self.assertEqual(list(snapshot.errors), ['get_environment'])
+        self.assertIsInstance(snapshot.errors['get_environment'], ValueError)
+        self.assertEqual(sorted(snapshot.sections),
+                         sorted(getter for getter in SNAPSHOT_COMMANDS
+                                if getter != 'get_environment'))
+
+    def test_subset(self):
+        snapshot = self.device.get_snapshot(['get_facts', 'get_vlan_table'])
+        self.assertEqual(sorted(snapshot.sections),
+                         ['get_facts', 'get_vlan_table'])
+        self.assertEqual(sorted(self.device.device.calls),
+                         ['show system', 'show vlan brief',
+                          'terminal length 0'])
+        self.assertRaises(ValueError, self.device.get_snapshot,
+                          ['get_lldp_neighbors'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+"""Tests for the MAC and ARP table tracking."""
+
+import os
+import unittest
+
+from napalm_brocade import tracking
+from napalm_brocade.brocade import BrocadeDriver
+from napalm_brocade.records import ArpEntry, MacEntry
+from napalm_brocade.tracking import ArpTracker, MacTracker
+from napalm_brocade.utils.replay import ReplayConnection, Transcript
+
+MOCKED_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'mocked_data')
+
+
+def fixture(test_case, command):
+    """Return the fixture output of command."""
+    return Transcript.from_directory(
+        os.path.join(MOCKED_DATA, test_case, 'normal')).lookup(command)[0][
+            'output']
+
+
+def mac(last, interface, vlan=1):
+    return MacEntry('00:27:F8:CA:43:%02X' % last, interface, vlan, False,
+                    True)
+
+
+def changes_of(changes):
+    return sorted((change['change'], change['entry']['mac'])
+                  for change in changes)
+
+
+class TestMacTracker(unittest.TestCase):
+    """Group of tests for MacTracker."""
+
+    def setUp(self):
+        self.tracker = MacTracker()
+        self.tracker.update([mac(1, 'Te 1/0/1'), mac(2, 'Te 1/0/2'),
+                             mac(3, 'Te 1/0/2', vlan=2000)], timestamp=10)
+
+    def test_first_poll_adds_everything(self):
+        self.assertEqual(len(self.tracker), 3)
+        entry = self.tracker.find(mac='00:27:F8:CA:43:01')[0]
+        self.assertEqual((entry['moves'], entry['last_move']), (0, 0.0))
+
+    def test_unchanged_poll(self):
+        changes = self.tracker.update([mac(1, 'Te 1/0/1'), mac(2, 'Te 1/0/2'),
+                                       mac(3, 'Te 1/0/2', vlan=2000)])
+        self.assertEqual(changes, [])
+
+    def test_add_remove_move(self):
+        changes = self.tracker.update([mac(1, 'Te 1/0/3'), mac(2, 'Te 1/0/2'),
+                                       mac(4, 'Te 1/0/4')], timestamp=20)
+        self.assertEqual(changes_of(changes), [
+            (tracking.ADDED, '00:27:F8:CA:43:04'),
+            (tracking.MOVED, '00:27:F8:CA:43:01'),
+            (tracking.REMOVED, '00:27:F8:CA:43:03'),
+        ])
+        moved = [c for c in changes if c['change'] == tracking.MOVED][0]
+        self.assertEqual(moved['previous']['interface'], 'Te 1/0/1')
+        self.assertEqual((moved['entry']['moves'],
+                          moved['entry']['last_move']), (1, 20.0))
+
+    def test_indexes_follow_moves(self):
+        self.tracker.update([mac(1, 'Te 1/0/2'), mac(2, 'Te 1/0/2')])
+        self.assertEqual(len(self.tracker.find(interface='Te 1/0/2')), 2)
+        self.assertEqual(self.tracker.find(interface='Te 1/0/1'), [])
+        self.assertEqual(self.tracker.find(vlan=2000), [])
+        self.assertEqual(len(self.tracker.find(vlan=1,
+                                               interface='Te 1/0/2')), 2)
+
+    def test_same_mac_in_two_vlans(self):
+        self.tracker.update([mac(1, 'Te 1/0/1'), mac(1, 'Te 1/0/5', vlan=20)])
+        self.assertEqual(len(self.tracker.find(mac='00:27:F8:CA:43:01')), 2)
+
+
+class TestArpTracker(unittest.TestCase):
+    """Group of tests for ArpTracker."""
+
+    def test_ip_moves_to_new_mac(self):
+        tracker = ArpTracker()
+        tracker.update([ArpEntry('10.0.0.1', '00:05:33:E5:D7:64', 'Ve 100',
+                                 'Dynamic', 30.0)])
+        changes = tracker.update([ArpEntry('10.0.0.1', '00:05:33:E5:D7:65',
+                                           'Ve 100', 'Dynamic', 5.0)])
+        self.assertEqual([c['change'] for c in changes], [tracking.MOVED])
+        self.assertEqual(changes[0]['previous']['mac'], '00:05:33:E5:D7:64')
+        self.assertEqual(tracker.find(mac='00:05:33:E5:D7:65')[0]['ip'],
+                         '10.0.0.1')
+
+    def test_age_change_is_not_reported(self):
+        tracker = ArpTracker()
+        entry = ArpEntry('10.0.0.1', '00:05:33:E5:D7:64', 'Ve 100',
+                         'Dynamic', 30.0)
+        tracker.update([entry])
+        self.assertEqual(tracker.update([entry._replace(age=60.0)]), [])
+        self.assertEqual(tracker.table()[0]['age'], 60.0)
+
+
+class TestDriverSync(unittest.TestCase):
+    """Group of tests for the sync_* methods against a replay."""
+
+    def setUp(self):
+        self.transcript = Transcript()
+        self.device = BrocadeDriver('sw0', 'admin', 'pw')
+        self.device.device = ReplayConnection(self.transcript)
+
+    def test_sync_mac_address_table(self):
+        output = fixture('test_get_mac_address_table',
+                         'show mac-address-table')
+        # The second poll sees 0027.f8ca.4311 learnt on another port
+        self.transcript.add('show mac-address-table', output)
+        self.transcript.add('show mac-address-table',
+                            output.replace('Active       Te 1/0/2',
+                                           'Active       Te 1/0/5'))
+        self.assertEqual(len(self.device.sync_mac_address_table()), 3)
+        changes = self.device.sync_mac_address_table()
+        self.assertEqual(changes_of(changes),
+                         [(tracking.MOVED, '00:27:F8:CA:43:11')])
+        self.assertEqual(changes[0]['entry']['moves'], 1)
+        table = self.device.get_mac_address_table()
+        self.assertEqual([e['moves'] for e in table
+                          if e['mac'] == '00:27:F8:CA:43:11'], [1])
+
+    def test_sync_arp_table(self):
+        output = fixture('test_get_arp_table', 'show arp')
+        # The second poll no longer has the static entry
+        self.transcript.add('show arp', output)
+        self.transcript.add('show arp', output.strip().rsplit('\n', 1)[0])
+        self.assertEqual(len(self.device.sync_arp_table()), 3)
+        changes = self.device.sync_arp_table()
+        self.assertEqual([(c['change'], c['entry']['ip']) for c in changes],
+                         [(tracking.REMOVED, '10.24.90.1')])
+        self.assertEqual(self.device.sync_arp_table(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()